@@ -1,16 +1,192 @@
 import streamlit as st
 import pandas as pd
 import base64
-from gerador_pdf import criar_pdf
-from pathlib import Path
+import os
+import time
+import numpy as np
+from banco_propostas import BancoPropostas
+from cache_pdf import CachePDF
 import calculos
+import cenarios
+import dimensionamento
+import graficos
+import irradiancia
+import metricas
+import montecarlo
+import orcamento
+import recursos
+import tabelas
+from modelo import Proposta
 
 
-# Paths importantes
+@st.cache_resource
+def cache_propostas() -> CachePDF:
+    """Cache de PDFs compartilhado por todas as sessões do servidor.
+
+    A variável de ambiente ORCAMENTOS_CACHE_PDF ativa a camada em disco.
+    """
+    return CachePDF(pasta=os.environ.get("ORCAMENTOS_CACHE_PDF"))
+
+
+@st.cache_resource
+def banco() -> BancoPropostas:
+    """Histórico de propostas (SQLite) compartilhado por todas as sessões.
+
+    O arquivo vem da variável de ambiente ORCAMENTOS_BANCO (padrão: propostas.db).
+    """
+    return BancoPropostas(os.environ.get("ORCAMENTOS_BANCO", "propostas.db"))
+
+
+@st.cache_resource
+def tabelas_padrao() -> dict:
+    """Tabelas padrão (e a de projeto já compilada), montadas uma vez por servidor.
+
+    São compartilhadas por todas as sessões: não devem ser alteradas.
+    """
+    df_projeto = tabelas.df_projeto()
+    return {
+        "df_projeto": df_projeto,
+        "tabela_projeto": calculos.tabela_projeto(df_projeto),
+        "df_preco": tabelas.df_preco(),
+        "df_nf": tabelas.df_nf(),
+        "df_impostos": tabelas.df_impostos(),
+    }
 
-PATH_LOGO_INOVASOL = Path(
-    "/home/guilherme/projetos/orcamentos/images/Logotipo_Inovasol.png"
-)
+
+def calcular(
+    entradas: dict,
+    df_consumo: pd.DataFrame,
+    dict_disponibilidade: dict,
+    df_preco: pd.DataFrame,
+) -> dict:
+    """Orçamento completo pelo grafo da sessão: só recalcula o que mudou desde o
+    último envio do formulário (mudar a comissão não refaz a geração, mudar o
+    ganho/perda não refaz os custos).
+    """
+    if "grafo_orcamento" not in st.session_state:
+        t = tabelas_padrao()
+        st.session_state["grafo_orcamento"] = orcamento.grafo_orcamento(
+            df_projeto=t["tabela_projeto"],
+            df_preco=t["df_preco"],
+            df_impostos=t["df_impostos"],
+        )
+    grafo = st.session_state["grafo_orcamento"]
+    grafo.definir(
+        **entradas,
+        df_consumo=df_consumo,
+        dict_disponibilidades=dict_disponibilidade,
+        df_preco=df_preco,
+    )
+    return grafo.valor("resultado")
+
+
+# Nos caches abaixo, _resultado (com "_") não entra na chave: ele é derivado das
+# demais entradas (inclusive da tabela de preços editada), que já a determinam
+
+
+@st.cache_data(max_entries=64)
+def sugerir(
+    entradas: dict,
+    df_consumo: pd.DataFrame,
+    dict_disponibilidade: dict,
+    df_preco: pd.DataFrame,
+    criterio: str,
+    _resultado: dict,
+) -> dict:
+    return dimensionamento.dimensionar_kit(
+        df_consumo,
+        dict_disponibilidade,
+        entradas["ganho_perda"],
+        entradas["potencia_modulos"],
+        _resultado["dict_custos"],
+        _resultado["dict_fluxo"],
+        tma=entradas["tma"],
+        anos=entradas["prazo_vpl"],
+        criterio=criterio,
+        potencia_referencia=float(
+            irradiancia.potencia_referencia(
+                entradas["cidade"], entradas["inclinacao"], entradas["azimute"]
+            )
+        ),
+    )
+
+
+@st.cache_data(max_entries=64)
+def calcular_grade(
+    entradas: dict,
+    df_consumo: pd.DataFrame,
+    dict_disponibilidade: dict,
+    df_preco: pd.DataFrame,
+    faixas: dict,
+    payback_alvo: float,
+    _resultado: dict,
+) -> dict:
+    return cenarios.grade_cenarios(
+        {**_resultado["dict_custos"], **_resultado["dict_fluxo"]},
+        tma=np.linspace(*faixas["tma"], faixas["n_pontos"]),
+        reajuste_tarifa=np.linspace(*faixas["reajuste"], faixas["n_pontos"]),
+        lucro_inovasol=np.arange(faixas["lucro"][0], faixas["lucro"][1] + 1, 5),
+        comissao=np.arange(faixas["comissao"][0], faixas["comissao"][1] + 1),
+        payback_alvo=payback_alvo,
+        anos=entradas["prazo_vpl"],
+    )
+
+
+@st.cache_data(max_entries=64)
+def analisar_risco(
+    entradas: dict,
+    df_consumo: pd.DataFrame,
+    dict_disponibilidade: dict,
+    df_preco: pd.DataFrame,
+    config_risco: dict,
+    _resultado: dict,
+) -> dict:
+    return montecarlo.simular(
+        {**_resultado["dict_fluxo"], "total_projeto": _resultado["total_projeto"]},
+        tma=entradas["tma"],
+        n_sorteios=config_risco["n_sorteios"],
+        semente=config_risco["semente"],
+        distribuicoes=config_risco["distribuicoes"],
+        anos=entradas["prazo_vpl"],
+    )
+
+
+# --- Propostas salvas ---
+# Abrir uma proposta preenche o formulário com as entradas dela: os campos têm a
+# "revisão do formulário" na chave, então cada abertura cria campos novos já com
+# os valores da proposta (sem brigar com o que foi digitado antes)
+
+
+def _valor(nome: str, padrao):
+    """Valor inicial de um campo: o da proposta aberta, se houver, ou o padrão."""
+    entradas = st.session_state.get("entradas_abertas", {})
+    return type(padrao)(entradas[nome]) if nome in entradas else padrao
+
+
+def _chave(nome: str) -> str:
+    return f"{nome}_{st.session_state.get('revisao_form', 0)}"
+
+
+def abrir_proposta(id: int) -> None:
+    salva = banco().abrir(id)
+    proposta = salva.proposta
+    st.session_state["entradas_abertas"] = proposta.entradas()
+    st.session_state["consumo_aberto"] = (
+        salva.df_consumo,
+        salva.dict_disponibilidades,
+    )
+    st.session_state["revisao_form"] = st.session_state.get("revisao_form", 0) + 1
+    st.session_state["ultimo_orcamento"] = {
+        "entradas": proposta.entradas(),
+        "resultado": proposta.resultado.para_dict(),
+        "pdf": salva.bytes_pdf(),
+        "id_salvo": id,
+    }
+
+
+def clonar_proposta(id: int, cliente_numero: int | None = None) -> None:
+    novo_id, _ = banco().clonar(id, cliente_numero=cliente_numero)
+    abrir_proposta(novo_id)
 
 
 # --- Configuração Inicial da Página ---
@@ -18,7 +194,7 @@ PATH_LOGO_INOVASOL = Path(
 st.set_page_config(page_title="Orçamentos Inovasol", layout="wide")
 col_image, col_title = st.columns(spec=[0.15, 0.85])
 with col_image:
-    st.image(PATH_LOGO_INOVASOL, width=150)
+    st.image(recursos.bytes_imagem("logo"), width=150)
 with col_title:
     st.title("Gerador de Orçamentos - Inovasol")
 st.markdown("---")
@@ -28,31 +204,135 @@ st.markdown("---")
 # ==========================================
 
 st.sidebar.header("1. Dados do Cliente")
-cliente_nome = st.sidebar.text_input("Nome do Cliente", "Ex: Padaria do João")
+cliente_nome = st.sidebar.text_input(
+    "Nome do Cliente",
+    _valor("cliente_nome", "Ex: Padaria do João"),
+    key=_chave("cliente_nome"),
+)
 endereco_cliente = st.sidebar.text_input(
-    "Endereço do cliente", "Ex: Alameda das Castanheiras"
+    "Endereço do cliente",
+    _valor("endereco_cliente", "Ex: Alameda das Castanheiras"),
+    key=_chave("endereco_cliente"),
+)
+cliente_numero = st.sidebar.number_input(
+    "Número do cliente",
+    min_value=0,
+    value=_valor("cliente_numero", 355),
+    key=_chave("cliente_numero"),
 )
-cliente_numero = st.sidebar.number_input("Número do cliente", min_value=0, value=355)
-numero_proposta = st.sidebar.number_input("Versão da proposta", min_value=0, value=1)
-ano_proposta = st.sidebar.number_input("Ano da Proposta", min_value=2025, value=2026)
+# A versão é numerada pelo histórico ao salvar: a próxima do cliente
+numero_proposta = banco().proxima_versao(cliente_numero)
+st.sidebar.caption(f"Versão da proposta: {numero_proposta}")
+ano_proposta = st.sidebar.number_input(
+    "Ano da Proposta",
+    min_value=2025,
+    value=_valor("ano_proposta", 2026),
+    key=_chave("ano_proposta"),
+)
+
+with st.sidebar.expander("Propostas salvas"):
+    versoes = banco().versoes(cliente_numero)
+    if not versoes:
+        st.caption("Nenhuma proposta salva para este cliente.")
+    else:
+        id_salvo = st.selectbox(
+            "Versão",
+            [v["id"] for v in versoes],
+            format_func={
+                v["id"]: f"v{v['versao']} de {v['criada_em'][:10]} - "
+                f"R$ {v['total_projeto'] or 0:,.2f}"
+                for v in versoes
+            }.get,
+        )
+        col_v1, col_v2 = st.columns(2)
+        col_v1.button("Abrir", on_click=abrir_proposta, args=(id_salvo,))
+        col_v2.button("Nova versão", on_click=clonar_proposta, args=(id_salvo,))
+        cliente_destino = st.number_input(
+            "Clonar para o cliente", min_value=0, value=cliente_numero
+        )
+        st.button(
+            "Clonar",
+            on_click=clonar_proposta,
+            args=(id_salvo, cliente_destino),
+        )
 
 st.sidebar.header("2. Composição da Tarifa")
-icms = st.sidebar.number_input("ICMS (%)", min_value=0.0, value=18.0)
-pis = st.sidebar.number_input("PIS (%)", min_value=0.0, value=0.8)
-cofins = st.sidebar.number_input("COFINS (%)", min_value=0.0, value=3.7)
+icms = st.sidebar.number_input(
+    "ICMS (%)", min_value=0.0, value=_valor("icms", 18.0), key=_chave("icms")
+)
+pis = st.sidebar.number_input(
+    "PIS (%)", min_value=0.0, value=_valor("pis", 0.8), key=_chave("pis")
+)
+cofins = st.sidebar.number_input(
+    "COFINS (%)", min_value=0.0, value=_valor("cofins", 3.7), key=_chave("cofins")
+)
 fator_simultaneidade = st.sidebar.number_input(
-    "Fator de Simultaniedade", min_value=0.0, max_value=1.0, value=0.38
+    "Fator de Simultaniedade",
+    min_value=0.0,
+    max_value=1.0,
+    value=_valor("fator_simultaneidade", 0.38),
+    key=_chave("fator_simultaneidade"),
+)
+custo_fio_b = st.sidebar.number_input(
+    "Custo Fio B (R$/MWh)",
+    min_value=0.0,
+    value=_valor("custo_fio_b", 240.38),
+    key=_chave("custo_fio_b"),
 )
-custo_fio_b = st.sidebar.number_input("Custo Fio B (R$)", min_value=0.0, value=240.38)
-custo_tusd = st.sidebar.number_input("Custo TUSD (R$/kWh)", min_value=0.0, value=0.4354)
-custo_tusd_impostos = (
-    custo_tusd / (1 - (pis / 100) - (cofins / 100)) / (1 - (icms / 100))
+custo_fio_b_impostos = calculos.tarifa_com_impostos(
+    custo_fio_b / 1000, icms, pis, cofins
 )
+st.sidebar.caption(f"Custo Fio B com impostos: R$ {custo_fio_b_impostos:.4f} por kWh")
+custo_tusd = st.sidebar.number_input(
+    "Custo TUSD (R$/kWh)",
+    min_value=0.0,
+    value=_valor("custo_tusd", 0.4354),
+    key=_chave("custo_tusd"),
+)
+custo_tusd_impostos = calculos.tarifa_com_impostos(custo_tusd, icms, pis, cofins)
 st.sidebar.caption(f"Custo TUSD com impostos: R$ {custo_tusd_impostos:.4f} por kWh")
-custo_te = st.sidebar.number_input("Custo TE (R$/kWh)", min_value=0.0, value=0.3136)
-custo_te_impostos = custo_te / (1 - (pis / 100) - (cofins / 100)) / (1 - (icms / 100))
+custo_te = st.sidebar.number_input(
+    "Custo TE (R$/kWh)",
+    min_value=0.0,
+    value=_valor("custo_te", 0.3136),
+    key=_chave("custo_te"),
+)
+custo_te_impostos = calculos.tarifa_com_impostos(custo_te, icms, pis, cofins)
 st.sidebar.caption(f"Custo TE com impostos: R$ {custo_te_impostos:.4f} por kWh")
 
+st.sidebar.header("3. Parâmetros Financeiros")
+tma = st.sidebar.number_input(
+    "TMA (% a.a.)", min_value=0.0, value=_valor("tma", 10.0), key=_chave("tma")
+)
+reajuste_tarifa = st.sidebar.number_input(
+    "Reajuste tarifário (% a.a.)",
+    min_value=0.0,
+    value=_valor("reajuste_tarifa", 6.0),
+    key=_chave("reajuste_tarifa"),
+)
+degradacao = st.sidebar.number_input(
+    "Degradação dos módulos (% a.a.)",
+    min_value=0.0,
+    value=_valor("degradacao", 0.5),
+    key=_chave("degradacao"),
+)
+prazo_vpl = st.sidebar.number_input(
+    "Horizonte da análise (anos)",
+    min_value=1,
+    max_value=40,
+    value=_valor("prazo_vpl", 25),
+    key=_chave("prazo_vpl"),
+)
+
+# Liga as métricas do processo todo (vale para todas as sessões do servidor)
+painel_desempenho = st.sidebar.checkbox(
+    "Painel de desempenho",
+    value=metricas.ativo(),
+    key="painel_desempenho",
+    on_change=lambda: metricas.ativar(st.session_state["painel_desempenho"]),
+    help="Mede o tempo de cada etapa do orçamento e mostra o da última execução.",
+)
+
 
 # ==========================================
 # VISUALIZAÇÃO
@@ -60,33 +340,32 @@ st.sidebar.caption(f"Custo TE com impostos: R$ {custo_te_impostos:.4f} por kWh")
 
 # --- INÍCIO DO FORMULÁRIO ---
 # O st.form impede que a página recarregue a cada digitação
-meses = [
-    "jan",
-    "fev",
-    "mar",
-    "abr",
-    "mai",
-    "jun",
-    "jul",
-    "ago",
-    "set",
-    "out",
-    "nov",
-    "dez",
-]
-imoveis = [
-    "imv1",
-    "imv2",
-    "imv3",
-    "imv4",
-]
+meses = tabelas.MESES
+# Consumo e disponibilidade da proposta aberta, se houver
+consumo_aberto, disponibilidade_aberta = st.session_state.get(
+    "consumo_aberto", (None, None)
+)
+# Fora do formulário: mudar o número de imóveis redesenha as tabelas na hora
+n_imoveis = st.number_input(
+    "Número de imóveis (autoconsumo remoto)",
+    min_value=1,
+    max_value=50,
+    value=(len(tabelas.IMOVEIS) if consumo_aberto is None else consumo_aberto.shape[1]),
+    key=_chave("n_imoveis"),
+)
+imoveis = tabelas.imoveis(n_imoveis)
+nomes_imoveis = {imv: f"Imóvel {i}" for i, imv in enumerate(imoveis, 1)}
 dict_consumo = {(x, imv): 0 for x in meses for imv in imoveis}
-dict_geracao = {x: 0 for x in meses}
 
 with st.form("form_orcamento"):
     # Criamos 4 Abas para organizar a entrada de dados
-    tab_cliente, tab_preco, tab_infos = st.tabs(
-        ["Dados de Consumo", "Composição do Preço", "Informações adicionais"]
+    tab_cliente, tab_preco, tab_infos, tab_cenarios = st.tabs(
+        [
+            "Dados de Consumo",
+            "Composição do Preço",
+            "Informações adicionais",
+            "Cenários",
+        ]
     )
 
     # --- ABA 1: DADOS DE CONSUMO ---
@@ -97,65 +376,115 @@ with st.form("form_orcamento"):
         # 1. Criamos um DataFrame pandas para servir de base
         # As linhas são os meses, as colunas são os imóveis
         df_inicial = pd.DataFrame(0, index=meses, columns=imoveis)
+        if consumo_aberto is not None:
+            df_inicial = consumo_aberto.reindex(columns=imoveis, fill_value=0)
 
         # 2. Exibimos a tabela editável
         df_consumos = st.data_editor(
             df_inicial,
+            key=_chave("df_consumos"),
             use_container_width=True,
             height=460,  # Altura suficiente para ver o ano todo sem rolar
             column_config={
-                "Imóvel 1": st.column_config.NumberColumn(required=True, min_value=0),
-                "Imóvel 2": st.column_config.NumberColumn(required=True, min_value=0),
-                "Imóvel 3": st.column_config.NumberColumn(required=True, min_value=0),
-                "Imóvel 4": st.column_config.NumberColumn(required=True, min_value=0),
+                imv: st.column_config.NumberColumn(nome, min_value=0)
+                for imv, nome in nomes_imoveis.items()
             },
         )
+        st.caption("Meses sem leitura podem ficar em branco: saem da média do imóvel.")
         st.markdown("---")
         st.markdown("**Custo de Disponibilidade (Taxa Mínima):**")
-        col_d1, col_d2, col_d3, col_d4 = st.columns(4)
-
-        # Exemplo manual ou poderia ser outra tabela pequena
-        disp_imv1 = col_d1.number_input("Disp. Imv 1", min_value=0, value=50)
-        disp_imv2 = col_d2.number_input("Disp. Imv 2", min_value=0, value=0)
-        disp_imv3 = col_d3.number_input("Disp. Imv 3", min_value=0, value=0)
-        disp_imv4 = col_d4.number_input("Disp. Imv 4", min_value=0, value=0)
+        disponibilidade_inicial = [50] + [0] * (n_imoveis - 1)
+        if disponibilidade_aberta is not None:
+            disponibilidade_inicial = [
+                disponibilidade_aberta.get(f"disp_{imv}", 0) for imv in imoveis
+            ]
+        df_disponibilidade = st.data_editor(
+            pd.DataFrame([disponibilidade_inicial], index=["kWh"], columns=imoveis),
+            key=_chave("df_disponibilidade"),
+            use_container_width=True,
+            column_config={
+                imv: st.column_config.NumberColumn(nome, min_value=0, required=True)
+                for imv, nome in nomes_imoveis.items()
+            },
+        )
 
     # --- ABA 2: (Composição do Preço) ---
     #
     with tab_preco:
         col_t1, col_t2, col_t3 = st.columns(3)
         with col_t1:
-            potencia_kit = st.number_input("Potência do Kit (kWp)", value=4.5)
-            potencia_modulos = st.number_input("Potência dos módulos (Wp)", value=620)
+            potencia_kit = st.number_input(
+                "Potência do Kit (kWp)",
+                value=_valor("potencia_kit", 4.5),
+                key=_chave("potencia_kit"),
+            )
+            potencia_modulos = st.number_input(
+                "Potência dos módulos (Wp)",
+                value=_valor("potencia_modulos", 620),
+                key=_chave("potencia_modulos"),
+            )
+            estruturas = ["Telhado", "Solo", "Laje"]
             tipo_estrutura = st.selectbox(
-                "Tipo de Estrutura", ["Telhado", "Solo", "Laje"], index=0
+                "Tipo de Estrutura",
+                estruturas,
+                index=estruturas.index(_valor("tipo_estrutura", "Telhado")),
+                key=_chave("tipo_estrutura"),
             )
         with col_t2:
-            custo_kit = st.number_input("Custo do Kit (R$)", value=12000.00)
+            custo_kit = st.number_input(
+                "Custo do Kit (R$)",
+                value=_valor("custo_kit", 12000.00),
+                key=_chave("custo_kit"),
+            )
+            cidade = st.selectbox(
+                "Cidade da instalação",
+                irradiancia.cidades(),
+                index=irradiancia.cidades().index(
+                    _valor("cidade", irradiancia.CIDADE_PADRAO)
+                ),
+                key=_chave("cidade"),
+            )
+            inclinacao = st.number_input(
+                "Inclinação dos módulos (°)",
+                min_value=0.0,
+                max_value=90.0,
+                value=_valor("inclinacao", 0.0),
+                key=_chave("inclinacao"),
+            )
+            azimute = st.number_input(
+                "Azimute dos módulos (° a partir do Norte)",
+                min_value=0.0,
+                max_value=359.0,
+                value=_valor("azimute", 0.0),
+                help="0° = Norte, 90° = Leste, 180° = Sul, 270° = Oeste.",
+                key=_chave("azimute"),
+            )
+            st.caption(
+                "Ganho ou perda pela orientação em relação ao plano horizontal: "
+                f"{irradiancia.ganho_perda(cidade, inclinacao, azimute):+.1f}%"
+            )
             ganho_perda = st.number_input(
-                "Ganho ou perda em relacao ao plano horizontal (%)", value=0
+                "Ganho ou perda adicional (sombreamento, sujeira) (%)",
+                value=_valor("ganho_perda", 0),
+                key=_chave("ganho_perda"),
             )
         with col_t3:
             adicional_projeto = st.number_input(
-                "Adicional de valor de projeto (%)", value=0, step=5
+                "Adicional de valor de projeto (%)",
+                value=_valor("adicional_projeto", 0),
+                step=5,
+                key=_chave("adicional_projeto"),
             )
             st.caption("Valor do projeto calculado de acordo com a tabela de valores.")
+            sugerir_kit = st.checkbox("Sugerir potência do kit", value=False)
+            criterio_kit = st.selectbox(
+                "Critério da sugestão",
+                dimensionamento.CRITERIOS,
+                format_func={"vpl": "Maior VPL", "payback": "Menor payback"}.get,
+            )
         st.markdown("---")
-        df_preco = pd.DataFrame(
-            [
-                {"Descr": "Mao de obra", "Qtd": 1, "Valor Unit (R$)": 1000.00},
-                {"Descr": "ART", "Qtd": 1, "Valor Unit (R$)": 100.00},
-                {"Descr": "Combustível", "Qtd": 1.0, "Valor Unit (R$)": 1.50},
-                {"Descr": "Aluguel de Veículo", "Qtd": 1, "Valor Unit (R$)": 250.00},
-                {
-                    "Descr": "Equipamentos Adicionais",
-                    "Qtd": 1,
-                    "Valor Unit (R$)": 100.00,
-                },
-            ]
-        )
         tabela_preco = st.data_editor(
-            df_preco,
+            tabelas_padrao()["df_preco"],
             column_config={
                 "Descr": st.column_config.TextColumn(
                     "Descrição", width="medium", required=True
@@ -179,110 +508,40 @@ with st.form("form_orcamento"):
         col_a1, col_a2 = st.columns(2)
         with col_a1:
             comissao = st.slider(
-                "Comissao de venda (%)", min_value=0, max_value=15, value=5, step=1
+                "Comissao de venda (%)",
+                min_value=0,
+                max_value=15,
+                value=_valor("comissao", 5),
+                step=1,
+                key=_chave("comissao"),
             )
         with col_a2:
             lucro_inovasol = st.slider(
-                "Lucro Inovasol (%)", min_value=0, max_value=100, step=5, value=30
+                "Lucro Inovasol (%)",
+                min_value=0,
+                max_value=100,
+                step=5,
+                value=_valor("lucro_inovasol", 30),
+                key=_chave("lucro_inovasol"),
             )
     with tab_infos:
         col_i1, col_i2 = st.columns(2)
         with col_i1:
-            df_projeto = pd.DataFrame(
-                [
-                    {"de": 0, "ate": 5, "preco (R$)": 1080.00, "Potencia": "0 a 5 kWp"},
-                    {
-                        "de": 5,
-                        "ate": 10,
-                        "preco (R$)": 1180.00,
-                        "Potencia": "5 a 10 kWp",
-                    },
-                    {
-                        "de": 10,
-                        "ate": 20,
-                        "preco (R$)": 1650.00,
-                        "Potencia": "10 a 20 kWp",
-                    },
-                    {
-                        "de": 20,
-                        "ate": 30,
-                        "preco (R$)": 2650.00,
-                        "Potencia": "20 a 30 kWp",
-                    },
-                    {
-                        "de": 30,
-                        "ate": 40,
-                        "preco (R$)": 3650.00,
-                        "Potencia": "30 a 40 kWp",
-                    },
-                    {
-                        "de": 40,
-                        "ate": 50,
-                        "preco (R$)": 4650.00,
-                        "Potencia": "40 a 50 kWp",
-                    },
-                    {
-                        "de": 50,
-                        "ate": 60,
-                        "preco (R$)": 5650.00,
-                        "Potencia": "50 a 60 kWp",
-                    },
-                    {
-                        "de": 60,
-                        "ate": 70,
-                        "preco (R$)": 6650.00,
-                        "Potencia": "60 a 70 kWp",
-                    },
-                    {
-                        "de": 70,
-                        "ate": 80,
-                        "preco (R$)": 7650.00,
-                        "Potencia": "70 a 80 kWp",
-                    },
-                    {
-                        "de": 80,
-                        "ate": 90,
-                        "preco (R$)": 8650.00,
-                        "Potencia": "80 a 90 kWp",
-                    },
-                    {
-                        "de": 90,
-                        "ate": 100,
-                        "preco (R$)": 9650.00,
-                        "Potencia": "90 a 100 kWp",
-                    },
-                ]
-            )
             st.dataframe(
-                df_projeto,
+                tabelas_padrao()["df_projeto"],
                 use_container_width=True,
                 hide_index=True,
                 height=420,
             )
         with col_i2:
-            df_nf = pd.DataFrame(
-                [
-                    {"descricao": "Custos Inovasol", "Valor (R$)": 0.0},
-                    {"descricao": "Lucro Inovasol", "Valor (R$)": 0.0},
-                    {"descricao": "Comissao do vendedor", "Valor (R$)": 0.0},
-                    {"descricao": "Total impostos", "Valor (R$)": 0.0},
-                ]
-            )
+            df_nf = tabelas_padrao()["df_nf"]
             st.dataframe(
                 df_nf,
                 use_container_width=True,
                 hide_index=True,
             )
             st.caption(f"Total da Nota Fiscal: R$ {df_nf['Valor (R$)'].sum()}")
-            df_impostos = pd.DataFrame(
-                [
-                    {"imposto": "ISS", "Valor": 6.0},
-                    {"imposto": "PIS", "Valor": 0.0},
-                    {"imposto": "COFINS", "Valor": 0.0},
-                    {"imposto": "CSLL", "Valor": 0.0},
-                    {"imposto": "IRPF", "Valor": 0.0},
-                ]
-            )
+            df_impostos = tabelas_padrao()["df_impostos"]
             st.dataframe(
                 df_impostos,
                 use_container_width=True,
@@ -290,114 +549,401 @@ with st.form("form_orcamento"):
                 column_config={"Valor": st.column_config.NumberColumn(format="%.1f%%")},
             )
             st.caption(f"Total dos impostos: {df_impostos['Valor'].sum()}%")
+    # --- ABA 4: CENÁRIOS (sensibilidade do payback e da TIR) ---
+    with tab_cenarios:
+        calcular_cenarios = st.checkbox("Calcular cenários", value=False)
+        col_c1, col_c2 = st.columns(2)
+        with col_c1:
+            faixa_tma = st.slider(
+                "Faixa de TMA (% a.a.)", 0.0, 30.0, (6.0, 15.0), step=0.5
+            )
+            faixa_reajuste = st.slider(
+                "Faixa de reajuste tarifário (% a.a.)", 0.0, 20.0, (0.0, 10.0)
+            )
+            n_pontos = st.number_input(
+                "Pontos por faixa", min_value=2, max_value=40, value=20
+            )
+        with col_c2:
+            faixa_lucro = st.slider(
+                "Faixa de lucro Inovasol (%)", 0, 100, (0, 60), step=5
+            )
+            faixa_comissao = st.slider("Faixa de comissão (%)", 0, 15, (0, 10))
+            payback_alvo = st.number_input(
+                "Payback alvo (anos)", min_value=0.5, value=4.0, step=0.5
+            )
+        # Análise de risco: faixas de payback e TIR por Monte Carlo
+        st.markdown("**Análise de risco (Monte Carlo)**")
+        calcular_risco = st.checkbox("Simular risco", value=False)
+        col_r1, col_r2, col_r3 = st.columns(3)
+        with col_r1:
+            n_sorteios = st.number_input(
+                "Sorteios", min_value=1000, max_value=100_000, value=10_000, step=1000
+            )
+            semente = st.number_input("Semente", min_value=0, value=0, step=1)
+        with col_r2:
+            desvio_reajuste = st.number_input(
+                "Desvio do reajuste (p.p.)", min_value=0.0, value=2.0, step=0.5
+            )
+            desvio_tma = st.number_input(
+                "Desvio da TMA (p.p.)", min_value=0.0, value=1.5, step=0.5
+            )
+        with col_r3:
+            desvio_geracao = st.number_input(
+                "Desvio da geração (%)", min_value=0.0, value=7.0, step=1.0
+            )
+            faixa_degradacao = st.slider(
+                "Degradação em torno da informada (p.p.)",
+                -1.0,
+                1.0,
+                (-0.2, 0.3),
+                step=0.1,
+            )
+        risco_no_pdf = st.checkbox("Incluir análise de risco no PDF", value=False)
     st.markdown("---")
+    salvar_proposta = st.checkbox(
+        "Salvar no histórico de propostas",
+        value=True,
+        help="Salva entradas, resultados e o PDF como a próxima versão do cliente.",
+    )
+    pdf_otimizado = st.checkbox(
+        "PDF compacto (WhatsApp/e-mail)",
+        value=False,
+        help="Embute a fonte (acentos, bullets e ✓) e comprime as imagens: "
+        "arquivo ~5x menor, um pouco mais lento para gerar.",
+    )
     # Botão principal que submete o formulário e faz os cálculos
     submit_button = st.form_submit_button("🚀 Calcular Orçamento", type="primary")
 
-# Inicializando variáveis
-dict_calc_custos = dict()
-ran_calculations = False
-area_painel = 0
-# --- LÓGICA DE EXIBIÇÃO (Só roda se apertar o botão) ---
+# --- CÁLCULOS (só rodam ao enviar o formulário) ---
+# O último orçamento calculado fica na sessão: as execuções seguintes do script
+# (ex.: o clique em "Baixar Proposta em PDF") só exibem, sem recalcular nada.
 if submit_button:
+    metricas.iniciar_execucao()
+    inicio_execucao = time.perf_counter()
     dict_disponibilidade = {
-        "disp_imv1": disp_imv1,
-        "disp_imv2": disp_imv2,
-        "disp_imv3": disp_imv3,
-        "disp_imv4": disp_imv4,
+        f"disp_{imv}": float(valor) for imv, valor in df_disponibilidade.iloc[0].items()
     }
 
-    dict_custos = {
-        "df_preco": df_preco,
-        "lucro_inovasol": lucro_inovasol,
-        "comissao": comissao,
+    entradas = {
+        "cliente_nome": cliente_nome,
+        "endereco_cliente": endereco_cliente,
+        "cliente_numero": cliente_numero,
+        "numero_proposta": numero_proposta,
+        "ano_proposta": ano_proposta,
+        "icms": icms,
+        "pis": pis,
+        "cofins": cofins,
+        "fator_simultaneidade": fator_simultaneidade,
+        "custo_fio_b": custo_fio_b,
+        "custo_tusd": custo_tusd,
+        "custo_te": custo_te,
+        "tma": tma,
+        "reajuste_tarifa": reajuste_tarifa,
+        "degradacao": degradacao,
+        "prazo_vpl": prazo_vpl,
         "potencia_kit": potencia_kit,
-        "df_projeto": df_projeto,
-        "adicional_projeto": adicional_projeto,
-        "df_impostos": df_impostos,
+        "potencia_modulos": potencia_modulos,
+        "tipo_estrutura": tipo_estrutura,
         "custo_kit": custo_kit,
+        "ganho_perda": ganho_perda,
+        "cidade": cidade,
+        "inclinacao": inclinacao,
+        "azimute": azimute,
+        "adicional_projeto": adicional_projeto,
+        "comissao": comissao,
+        "lucro_inovasol": lucro_inovasol,
     }
+    resultado = calcular(entradas, df_consumos, dict_disponibilidade, tabela_preco)
+    ultimo = {"entradas": entradas, "resultado": resultado}
 
-    consumo_mensal = calculos.consumo_medio(df_consumos, dict_disponibilidade)
-    geracao_mensal = calculos.geracao_mensal(
-        potencia_kit, ganho_perda, potencia_referencia=7.8
-    )
-    n_modulos = round((potencia_kit * 1000) / potencia_modulos, 0)
-    if tipo_estrutura == "Telhado":
-        area_painel = n_modulos * 7
-    elif tipo_estrutura == "Laje":
-        area_painel = n_modulos * 9
-    elif tipo_estrutura == "Solo":
-        area_painel = n_modulos * 10
-    else:
-        print("Estrutura inválida.")
-        area_painel = 0
+    # A versão muda a cada proposta salva e não afeta os cálculos: fica fora da
+    # chave dos caches abaixo
+    entradas_calculo = {k: v for k, v in entradas.items() if k != "numero_proposta"}
+
+    if sugerir_kit:
+        try:
+            ultimo["sugestao"] = sugerir(
+                entradas_calculo,
+                df_consumos,
+                dict_disponibilidade,
+                tabela_preco,
+                criterio_kit,
+                resultado,
+            )
+        except ValueError as e:
+            ultimo["erro_sugestao"] = str(e)
+
+    if calcular_cenarios:
+        faixas = {
+            "tma": faixa_tma,
+            "reajuste": faixa_reajuste,
+            "n_pontos": n_pontos,
+            "lucro": faixa_lucro,
+            "comissao": faixa_comissao,
+        }
+        ultimo["grade"] = calcular_grade(
+            entradas_calculo,
+            df_consumos,
+            dict_disponibilidade,
+            tabela_preco,
+            faixas,
+            payback_alvo,
+            resultado,
+        )
+        ultimo["payback_alvo"] = payback_alvo
 
-    dict_calc_custos = calculos.custo_total(dict_custos=dict_custos)
+    if calcular_risco:
+        config_risco = {
+            "n_sorteios": int(n_sorteios),
+            "semente": int(semente),
+            "distribuicoes": {
+                "reajuste_tarifa": ("normal", desvio_reajuste),
+                "tma": ("normal", desvio_tma),
+                "geracao": ("normal", desvio_geracao),
+                "degradacao": (
+                    "triangular",
+                    -min(faixa_degradacao[0], 0.0),
+                    max(faixa_degradacao[1], 0.0),
+                ),
+            },
+        }
+        ultimo["risco"] = analisar_risco(
+            entradas_calculo,
+            df_consumos,
+            dict_disponibilidade,
+            tabela_preco,
+            config_risco,
+            resultado,
+        )
+
+    if salvar_proposta:
+        # O histórico atribui a versão; o PDF é anexado depois de gerado
+        ultimo["id_salvo"], proposta = banco().salvar(
+            Proposta.de_dicts(
+                {**orcamento.ENTRADAS_PADRAO, **entradas},
+                resultado,
+                df_consumo=df_consumos,
+                dict_disponibilidades=dict_disponibilidade,
+            )
+        )
+        entradas["numero_proposta"] = proposta.numero
+
+    # Prepara os dados para enviar ao gerador_pdf.py
+    ultimo["pdf"] = None
+    try:
+        dados_projeto = orcamento.dados_pdf(
+            entradas,
+            resultado,
+            risco=ultimo["risco"] if calcular_risco and risco_no_pdf else None,
+        )
+        graficos_pdf = graficos.graficos_proposta(df_consumos, resultado)
+        ultimo["pdf"] = cache_propostas().obter_ou_gerar(
+            dados=dados_projeto,
+            graficos=graficos_pdf,
+            perfil="otimizado" if pdf_otimizado else "padrao",
+        )
+    except Exception as e:
+        ultimo["erro_pdf"] = str(e)
+        # Dica de debug: imprime o erro completo no terminal
+        print(f"ERRO DETALHADO: {e}")
+    if ultimo["pdf"] and "id_salvo" in ultimo:
+        banco().anexar_pdf(ultimo["id_salvo"], ultimo["pdf"])
+    if metricas.ativo():
+        metricas.registrar("app.execucao", time.perf_counter() - inicio_execucao)
+        ultimo["etapas"] = metricas.etapas_execucao()
+
+    st.session_state["ultimo_orcamento"] = ultimo
+    if "id_salvo" in ultimo:
+        st.rerun()  # a barra lateral já foi desenhada com o histórico anterior
+
+# --- LÓGICA DE EXIBIÇÃO (último orçamento calculado na sessão) ---
+if "ultimo_orcamento" in st.session_state:
+    ultimo = st.session_state["ultimo_orcamento"]
+    entradas = ultimo["entradas"]
+    resultado = ultimo["resultado"]
+    consumo_mensal = resultado["consumo_mensal"]
+    geracao_mensal = resultado["geracao_mensal"]
+    area_painel = resultado["area_painel"]
+    dict_retorno = resultado["retorno"]
+    potencia_kit = entradas["potencia_kit"]
     # --- MOSTRAR RESULTADOS ---
     st.subheader("📊 Resultado da Análise")
+    if "id_salvo" in ultimo:
+        st.caption(
+            f"Proposta {entradas['numero_proposta']}/{entradas['ano_proposta']} do "
+            f"cliente {entradas['cliente_numero']} salva no histórico."
+        )
 
     kpi1, kpi2, kpi3, kpi4 = st.columns(4)
     kpi1.metric("Consumo médio total", f"{consumo_mensal:.0f} kWh")
     kpi2.metric("Geração Mensal", f"{geracao_mensal:.0f} kWh")
-    kpi3.metric("Valor NF", f"R$ {dict_calc_custos['total_nf']:,.2f}")
-    kpi4.metric("Custo Total do Projeto", f"R$ {dict_calc_custos['total_projeto']:.2f}")
+    kpi3.metric("Valor NF", f"R$ {resultado['total_nf']:,.2f}")
+    kpi4.metric("Custo Total do Projeto", f"R$ {resultado['total_projeto']:.2f}")
 
     area_ocupada_painel, custo_wp, custo_wp_inovasol, custo_wp_equip = st.columns(4)
     area_ocupada_painel.metric("Área ocupada pelo painel", f"{area_painel:.0f} m²")
     custo_wp.metric(
-        "Custo por Wp", f"R$ {dict_calc_custos['total_projeto'] / potencia_kit:.2f}"
+        "Custo por Wp", f"R$ {resultado['total_projeto'] / potencia_kit:.2f}"
     )
     custo_wp_inovasol.metric(
-        "Custo por WP Inovasol", f"R$ {dict_calc_custos['total_nf'] / potencia_kit:.2f}"
+        "Custo por WP Inovasol", f"R$ {resultado['total_nf'] / potencia_kit:.2f}"
     )
     custo_wp_equip.metric(
         "Custo por Wp Equipamentos",
-        f"R$ {custo_kit / potencia_kit:.2f}",
+        f"R$ {entradas['custo_kit'] / potencia_kit:.2f}",
     )
-    ran_calculations = True
 
+    kpi_payback, kpi_payback_desc, kpi_tir, kpi_vpl = st.columns(4)
+    kpi_payback.metric(
+        "Payback",
+        orcamento.formatar_anos(dict_retorno["payback"], entradas["prazo_vpl"], "anos"),
+    )
+    kpi_payback_desc.metric(
+        "Payback descontado",
+        orcamento.formatar_anos(
+            dict_retorno["payback_descontado"], entradas["prazo_vpl"], "anos"
+        ),
+    )
+    kpi_tir.metric("TIR", orcamento.formatar_tir(dict_retorno["tir"]))
+    kpi_vpl.metric("VPL", f"R$ {dict_retorno['vpl']:,.2f}")
 
-# ==========================================
-# GERAÇÃO DO PDF
-# ==========================================
+    # Conta de energia pela simulação da compensação (autoconsumo, Fio B e créditos).
+    # Propostas abertas do histórico não guardam os créditos expirados
+    conta = resultado.get("compensacao")
+    if conta is not None:
+        kpi_conta, kpi_nova_conta, kpi_economia, kpi_creditos = st.columns(4)
+        kpi_conta.metric("Conta atual (média)", f"R$ {conta['conta_atual']:,.2f}")
+        kpi_nova_conta.metric("Nova conta estimada", f"R$ {conta['nova_conta']:,.2f}")
+        kpi_economia.metric(
+            "Economia 1º ano", f"R$ {conta['economia_primeiro_ano']:,.2f}"
+        )
+        if "creditos_expirados" in conta:
+            kpi_creditos.metric(
+                "Créditos expirados", f"{conta['creditos_expirados']:,.0f} kWh"
+            )
 
-# Prepara os dados para enviar ao gerador_pdf.py
-if ran_calculations:
-    dados_projeto = {
-        # Dados Pessoais
-        "nome_cliente": cliente_nome,
-        "cidade": endereco_cliente,  # Corrigido de 'cidade_cliente' para 'cidade' conforme gerador_pdf
-        "numero_proposta": f"{numero_proposta}/{ano_proposta}",
-        "data": "25 de Janeiro de 2026",  # Podes usar datetime.now().strftime...
-        # Dados Técnicos (Estes devem vir das tuas variáveis de cálculo)
-        "potencia_kwp": f"{potencia_kit:.2f}",
-        "num_modulos": 10,  # Exemplo: substituir pela variável real
-        "inversor": "Inversor X",  # Exemplo
-        "geracao_mensal": "500",  # Exemplo
-        "area_minima": "25",  # Exemplo
-        # Financeiro
-        "valor_total": f"{dict_calc_custos['total_nf']:,.2f}",
-        "payback": "4.5 Anos",
-        "economia_anual": "R$ 5.000,00",  # Exemplo
-        "nova_conta": "R$ 100,00",  # Exemplo
-        "tir": "2.5%",  # Exemplo
-    }
-    pdf_bytes = None
-    graficos = {}
-    try:  # Passamos graficos=None por enquanto, como no teu código original
-        pdf_bytes = criar_pdf(dados=dados_projeto, graficos=graficos)
-    except Exception as e:
-        st.error(f"Erro ao gerar o PDF: {e}")
-        # Dica de debug: imprime o erro completo no terminal
-        print(f"ERRO DETALHADO: {e}")
+    if "erro_sugestao" in ultimo:
+        st.warning(f"Não foi possível sugerir o kit: {ultimo['erro_sugestao']}")
+    elif "sugestao" in ultimo:
+        sugestao = ultimo["sugestao"]
+        payback = orcamento.formatar_anos(
+            sugestao["payback"], entradas["prazo_vpl"], "anos"
+        )
+        st.info(
+            f"Kit sugerido: {sugestao['n_modulos']} módulos de "
+            f"{entradas['potencia_modulos']} Wp ({sugestao['potencia_kit']:.2f} kWp), "
+            f"geração de {sugestao['geracao_mensal']:.0f} kWh/mês, custo estimado do "
+            f"kit de R$ {sugestao['custo_kit']:,.2f}, payback de {payback} e VPL de "
+            f"R$ {sugestao['vpl']:,.2f}."
+            + (
+                " Nenhum kit se paga no prazo, então a sugestão é a de maior VPL."
+                if sugestao["criterio"] != criterio_kit
+                else ""
+            )
+        )
+
+    if "grade" in ultimo:
+        grade = ultimo["grade"]
+        eixos = grade["eixos"]
+        # O payback simples não depende da TMA: usamos a TMA mais próxima da atual
+        i_tma = int(np.abs(eixos["tma"] - entradas["tma"]).argmin())
+        i_comissao = int(np.abs(eixos["comissao"] - entradas["comissao"]).argmin())
+
+        st.subheader("🔎 Cenários")
+        st.caption(
+            f"{grade['payback'].size} cenários avaliados. Maior lucro Inovasol (%) "
+            f"com payback de até {ultimo['payback_alvo']:.1f} anos, por reajuste e "
+            "comissão:"
+        )
+        st.dataframe(
+            pd.DataFrame(
+                grade["lucro_maximo"][i_tma],
+                index=[f"{r:.1f}%" for r in eixos["reajuste_tarifa"]],
+                columns=[f"{c:.0f}%" for c in eixos["comissao"]],
+            ),
+            use_container_width=True,
+        )
+        st.caption(
+            f"TIR (%) por reajuste tarifário e lucro Inovasol, com comissão de "
+            f"{eixos['comissao'][i_comissao]:.0f}%:"
+        )
+        st.dataframe(
+            pd.DataFrame(
+                grade["tir"][i_tma, :, :, i_comissao] * 100,
+                index=[f"{r:.1f}%" for r in eixos["reajuste_tarifa"]],
+                columns=[f"{lucro:.0f}%" for lucro in eixos["lucro_inovasol"]],
+            ).round(1),
+            use_container_width=True,
+        )
+
+    if "risco" in ultimo:
+        risco = ultimo["risco"]
+        percentis = risco["percentis"]
+        st.subheader("🎲 Análise de risco")
+        st.caption(
+            f"{risco['n_sorteios']:,} cenários sorteados. Chance de o investimento "
+            f"se pagar em {entradas['prazo_vpl']} anos: "
+            f"{risco['prob_payback'] * 100:.0f}%."
+        )
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Payback (anos)": percentis["payback"],
+                    "Payback descontado (anos)": percentis["payback_descontado"],
+                    "TIR (%)": {p: v * 100 for p, v in percentis["tir"].items()},
+                    "VPL (R$)": percentis["vpl"],
+                }
+            )
+            .rename(index=lambda p: f"P{p}")
+            .round(2),
+            use_container_width=True,
+        )
+
+    # ==========================================
+    # GERAÇÃO DO PDF
+    # ==========================================
+    if "erro_pdf" in ultimo:
+        st.error(f"Erro ao gerar o PDF: {ultimo['erro_pdf']}")
 
     # 3. Mostrar o botão de Download Nativo
-    if pdf_bytes:
+    if ultimo["pdf"]:
         st.download_button(
             label="📄 Baixar Proposta em PDF",
-            data=pdf_bytes,
-            file_name=f"Orcamento_{cliente_nome}.pdf",
+            data=ultimo["pdf"],
+            file_name=f"Orcamento_{entradas['cliente_nome']}.pdf",
             mime="application/pdf",
             type="primary",
         )
+    stats_cache = cache_propostas().estatisticas()
+    st.caption(
+        f"Cache de propostas: {stats_cache['acertos_memoria']} acertos em memória, "
+        f"{stats_cache['acertos_disco']} em disco, {stats_cache['faltas']} faltas."
+    )
+
+    if painel_desempenho and "etapas" in ultimo:
+        with st.expander("⏱️ Desempenho", expanded=True):
+            # Só aparece o que foi recalculado: o grafo e os caches pulam o resto
+            df_etapas = pd.DataFrame(ultimo["etapas"], columns=["Etapa", "ms"])
+            df_etapas["ms"] *= 1000
+            total = df_etapas.loc[df_etapas["Etapa"] == "app.execucao", "ms"].sum()
+            df_etapas = df_etapas[df_etapas["Etapa"] != "app.execucao"]
+            st.caption(
+                f"Última execução: {total:.1f} ms, dos quais "
+                f"{df_etapas['ms'].sum():.1f} ms nas etapas medidas."
+            )
+            st.bar_chart(
+                df_etapas.groupby(df_etapas["Etapa"].str.split(".").str[0])["ms"].sum()
+            )
+            st.dataframe(df_etapas.round(3), hide_index=True, use_container_width=True)
+
+            st.caption("Desde o início do servidor (ms):")
+            df_resumo = pd.DataFrame(metricas.resumo()).T
+            colunas_ms = ["soma", "p50", "p95", "p99", "maximo"]
+            df_resumo[colunas_ms] = (df_resumo[colunas_ms] * 1000).round(3)
+            st.dataframe(df_resumo.astype({"n": int}), use_container_width=True)
+            st.download_button(
+                "Exportar métricas (Prometheus)",
+                data=metricas.texto_prometheus(),
+                file_name="metricas.prom",
+                mime="text/plain",
+            )
@@ -0,0 +1,373 @@
+# banco_propostas.py
+# histórico de propostas em SQLite: entradas, consumo, resultados e o pdf (ou o
+# caminho dele) de cada versão, com a versão numerada automaticamente por cliente
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import zipfile
+from collections.abc import Iterable
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from modelo import Consumo, Proposta, ResultadoFinanceiro
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS propostas (
+    id INTEGER PRIMARY KEY,
+    cliente_numero INTEGER NOT NULL,
+    versao INTEGER NOT NULL,
+    ano INTEGER NOT NULL,
+    cliente_nome TEXT NOT NULL,
+    criada_em TEXT NOT NULL,
+    origem INTEGER,
+    entradas TEXT NOT NULL,
+    consumo TEXT,
+    resultado TEXT,
+    fluxo_anual BLOB,
+    total_projeto REAL,
+    payback REAL,
+    tir REAL,
+    pdf BLOB,
+    pdf_arquivo TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS propostas_cliente_versao
+    ON propostas (cliente_numero, versao);
+CREATE INDEX IF NOT EXISTS propostas_ano ON propostas (ano);
+"""
+
+# Colunas das listagens: nada de blobs nem JSON, que ficam para abrir()
+_RESUMO = (
+    "id",
+    "cliente_numero",
+    "versao",
+    "ano",
+    "cliente_nome",
+    "criada_em",
+    "origem",
+    "total_projeto",
+    "payback",
+    "tir",
+)
+
+_COLUNAS = (
+    "cliente_numero",
+    "versao",
+    "ano",
+    "cliente_nome",
+    "criada_em",
+    "origem",
+    "entradas",
+    "consumo",
+    "resultado",
+    "fluxo_anual",
+    "total_projeto",
+    "payback",
+    "tir",
+    "pdf",
+    "pdf_arquivo",
+)
+
+# Limite de parâmetros por consulta em versões antigas do SQLite
+_MAX_PARAMETROS = 900
+
+
+@dataclass(frozen=True, slots=True)
+class PropostaSalva:
+    """Uma versão guardada no banco, como aberta por BancoPropostas.abrir."""
+
+    id: int
+    proposta: Proposta
+    criada_em: str
+    origem: int | None = None
+    df_consumo: pd.DataFrame | None = None
+    dict_disponibilidades: dict | None = None
+    pdf: bytes | None = None
+    pdf_arquivo: str | None = None
+
+    def bytes_pdf(self) -> bytes | None:
+        """O pdf guardado no banco ou, se só houver o caminho, lido do disco (o
+        caminho pode ser uma entrada de ZIP: propostas.zip/arquivo.pdf)."""
+        if self.pdf is not None:
+            return self.pdf
+        if self.pdf_arquivo is None:
+            return None
+        caminho = Path(self.pdf_arquivo)
+        if caminho.exists():
+            return caminho.read_bytes()
+        if caminho.parent.suffix.lower() == ".zip" and caminho.parent.is_file():
+            with zipfile.ZipFile(caminho.parent) as arquivo_zip:
+                if caminho.name in arquivo_zip.namelist():
+                    return arquivo_zip.read(caminho.name)
+        return None
+
+
+def _linha(
+    proposta: Proposta,
+    criada_em: str,
+    pdf: bytes | None = None,
+    pdf_arquivo: str | Path | None = None,
+    origem: int | None = None,
+) -> dict:
+    r = proposta.resultado
+    # O consumo (meses x imóveis em kWh, null no mês sem leitura) fica na sua
+    # coluna, fora do JSON das entradas
+    entradas = proposta.entradas()
+    consumo = entradas.pop("consumo", None)
+    return {
+        "cliente_numero": proposta.cliente.numero,
+        "versao": proposta.numero,
+        "ano": proposta.ano,
+        "cliente_nome": proposta.cliente.nome,
+        "criada_em": criada_em,
+        "origem": origem,
+        "entradas": json.dumps(entradas),
+        "consumo": None if consumo is None else json.dumps(consumo),
+        "resultado": (
+            None
+            if r is None
+            else json.dumps(
+                {
+                    c.name: getattr(r, c.name)
+                    for c in fields(r)
+                    if c.name != "fluxo_anual_bytes"
+                }
+            )
+        ),
+        "fluxo_anual": None if r is None else r.fluxo_anual_bytes,
+        "total_projeto": None if r is None else r.total_projeto,
+        "payback": None if r is None else r.payback,
+        "tir": None if r is None else r.tir,
+        "pdf": pdf,
+        "pdf_arquivo": None if pdf_arquivo is None else str(pdf_arquivo),
+    }
+
+
+class BancoPropostas:
+    """Propostas guardadas em um arquivo SQLite.
+
+    Cada proposta salva é a próxima versão do seu cliente (1, 2, ...): o número da
+    proposta é atribuído aqui, dentro da transação, e não digitado. O banco usa
+    WAL, então leituras (inclusive de outros processos, como a linha de comando)
+    não esperam as gravações. As listagens leem só colunas de resumo pelos índices
+    de cliente/versão e de ano, e continuam rápidas com centenas de milhares de
+    propostas. Seguro para uso entre threads (sessões do streamlit).
+    """
+
+    def __init__(self, caminho: str | Path = "propostas.db"):
+        self.caminho = str(caminho)
+        self._conexao = sqlite3.connect(
+            self.caminho, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            # Com WAL, NORMAL só arrisca a última transação numa queda de energia
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+            self._conexao.executescript(ESQUEMA)
+
+    def fechar(self) -> None:
+        self._conexao.close()
+
+    def __enter__(self) -> "BancoPropostas":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.fechar()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM propostas").fetchone()[0]
+
+    def proxima_versao(self, cliente_numero: int) -> int:
+        with self._lock:
+            return self._versoes_atuais([cliente_numero]).get(cliente_numero, 0) + 1
+
+    def salvar(self, proposta: Proposta, **kwargs) -> tuple[int, Proposta]:
+        """Guarda a proposta como a próxima versão do cliente.
+
+        kwargs: pdf (bytes), pdf_arquivo (caminho) e origem (id da proposta de
+        que esta foi copiada). O consumo é o da proposta (Proposta.consumo).
+        Retorna o id e a proposta com o número da versão atribuída.
+        """
+        return self.salvar_lote([{"proposta": proposta, **kwargs}])[0]
+
+    def salvar_lote(self, itens: Iterable[dict]) -> list[tuple[int, Proposta]]:
+        """Guarda várias propostas em uma única transação.
+
+        Cada item é um dicionário com 'proposta' e, opcionalmente, os kwargs de
+        salvar(). As versões são atribuídas na ordem dos itens, continuando a
+        numeração de cada cliente; o número da proposta informado é ignorado.
+        """
+        itens = list(itens)
+        criada_em = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                versoes = self._versoes_atuais(
+                    {item["proposta"].cliente.numero for item in itens}
+                )
+                propostas = []
+                for item in itens:
+                    cliente = item["proposta"].cliente.numero
+                    versoes[cliente] = versoes.get(cliente, 0) + 1
+                    propostas.append(replace(item["proposta"], numero=versoes[cliente]))
+                (ultimo_id,) = self._conexao.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM propostas"
+                ).fetchone()
+                self._conexao.executemany(
+                    f"INSERT INTO propostas ({', '.join(_COLUNAS)}) "
+                    f"VALUES ({', '.join(':' + c for c in _COLUNAS)})",
+                    (
+                        _linha(
+                            proposta,
+                            criada_em,
+                            **{k: v for k, v in item.items() if k != "proposta"},
+                        )
+                        for proposta, item in zip(propostas, itens)
+                    ),
+                )
+                self._conexao.execute("COMMIT")
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+        # Sem AUTOINCREMENT e com a escrita travada, cada id é o maior anterior + 1
+        return [(ultimo_id + i, p) for i, p in enumerate(propostas, 1)]
+
+    def anexar_pdf(
+        self, id: int, pdf: bytes | None = None, pdf_arquivo: str | Path | None = None
+    ) -> None:
+        """Guarda o pdf (ou o caminho dele) de uma proposta já salva."""
+        self.anexar_pdfs([(id, pdf, pdf_arquivo)])
+
+    def anexar_pdfs(self, pdfs: Iterable[tuple]) -> None:
+        """anexar_pdf de várias propostas, (id, pdf, pdf_arquivo), numa transação."""
+        with self._lock:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                self._conexao.executemany(
+                    "UPDATE propostas SET pdf = ?, pdf_arquivo = ? WHERE id = ?",
+                    (
+                        (pdf, None if arquivo is None else str(arquivo), id)
+                        for id, pdf, arquivo in pdfs
+                    ),
+                )
+                self._conexao.execute("COMMIT")
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+
+    def abrir(self, id: int) -> PropostaSalva:
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT id, criada_em, origem, entradas, consumo, resultado, "
+                "fluxo_anual, pdf, pdf_arquivo FROM propostas WHERE id = ?",
+                (id,),
+            ).fetchone()
+        if linha is None:
+            raise KeyError(f"Proposta não encontrada: {id}")
+        id, criada_em, origem, entradas, consumo, resultado, fluxo, pdf, arquivo = linha
+
+        resultado = (
+            None
+            if resultado is None
+            else ResultadoFinanceiro(**json.loads(resultado), fluxo_anual_bytes=fluxo)
+        )
+        consumo = None if consumo is None else Consumo.de_dict(json.loads(consumo))
+        return PropostaSalva(
+            id=id,
+            proposta=replace(
+                Proposta.de_dicts(json.loads(entradas)),
+                consumo=consumo,
+                resultado=resultado,
+            ),
+            criada_em=criada_em,
+            origem=origem,
+            df_consumo=None if consumo is None else consumo.df_consumo(),
+            dict_disponibilidades=(
+                None if consumo is None else consumo.dict_disponibilidades()
+            ),
+            pdf=pdf,
+            pdf_arquivo=arquivo,
+        )
+
+    def clonar(
+        self,
+        id: int,
+        cliente_numero: int | None = None,
+        cliente_nome: str | None = None,
+        endereco_cliente: str | None = None,
+    ) -> tuple[int, Proposta]:
+        """Copia uma proposta salva como a próxima versão de um cliente.
+
+        Sem cliente_numero é uma nova versão do mesmo cliente. Entradas, consumo e
+        resultados são copiados; o pdf não, porque traz o número da versão antiga.
+        """
+        salva = self.abrir(id)
+        cliente = salva.proposta.cliente
+        cliente = replace(
+            cliente,
+            numero=cliente.numero if cliente_numero is None else cliente_numero,
+            nome=cliente.nome if cliente_nome is None else cliente_nome,
+            endereco=(
+                cliente.endereco if endereco_cliente is None else endereco_cliente
+            ),
+        )
+        return self.salvar(replace(salva.proposta, cliente=cliente), origem=id)
+
+    def versoes(self, cliente_numero: int) -> list[dict]:
+        """Resumo de todas as versões do cliente, da mais recente à primeira."""
+        return self.buscar(cliente_numero=cliente_numero, limite=None)
+
+    def buscar(
+        self,
+        cliente_numero: int | None = None,
+        ano: int | None = None,
+        limite: int | None = 100,
+    ) -> list[dict]:
+        """Resumo (sem entradas, resultados nem pdf) das propostas mais recentes,
+        filtradas por cliente e/ou ano."""
+        filtros, parametros = [], []
+        if cliente_numero is not None:
+            filtros.append("cliente_numero = ?")
+            parametros.append(cliente_numero)
+        if ano is not None:
+            filtros.append("ano = ?")
+            parametros.append(ano)
+        sql = f"SELECT {', '.join(_RESUMO)} FROM propostas"
+        if filtros:
+            sql += " WHERE " + " AND ".join(filtros)
+        # Com cliente, a ordem por versão segue o índice cliente/versão
+        sql += (
+            " ORDER BY versao DESC"
+            if cliente_numero is not None
+            else " ORDER BY id DESC"
+        )
+        if limite is not None:
+            sql += f" LIMIT {int(limite)}"
+        with self._lock:
+            linhas = self._conexao.execute(sql, parametros).fetchall()
+        return [dict(zip(_RESUMO, linha)) for linha in linhas]
+
+    def _versoes_atuais(self, clientes: Iterable[int]) -> dict[int, int]:
+        """Última versão de cada cliente já no banco (chamar com o lock)."""
+        clientes = list(clientes)
+        versoes = {}
+        for inicio in range(0, len(clientes), _MAX_PARAMETROS):
+            parte = clientes[inicio : inicio + _MAX_PARAMETROS]
+            versoes.update(
+                self._conexao.execute(
+                    "SELECT cliente_numero, MAX(versao) FROM propostas "
+                    f"WHERE cliente_numero IN ({', '.join('?' * len(parte))}) "
+                    "GROUP BY cliente_numero",
+                    parte,
+                ).fetchall()
+            )
+        return versoes
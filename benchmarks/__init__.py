@@ -0,0 +1,2 @@
+# benchmarks de desempenho; rodar a partir da raiz do projeto, ex.:
+#   python -m benchmarks.pool_pdf
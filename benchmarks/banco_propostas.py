@@ -0,0 +1,85 @@
+# benchmarks/banco_propostas.py
+# mede o histórico de propostas (SQLite) com muitas propostas: gravação em lotes e
+# as operações do app (próxima versão, listar versões, abrir, clonar, buscar)
+#
+#   python -m benchmarks.banco_propostas --propostas 200000 --clientes 50000
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import tabelas
+from banco_propostas import BancoPropostas
+from benchmarks.modelo import _entradas, _resultado
+from modelo import Proposta
+
+
+def medir(funcao, repeticoes: int = 50) -> float:
+    """Mediana, em ms, de funcao(i) para i em range(repeticoes)."""
+    tempos = []
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(i)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Gravação e consultas do histórico de propostas."
+    )
+    parser.add_argument("--propostas", type=int, default=200_000)
+    parser.add_argument("--clientes", type=int, default=50_000)
+    parser.add_argument("--lote", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df_consumo = pd.DataFrame(
+        rng.uniform(200, 600, (12, len(tabelas.IMOVEIS))),
+        index=tabelas.MESES,
+        columns=tabelas.IMOVEIS,
+    )
+    with tempfile.TemporaryDirectory() as pasta:
+        with BancoPropostas(Path(pasta) / "propostas.db") as banco:
+            inicio = time.perf_counter()
+            for comeco in range(0, args.propostas, args.lote):
+                banco.salvar_lote(
+                    {
+                        "proposta": Proposta.de_dicts(
+                            _entradas(rng, i % args.clientes),
+                            _resultado(rng),
+                            df_consumo=df_consumo,
+                            dict_disponibilidades={"disp_imv1": 50},
+                        )
+                    }
+                    for i in range(comeco, min(comeco + args.lote, args.propostas))
+                )
+            tempo = time.perf_counter() - inicio
+            print(
+                f"gravar {args.propostas} em lotes de {args.lote}: {tempo:6.1f} s "
+                f"({tempo / args.propostas * 1e6:.0f} µs por proposta)"
+            )
+
+            clientes = rng.integers(0, args.clientes, 50)
+            ids = rng.integers(1, args.propostas + 1, 50)
+            operacoes = {
+                "proxima_versao": lambda i: banco.proxima_versao(int(clientes[i])),
+                "versoes": lambda i: banco.versoes(int(clientes[i])),
+                "buscar (ano)": lambda i: banco.buscar(ano=2026, limite=100),
+                "abrir": lambda i: banco.abrir(int(ids[i])),
+                "salvar": lambda i: banco.salvar(
+                    Proposta.de_dicts(_entradas(rng, i), _resultado(rng))
+                ),
+                "clonar": lambda i: banco.clonar(int(ids[i])),
+            }
+            for nome, funcao in operacoes.items():
+                print(f"{nome:15s}: {medir(funcao):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
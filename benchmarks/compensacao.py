@@ -0,0 +1,60 @@
+# benchmarks/compensacao.py
+# mede a simulação da compensação (autoconsumo, Fio B e banco de créditos) de um
+# orçamento no modo mensal e no horário (8760 h), e de um lote de cenários
+#
+#   python -m benchmarks.compensacao --anos 25 --cenarios 1000
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+import compensacao
+
+CONSUMO = np.array([400, 380, 420, 410, 390, 350, 340, 360, 380, 400, 420, 450.0])
+TARIFAS = {"tarifa_tusd": 0.55, "tarifa_te": 0.40, "custo_fio_b": 0.30}
+
+
+def medir(repeticoes: int = 20, **kwargs) -> float:
+    """Mediana, em ms, de compensacao.simular."""
+    compensacao.simular(**kwargs)  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        compensacao.simular(**kwargs)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Tempo da simulação da compensação de energia."
+    )
+    parser.add_argument("--anos", type=int, default=25)
+    parser.add_argument("--cenarios", type=int, default=1000)
+    args = parser.parse_args()
+
+    base = {
+        "geracao_mensal": 577.0,
+        "consumo_mensal": CONSUMO,
+        **TARIFAS,
+        "fator_simultaneidade": 0.38,
+        "disponibilidade": 50,
+        "anos": args.anos,
+    }
+    print(f"mensal ({args.anos} anos)  : {medir(**base):7.2f} ms")
+    print(f"horário ({args.anos} anos) : {medir(**base, horario=True):7.2f} ms")
+    lote = {
+        **base,
+        "geracao_mensal": np.linspace(300, 900, args.cenarios)[:, None],
+    }
+    tempo = medir(repeticoes=3, **lote)
+    print(
+        f"{args.cenarios} cenários      : {tempo:7.1f} ms "
+        f"({tempo / args.cenarios * 1000:.1f} µs por cenário)"
+    )
+
+
+if __name__ == "__main__":
+    main()
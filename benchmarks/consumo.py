@@ -0,0 +1,51 @@
+# benchmarks/consumo.py
+# mede a agregação do consumo de N imóveis (consumo_medio e perfil_mensal) para
+# históricos de vários anos, com alguns meses em branco; o tempo deve crescer de
+# forma linear com o número de imóveis e de meses
+#
+#   python -m benchmarks.consumo --anos 5
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+import calculos
+import tabelas
+
+
+def _historico(rng: np.random.Generator, anos: int, n: int) -> pd.DataFrame:
+    consumo = rng.uniform(100, 900, (12 * anos, n))
+    consumo[rng.random(consumo.shape) < 0.05] = np.nan  # leituras faltando
+    return pd.DataFrame(consumo, columns=tabelas.imoveis(n))
+
+
+def medir(df_consumo: pd.DataFrame, repeticoes: int = 50) -> float:
+    """Mediana, em ms, de consumo_medio + perfil_mensal."""
+    disponibilidades = {f"disp_{imv}": 50 for imv in df_consumo.columns}
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        calculos.consumo_medio(df_consumo, disponibilidades)
+        calculos.perfil_mensal(df_consumo)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Tempo da agregação de consumo por número de imóveis."
+    )
+    parser.add_argument("--anos", type=int, default=5)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    for n in (1, 4, 10, 30, 50, 500):
+        tempo = medir(_historico(rng, args.anos, n))
+        print(f"{n:4d} imóveis x {12 * args.anos} meses: {tempo:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/custo_total.py
+# mede o custo por chamada de calculos.custo_total (somas direto nos arrays, sem
+# alterar a tabela de preços), com a tabela em DataFrame e já compilada, contra o
+# cálculo antigo, que gravava a coluna valor_total no DataFrame e somava pelo pandas
+#
+#   python -m benchmarks.custo_total --chamadas 2000
+
+import argparse
+import statistics
+import time
+
+import calculos
+import tabelas
+
+
+def _custo_total_pandas(dict_custos: dict) -> dict:
+    """Referência: o cálculo antigo, no nível do pandas (e mutando df_preco)."""
+    df_preco = dict_custos["df_preco"]
+    df_preco["valor_total"] = df_preco["Qtd"] * df_preco["Valor Unit (R$)"]
+    sub_total = df_preco["valor_total"].sum() + calculos.custo_projeto(
+        dict_custos["potencia_kit"],
+        dict_custos["df_projeto"],
+        dict_custos["adicional_projeto"],
+    )
+    fator = 1 + (dict_custos["lucro_inovasol"] + dict_custos["comissao"]) / 100
+    total_nf = sub_total * fator / (1 - dict_custos["df_impostos"]["Valor"].sum() / 100)
+    return {
+        "total_nf": float(total_nf),
+        "total_projeto": float(total_nf + dict_custos["custo_kit"]),
+    }
+
+
+def _medir(funcao, dict_custos: dict, chamadas: int) -> float:
+    """Mediana, em µs, de blocos de 100 chamadas."""
+    tempos = []
+    for _ in range(max(chamadas // 100, 1)):
+        inicio = time.perf_counter()
+        for _ in range(100):
+            funcao(dict_custos)
+        tempos.append((time.perf_counter() - inicio) / 100)
+    return statistics.median(tempos) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Custo por chamada de custo_total (µs)."
+    )
+    parser.add_argument("--chamadas", type=int, default=2000)
+    args = parser.parse_args()
+
+    dict_custos = {
+        "df_preco": tabelas.df_preco(),
+        "lucro_inovasol": 30,
+        "comissao": 5,
+        "potencia_kit": 4.5,
+        "df_projeto": calculos.tabela_projeto(tabelas.df_projeto()),
+        "adicional_projeto": 0,
+        "df_impostos": tabelas.df_impostos(),
+        "custo_kit": 12000.0,
+    }
+    antigo = _custo_total_pandas({**dict_custos, "df_preco": tabelas.df_preco()})
+    novo = calculos.custo_total(dict_custos)
+    assert abs(antigo["total_projeto"] - novo["total_projeto"]) < 1e-6
+    assert "valor_total" not in dict_custos["df_preco"]
+
+    casos = {
+        "pandas (antigo)": (
+            _custo_total_pandas,
+            {**dict_custos, "df_preco": tabelas.df_preco()},
+        ),
+        "arrays": (calculos.custo_total, dict_custos),
+        "arrays, compilada": (
+            calculos.custo_total,
+            {**dict_custos, "df_preco": calculos.tabela_preco(dict_custos["df_preco"])},
+        ),
+    }
+    referencia = None
+    for nome, (funcao, argumento) in casos.items():
+        tempo = _medir(funcao, argumento, args.chamadas)
+        referencia = referencia or tempo
+        print(f"{nome:18s}: {tempo:7.1f} µs por chamada ({referencia / tempo:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/graficos.py
+# mede o custo dos dois gráficos da proposta: primeiro uso (importação do matplotlib
+# e montagem das figuras), gráficos novos sobre a figura modelo e acertos do cache
+#
+#   python -m benchmarks.graficos --propostas 20
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+import graficos
+
+
+def _entradas(rng: np.random.Generator, anos: int = 25):
+    consumo = rng.uniform(200, 700, 12)
+    geracao = rng.uniform(300, 600)
+    fluxo = np.cumsum(np.r_[-rng.uniform(10e3, 40e3), np.full(anos, 4e3)])
+    return consumo, geracao, fluxo
+
+
+def _proposta(consumo, geracao, fluxo) -> None:
+    graficos.grafico_geracao_consumo(consumo, geracao)
+    graficos.grafico_fluxo_caixa(fluxo)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Tempo dos gráficos da proposta (ms por proposta)."
+    )
+    parser.add_argument("--propostas", type=int, default=20)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    inicio = time.perf_counter()
+    _proposta(*_entradas(rng))
+    print(f"primeiro uso   : {(time.perf_counter() - inicio) * 1000:7.1f} ms")
+
+    entradas = [_entradas(rng) for _ in range(args.propostas)]
+    for nome in ("gráficos novos", "cache"):
+        tempos = []
+        for consumo, geracao, fluxo in entradas:
+            inicio = time.perf_counter()
+            _proposta(consumo, geracao, fluxo)
+            tempos.append(time.perf_counter() - inicio)
+        print(f"{nome:15s}: {statistics.median(tempos) * 1000:7.2f} ms (mediana)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/importacao.py
+# orçamento de importação a frio (-X importtime) de cada módulo: tempo máximo e
+# dependências pesadas que não podem ser carregadas só por importar o módulo (o
+# pandas, o fpdf2 e o matplotlib ficam para quando são usados). Sai com código 1
+# se algum módulo estourar o orçamento
+#
+#   python -m benchmarks.importacao
+#   python -m benchmarks.importacao --fator 2  # máquina lenta: limites em dobro
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Pacotes pesados que nenhum módulo carrega só por ser importado
+PESADOS = ("pandas", "fpdf", "matplotlib", "PIL", "numpy_financial", "streamlit")
+
+# Módulo -> (tempo máximo em ms, pesados permitidos)
+ORCAMENTO = {
+    "calculos": (250, ()),
+    "cenarios": (250, ()),
+    "compensacao": (250, ()),
+    "dimensionamento": (250, ()),
+    "grafo": (250, ()),
+    "irradiancia": (250, ()),
+    "metricas": (50, ()),
+    "modelo": (250, ()),
+    "montecarlo": (250, ()),
+    "orcamento": (300, ()),
+    "graficos": (300, ()),
+    "tabelas": (50, ()),
+    "recursos": (50, ()),
+    "cache_pdf": (50, ()),
+    "pool_pdf": (100, ()),
+    "zip_pdf": (50, ()),
+    "banco_propostas": (300, ()),
+    "gerador_pdf": (1000, ("fpdf", "PIL")),
+    "gerar_propostas": (300, ()),
+}
+
+
+def medir_importacao(modulo: str) -> tuple[float, set[str]]:
+    """Tempo (ms) da importação a frio do módulo e pacotes carregados com ele."""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    # "import time: self [us] | cumulative | nome"; o próprio módulo é a linha sem
+    # recuo com o nome dele
+    (acumulado,) = re.findall(rf"\|\s*(\d+) \| {re.escape(modulo)}$", saida, re.M)
+    pacotes = {
+        nome.strip().split(".")[0]
+        for nome in re.findall(r"^import time:.*\|.*\|(.+)$", saida, re.M)
+    }
+    return int(acumulado) / 1000, pacotes
+
+
+def verificar(modulo: str, limite: float, permitidos: tuple, amostras: int) -> list:
+    """Problemas encontrados na importação do módulo (lista vazia se nenhum)."""
+    medicoes = [medir_importacao(modulo) for _ in range(amostras)]
+    tempo = statistics.median(ms for ms, _ in medicoes)
+    pesados = sorted((medicoes[0][1] & set(PESADOS)) - set(permitidos))
+    problemas = []
+    if tempo > limite:
+        problemas.append(f"{tempo:.0f} ms, acima do limite de {limite:.0f} ms")
+    if pesados:
+        problemas.append("importa " + ", ".join(pesados))
+    situacao = "; ".join(problemas) or "ok"
+    print(f"{modulo:18s} {tempo:8.1f} ms (limite {limite:6.0f}): {situacao}")
+    return problemas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Verifica o orçamento de importação a frio de cada módulo."
+    )
+    parser.add_argument(
+        "modulos", nargs="*", help="Só estes módulos (padrão: todos do orçamento)"
+    )
+    parser.add_argument("--amostras", type=int, default=3)
+    parser.add_argument(
+        "--fator",
+        type=float,
+        default=1.0,
+        help="Multiplica os limites de tempo (máquinas mais lentas)",
+    )
+    args = parser.parse_args()
+
+    estourados = [
+        modulo
+        for modulo in args.modulos or ORCAMENTO
+        if verificar(
+            modulo,
+            ORCAMENTO[modulo][0] * args.fator,
+            ORCAMENTO[modulo][1],
+            args.amostras,
+        )
+    ]
+    if estourados:
+        print(f"\n{len(estourados)} módulos fora do orçamento: {', '.join(estourados)}")
+        return 1
+    print("\nTodos os módulos dentro do orçamento de importação.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+# benchmarks/irradiancia.py
+# mede a carga da tabela de irradiância e as buscas de produtividade: uma por vez
+# (como no app) e em lote (como nas análises de sensibilidade)
+#
+#   python -m benchmarks.irradiancia --pontos 100000
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+import irradiancia
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Tempo de carga e de busca na tabela de irradiância."
+    )
+    parser.add_argument("--pontos", type=int, default=100_000)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    irradiancia.cidades()
+    print(f"carga da tabela : {(time.perf_counter() - inicio) * 1000:8.2f} ms")
+
+    tempos = []
+    for inclinacao in np.linspace(0, 60, 200):
+        inicio = time.perf_counter()
+        irradiancia.produtividade("São Paulo", inclinacao, 15.0)
+        tempos.append(time.perf_counter() - inicio)
+    print(f"uma busca       : {statistics.median(tempos) * 1e6:8.1f} µs (mediana)")
+
+    rng = np.random.default_rng(0)
+    inclinacao = rng.uniform(0, 60, args.pontos)
+    azimute = rng.uniform(0, 360, args.pontos)
+    inicio = time.perf_counter()
+    irradiancia.produtividade("São Paulo", inclinacao, azimute)
+    tempo = time.perf_counter() - inicio
+    print(
+        f"{args.pontos} buscas  : {tempo * 1000:8.1f} ms "
+        f"({tempo / args.pontos * 1e9:.0f} ns por ponto)"
+    )
+
+
+if __name__ == "__main__":
+    main()
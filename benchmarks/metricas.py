@@ -0,0 +1,64 @@
+# benchmarks/metricas.py
+# custo das medições por etapa (metricas.etapa): a chamada vazia, desligada e
+# ligada, e o orçamento completo (cálculos, gráficos e pdf) nos dois modos
+#
+#   python -m benchmarks.metricas --repeticoes 30
+
+import argparse
+import statistics
+import time
+
+import metricas
+from benchmarks.suite import _orcamento_completo
+
+
+def custo_etapa(n: int) -> float:
+    """Custo, em ns, de um bloco 'with metricas.etapa(...)' vazio."""
+    inicio = time.perf_counter()
+    for _ in range(n):
+        with metricas.etapa("vazia"):
+            pass
+    vazio = time.perf_counter()
+    for _ in range(n):
+        pass
+    return ((vazio - inicio) - (time.perf_counter() - vazio)) / n * 1e9
+
+
+def medir(chamada, repeticoes: int) -> float:
+    """Mediana, em ms, de 'repeticoes' chamadas."""
+    chamada()  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        chamada()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Custo das métricas por etapa, desligadas e ligadas."
+    )
+    parser.add_argument("--repeticoes", type=int, default=30)
+    parser.add_argument("--chamadas", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    orcamento_completo = _orcamento_completo()
+    tempos = {}
+    for ligadas in (False, True):
+        metricas.ativar(ligadas)
+        modo = "ligadas" if ligadas else "desligadas"
+        print(f"etapa vazia, {modo:10s}: {custo_etapa(args.chamadas):8.0f} ns")
+        tempos[ligadas] = medir(orcamento_completo, args.repeticoes)
+        print(f"orçamento completo, {modo:10s}: {tempos[ligadas]:8.2f} ms")
+    print(f"diferença: {(tempos[True] / tempos[False] - 1) * 100:+.1f}%")
+
+    etapas = len(metricas.resumo())
+    print(f"\n{etapas} etapas medidas; p50 / p99 (ms):")
+    for nome, r in metricas.resumo().items():
+        if nome != "vazia":
+            print(f"  {nome:28s} {r['p50'] * 1000:8.3f} / {r['p99'] * 1000:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/modelo.py
+# mede a memória de muitas propostas guardadas como modelo.Proposta contra os
+# dicionários de entradas e resultado, e o tempo de hash() e de impressao()
+#
+#   python -m benchmarks.modelo --propostas 100000
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import orcamento
+from modelo import Proposta
+
+
+def _resultado(rng: np.random.Generator, anos: int = 25) -> dict:
+    fluxo_anual = np.r_[-rng.uniform(10e3, 40e3), rng.uniform(3e3, 5e3, anos)]
+    return {
+        "consumo_mensal": rng.uniform(200, 700),
+        "geracao_mensal": rng.uniform(300, 600),
+        "n_modulos": float(rng.integers(4, 30)),
+        "area_painel": rng.uniform(20, 200),
+        "total_nf": rng.uniform(3e3, 9e3),
+        "total_projeto": -fluxo_anual[0],
+        "retorno": {
+            "vpl": rng.uniform(1e4, 9e4),
+            "tir": rng.uniform(0.1, 0.5),
+            "payback": rng.uniform(2, 8),
+            "payback_descontado": rng.uniform(2, 10),
+            "economia_primeiro_ano": fluxo_anual[1],
+            "fluxo_anual": fluxo_anual,
+            "fluxo_acumulado": np.cumsum(fluxo_anual),
+        },
+    }
+
+
+def _entradas(rng: np.random.Generator, i: int) -> dict:
+    return {
+        **orcamento.ENTRADAS_PADRAO,
+        "cliente_nome": f"Cliente {i}",
+        "cliente_numero": i,
+        "potencia_kit": round(rng.uniform(2, 20), 2),
+        "custo_kit": round(rng.uniform(5e3, 40e3), 2),
+        "comissao": float(rng.integers(0, 10)),
+    }
+
+
+def _memoria(criar) -> tuple[float, list]:
+    """Bytes alocados pelos objetos criados e os próprios objetos."""
+    tracemalloc.start()
+    objetos = criar()
+    usado, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return usado, objetos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Memória e hash de propostas tipadas contra dicionários."
+    )
+    parser.add_argument("--propostas", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.propostas
+
+    rng = np.random.default_rng(0)
+    bytes_dicts, pares = _memoria(
+        lambda: [(_entradas(rng, i), _resultado(rng)) for i in range(n)]
+    )
+    bytes_propostas, propostas = _memoria(
+        lambda: [Proposta.de_dicts(e, r) for e, r in pares]
+    )
+    print(f"dicionários: {bytes_dicts / n:7.0f} bytes por proposta")
+    print(
+        f"Proposta   : {bytes_propostas / n:7.0f} bytes por proposta "
+        f"({bytes_propostas / 1024**2:.0f} MiB para {n})"
+    )
+
+    for nome, funcao in (("hash()", hash), ("impressao()", Proposta.impressao)):
+        inicio = time.perf_counter()
+        for proposta in propostas:
+            funcao(proposta)
+        print(f"{nome:11s}: {(time.perf_counter() - inicio) / n * 1e6:7.2f} µs")
+
+    inicio = time.perf_counter()
+    for proposta in propostas[:10_000]:
+        proposta.resultado.para_dict()
+    print(
+        f"para_dict(): {(time.perf_counter() - inicio) / min(n, 10_000) * 1e6:7.2f} µs"
+    )
+
+
+if __name__ == "__main__":
+    main()
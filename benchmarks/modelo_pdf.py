@@ -0,0 +1,67 @@
+# benchmarks/modelo_pdf.py
+# mede o tempo por proposta de criar_pdf a partir do modelo de páginas fixas contra
+# a diagramação completa (usar_modelo=False), com e sem gráficos
+#
+#   python -m benchmarks.modelo_pdf --propostas 50
+
+import argparse
+import statistics
+import time
+from io import BytesIO
+
+from benchmarks.pool_pdf import DADOS_EXEMPLO
+from gerador_pdf import criar_pdf
+
+
+def _grafico_exemplo() -> bytes:
+    """PNG de um gráfico de barras, do tamanho dos gráficos da proposta."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.bar(range(12), range(12))
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def medir(n: int, usar_modelo: bool, grafico: bytes | None = None) -> float:
+    """Mediana do tempo por proposta, em ms."""
+
+    def graficos():
+        if grafico is None:
+            return {}
+        return {"geracao_consumo": BytesIO(grafico), "fluxo_caixa": BytesIO(grafico)}
+
+    criar_pdf(DADOS_EXEMPLO, graficos(), usar_modelo=usar_modelo)  # aquecimento
+    tempos = []
+    for i in range(n):
+        dados = {**DADOS_EXEMPLO, "numero_proposta": f"{i}/2026"}
+        inicio = time.perf_counter()
+        criar_pdf(dados, graficos(), usar_modelo=usar_modelo)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Tempo por proposta com e sem o modelo de páginas fixas."
+    )
+    parser.add_argument("--propostas", type=int, default=50)
+    args = parser.parse_args()
+
+    casos = {"sem gráficos": None, "com gráficos": _grafico_exemplo()}
+    for nome, grafico in casos.items():
+        completo = medir(args.propostas, usar_modelo=False, grafico=grafico)
+        modelo = medir(args.propostas, usar_modelo=True, grafico=grafico)
+        print(
+            f"{nome}: completo {completo:6.1f} ms  modelo {modelo:6.1f} ms  "
+            f"speedup {completo / modelo:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/montecarlo.py
+# mede a análise de risco (montecarlo.simular) com todos os sorteios de uma vez e
+# em blocos: tempo (mediana) e pico de memória. Falha (código 1) se a análise em
+# blocos passar do limite, como acontecia com a compensação mês a mês em Python
+#
+#   python -m benchmarks.montecarlo --sorteios 10000 100000 --bloco 10000 --limite 1000
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+
+import montecarlo
+
+DICT_BASE = {
+    "total_projeto": 15_000.0,
+    "geracao_mensal": 577.0,
+    "tarifa_tusd": 0.55,
+    "tarifa_te": 0.40,
+    "fator_simultaneidade": 0.38,
+    "custo_fio_b": 0.30,
+    "reajuste_tarifa": 6.0,
+    "degradacao": 0.5,
+    # perfis mês a mês: a economia vem da simulação da compensação, como no app
+    "perfil_geracao": [577.0] * 12,
+    "perfil_consumo": [600.0] * 12,
+    "disponibilidade": 50.0,
+}
+
+
+def medir(n_sorteios: int, bloco: int | None, repeticoes: int) -> tuple[float, float]:
+    """Mediana do tempo (ms) e pico de memória (MiB) de montecarlo.simular."""
+    kwargs = {"tma": 10.0, "n_sorteios": n_sorteios, "bloco": bloco}
+    montecarlo.simular(DICT_BASE, **kwargs)  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        montecarlo.simular(DICT_BASE, **kwargs)
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    montecarlo.simular(DICT_BASE, **kwargs)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(tempos) * 1000, pico / 1024**2
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Tempo e memória da análise de risco por Monte Carlo."
+    )
+    parser.add_argument("--sorteios", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--bloco", type=int, default=montecarlo.BLOCO_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument(
+        "--limite",
+        type=float,
+        default=1000.0,
+        help="tempo máximo (ms) da análise em blocos, para qualquer nº de sorteios",
+    )
+    args = parser.parse_args()
+
+    estourou = []
+    for n in args.sorteios:
+        for bloco in (None, args.bloco):
+            if bloco is not None and bloco >= n:
+                continue
+            tempo, pico = medir(n, bloco, args.repeticoes)
+            modo = "de uma vez" if bloco is None else f"blocos de {bloco}"
+            print(
+                f"{n:7d} sorteios, {modo:17s}: {tempo:8.1f} ms, pico de {pico:7.1f} MiB"
+            )
+            if (bloco is not None or n <= args.bloco) and tempo > args.limite:
+                estourou.append(n)
+
+    p = montecarlo.simular(DICT_BASE, tma=10.0)["percentis"]
+    print(
+        "payback P10/P50/P90: "
+        + " / ".join(f"{v:.2f}" for v in p["payback"].values())
+        + " anos; TIR: "
+        + " / ".join(f"{v * 100:.1f}%" for v in p["tir"].values())
+    )
+
+    for n in estourou:
+        print(f"FALHA: {n} sorteios em blocos levaram mais de {args.limite:.0f} ms")
+    return 1 if estourou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# benchmarks/perfis_pdf.py
+# relatório de tamanho e tempo de criar_pdf em cada perfil de saída
+# (gerador_pdf.PERFIS), com o tamanho do pdf separado em imagens, fontes e páginas
+#
+#   python -m benchmarks.perfis_pdf --propostas 30
+#   python -m benchmarks.perfis_pdf --salvar /tmp/perfis  # grava um pdf de cada
+
+import argparse
+import re
+import statistics
+import time
+from io import BytesIO
+from pathlib import Path
+
+from benchmarks.modelo_pdf import _grafico_exemplo
+from benchmarks.pool_pdf import DADOS_EXEMPLO
+from gerador_pdf import PERFIS, criar_pdf
+
+# Dicionário e tamanho de cada stream do pdf (o fpdf2 grava um objeto por stream)
+_STREAM = re.compile(rb"<<(.*?)>>\s*stream\r?\n", re.S)
+_TAMANHO = re.compile(rb"/Length (\d+)")
+
+
+def composicao(pdf: bytes) -> dict[str, int]:
+    """Bytes do pdf em imagens, fontes embutidas, páginas e o resto (estrutura)."""
+    partes = {"imagens": 0, "fontes": 0, "paginas": 0}
+    for dicionario in _STREAM.findall(pdf):
+        tamanho = int(_TAMANHO.search(dicionario).group(1))
+        if b"/Subtype /Image" in dicionario:
+            partes["imagens"] += tamanho
+        elif b"/Length1" in dicionario:  # arquivo TTF (FontFile2)
+            partes["fontes"] += tamanho
+        else:
+            partes["paginas"] += tamanho
+    partes["estrutura"] = len(pdf) - sum(partes.values())
+    return partes
+
+
+def medir(perfil: str, n: int, grafico: bytes) -> tuple[float, float, bytes]:
+    """Tempo da primeira proposta, mediana das n seguintes (ms) e o último pdf."""
+
+    def graficos():
+        return {"geracao_consumo": BytesIO(grafico), "fluxo_caixa": BytesIO(grafico)}
+
+    inicio = time.perf_counter()
+    pdf = criar_pdf(DADOS_EXEMPLO, graficos(), perfil=perfil)
+    primeira = (time.perf_counter() - inicio) * 1000
+    tempos = []
+    for i in range(n):
+        dados = {**DADOS_EXEMPLO, "numero_proposta": f"{i}/2026"}
+        inicio = time.perf_counter()
+        pdf = criar_pdf(dados, graficos(), perfil=perfil)
+        tempos.append(time.perf_counter() - inicio)
+    return primeira, statistics.median(tempos) * 1000, pdf
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Tamanho e tempo do pdf da proposta em cada perfil de saída."
+    )
+    parser.add_argument("--propostas", type=int, default=30)
+    parser.add_argument(
+        "--salvar", type=Path, help="Pasta onde gravar um pdf de cada perfil"
+    )
+    args = parser.parse_args()
+
+    grafico = _grafico_exemplo()
+    print(
+        f"{'perfil':10s} {'total':>9s} {'imagens':>9s} {'fontes':>9s} "
+        f"{'páginas':>9s} {'estrutura':>9s} {'1ª (ms)':>9s} {'mediana':>9s}"
+    )
+    resultados = {}
+    for perfil in PERFIS:
+        primeira, mediana, pdf = medir(perfil, args.propostas, grafico)
+        resultados[perfil] = (len(pdf), mediana)
+        partes = composicao(pdf)
+        print(
+            f"{perfil:10s} {len(pdf) / 1024:7.1f}KB"
+            + "".join(f" {partes[p] / 1024:7.1f}KB" for p in partes)
+            + f" {primeira:9.1f} {mediana:9.1f}"
+        )
+        if args.salvar is not None:
+            args.salvar.mkdir(parents=True, exist_ok=True)
+            (args.salvar / f"proposta_{perfil}.pdf").write_bytes(pdf)
+
+    tamanho, tempo = resultados["padrao"]
+    for perfil, (tamanho_perfil, tempo_perfil) in resultados.items():
+        if perfil != "padrao":
+            print(
+                f"\n{perfil} / padrao: tamanho {tamanho_perfil / tamanho:.2f}x, "
+                f"tempo {tempo_perfil / tempo:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/pool_pdf.py
+# mede a vazão (propostas/s) do PoolPDF com 1..N processos contra a renderização serial
+#
+#   python -m benchmarks.pool_pdf --propostas 64
+
+import argparse
+import os
+import time
+
+from gerador_pdf import criar_pdf
+from pool_pdf import PoolPDF
+
+DADOS_EXEMPLO = {
+    "nome_cliente": "Padaria do João",
+    "cidade": "Belo Horizonte",
+    "numero_proposta": "1/2026",
+    "data": "25 de Janeiro de 2026",
+    "potencia_kwp": "4.50",
+    "num_modulos": 7,
+    "inversor": "Inversor X",
+    "geracao_mensal": "577",
+    "area_minima": "49",
+    "valor_total": "3,635.66",
+    "payback": "2.6 Anos",
+    "economia_anual": "R$ 5.000,00",
+    "nova_conta": "R$ 100,00",
+    "tir": "40.7%",
+}
+
+
+def _propostas(n: int):
+    return (({**DADOS_EXEMPLO, "numero_proposta": f"{i}/2026"}, {}) for i in range(n))
+
+
+def medir_serial(n: int) -> float:
+    criar_pdf(dados=DADOS_EXEMPLO, graficos={})  # aquecimento
+    inicio = time.perf_counter()
+    for dados, graficos in _propostas(n):
+        criar_pdf(dados=dados, graficos=graficos)
+    return n / (time.perf_counter() - inicio)
+
+
+def medir_pool(n: int, processos: int, bloco: int) -> float:
+    with PoolPDF(processos=processos, bloco=bloco) as pool:
+        # Aquecimento: garante todos os processos iniciados antes de medir
+        list(pool.renderizar(_propostas(processos * bloco)))
+        inicio = time.perf_counter()
+        for _ in pool.renderizar(_propostas(n)):
+            pass
+        return n / (time.perf_counter() - inicio)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Vazão do PoolPDF com 1..N processos contra a renderização serial."
+    )
+    parser.add_argument("--propostas", type=int, default=64)
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--bloco", type=int, default=4)
+    args = parser.parse_args()
+
+    serial = medir_serial(args.propostas)
+    print(f"serial      : {serial:6.2f} propostas/s")
+    contagens = {2**i for i in range(args.processos.bit_length())} | {args.processos}
+    for processos in sorted(contagens):
+        vazao = medir_pool(args.propostas, processos, args.bloco)
+        print(
+            f"{processos:2d} processos: {vazao:6.2f} propostas/s  "
+            f"speedup {vazao / serial:4.2f}x  "
+            f"eficiência {vazao / serial / processos:4.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+# benchmarks/suite.py
+# conjunto de benchmarks do caminho de um orçamento: calculos (escalar e em lote),
+# busca do custo de projeto, criar_pdf com e sem gráficos, importação a frio de
+# cada módulo e o orçamento completo, das entradas aos bytes do pdf, além do pico de
+# memória (RSS, em MiB) da exportação em ZIP. Os resultados vão para um JSON de
+# referência, e o modo de comparação aponta as regressões
+#
+#   python -m benchmarks.suite --salvar benchmarks/referencia.json
+#   python -m benchmarks.suite --comparar benchmarks/referencia.json --limite 20
+#   python -m benchmarks.suite --casos pdf importacao  # só os casos com esses nomes
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tomllib
+from collections.abc import Callable
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.importacao import medir_importacao
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Tempo mínimo de cada amostra: chamadas rápidas são repetidas em blocos
+AMOSTRA_MINIMA = 0.05
+
+
+def _tabelas() -> dict:
+    import calculos
+    import tabelas
+
+    return {
+        "df_projeto": calculos.tabela_projeto(tabelas.df_projeto()),
+        "df_preco": calculos.tabela_preco(tabelas.df_preco()),
+        "df_impostos": tabelas.df_impostos(),
+    }
+
+
+def _consumo():
+    import pandas as pd
+
+    import tabelas
+
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        rng.uniform(200, 600, (12, len(tabelas.IMOVEIS))).round(),
+        index=tabelas.MESES,
+        columns=tabelas.IMOVEIS,
+    )
+
+
+def _fluxo_caixa(n: int) -> Callable:
+    import calculos
+
+    rng = np.random.default_rng(0)
+    argumentos = {
+        "investimento": 15_000.0,
+        "geracao_mensal": 577.0 if n == 1 else rng.uniform(300, 900, n),
+        "tarifa_tusd": 0.55,
+        "tarifa_te": 0.40,
+        "fator_simultaneidade": 0.38,
+        "custo_fio_b": 0.30,
+        "tma": 10.0 if n == 1 else rng.uniform(6, 15, n),
+    }
+    return lambda: calculos.fluxo_caixa(**argumentos)
+
+
+def _custo_projeto(n: int) -> Callable:
+    import calculos
+
+    tabela = _tabelas()["df_projeto"]
+    if n == 1:
+        return lambda: calculos.custo_projeto(4.5, tabela, 0)
+    potencias = np.random.default_rng(0).uniform(0.5, 100, n)
+    return lambda: calculos._custo_projeto_lote(potencias, tabela, 0)
+
+
+def _custo_total() -> Callable:
+    import calculos
+
+    dict_custos = {
+        **_tabelas(),
+        "lucro_inovasol": 30,
+        "comissao": 5,
+        "potencia_kit": 4.5,
+        "adicional_projeto": 0,
+        "custo_kit": 12000.0,
+    }
+    return lambda: calculos.custo_total(dict_custos)
+
+
+def _orcamento_lote(n: int) -> Callable:
+    import calculos
+
+    potencias = np.random.default_rng(0).uniform(2, 50, n)
+    argumentos = {
+        **_tabelas(),
+        "potencia_kit": potencias,
+        "ganho_perda": 0,
+        "custo_kit": potencias * 2500,
+        "lucro_inovasol": 30,
+        "comissao": 5,
+        "adicional_projeto": 0,
+    }
+    return lambda: calculos.orcamento_lote(**argumentos)
+
+
+def _consumo_medio() -> Callable:
+    import calculos
+
+    df_consumo = _consumo()
+    disponibilidades = {"disp_imv1": 50}
+    return lambda: calculos.consumo_medio(df_consumo, disponibilidades)
+
+
+def _calcular_orcamento() -> Callable:
+    import orcamento
+
+    tabelas_orcamento = _tabelas()
+    df_consumo = _consumo()
+    return lambda: orcamento.calcular_orcamento(
+        orcamento.ENTRADAS_PADRAO,
+        df_consumo,
+        {"disp_imv1": 50},
+        **tabelas_orcamento,
+    )
+
+
+def _graficos_png() -> dict[str, bytes]:
+    import graficos
+    import orcamento
+
+    df_consumo = _consumo()
+    resultado = orcamento.calcular_orcamento(
+        orcamento.ENTRADAS_PADRAO, df_consumo, {"disp_imv1": 50}, **_tabelas()
+    )
+    return {
+        nome: png.getvalue()
+        for nome, png in graficos.graficos_proposta(df_consumo, resultado).items()
+    }
+
+
+def _criar_pdf(com_graficos: bool, perfil: str = "padrao") -> Callable:
+    from benchmarks.pool_pdf import DADOS_EXEMPLO
+    from gerador_pdf import criar_pdf
+
+    pngs = _graficos_png() if com_graficos else {}
+    # Um buffer novo por chamada: o fpdf2 lê os gráficos a partir da posição atual
+    return lambda: criar_pdf(
+        DADOS_EXEMPLO,
+        {nome: BytesIO(png) for nome, png in pngs.items()},
+        perfil=perfil,
+    )
+
+
+def _orcamento_completo() -> Callable:
+    import graficos
+    import orcamento
+    from gerador_pdf import criar_pdf
+
+    tabelas_orcamento = _tabelas()
+    df_consumo = _consumo()
+    custos_kit = itertools.count(10_000.0)
+
+    def orcamento_completo() -> bytes:
+        # Um custo de kit diferente a cada vez, para não acertar o cache de gráficos
+        entradas = {**orcamento.ENTRADAS_PADRAO, "custo_kit": next(custos_kit)}
+        resultado = orcamento.calcular_orcamento(
+            entradas, df_consumo, {"disp_imv1": 50}, **tabelas_orcamento
+        )
+        return criar_pdf(
+            orcamento.dados_pdf(entradas, resultado),
+            graficos.graficos_proposta(df_consumo, resultado),
+        )
+
+    return orcamento_completo
+
+
+# Nome do caso -> função que prepara os dados e devolve a chamada a medir
+CASOS: dict[str, Callable[[], Callable]] = {
+    "calculos.fluxo_caixa": lambda: _fluxo_caixa(1),
+    "calculos.fluxo_caixa[10000]": lambda: _fluxo_caixa(10_000),
+    "calculos.custo_projeto": lambda: _custo_projeto(1),
+    "calculos.custo_projeto[10000]": lambda: _custo_projeto(10_000),
+    "calculos.custo_total": _custo_total,
+    "calculos.orcamento_lote[10000]": lambda: _orcamento_lote(10_000),
+    "calculos.consumo_medio": _consumo_medio,
+    "orcamento.calcular_orcamento": _calcular_orcamento,
+    "gerador_pdf.criar_pdf": lambda: _criar_pdf(com_graficos=False),
+    "gerador_pdf.criar_pdf[graficos]": lambda: _criar_pdf(com_graficos=True),
+    "gerador_pdf.criar_pdf[otimizado]": lambda: _criar_pdf(True, "otimizado"),
+    "orcamento_completo": _orcamento_completo,
+}
+
+
+def _zip_propostas(n: int) -> None:
+    from benchmarks.pool_pdf import DADOS_EXEMPLO
+    from zip_pdf import ZipPDF
+
+    pngs = _graficos_png()
+    with tempfile.TemporaryDirectory() as pasta:
+        with ZipPDF(Path(pasta) / "propostas.zip") as arquivo_zip:
+            for i in range(n):
+                graficos = {nome: BytesIO(png) for nome, png in pngs.items()}
+                arquivo_zip.adicionar(f"proposta_{i}.pdf", DADOS_EXEMPLO, graficos)
+
+
+# Casos de memória: cada um roda num processo novo, e o resultado é o pico de RSS
+# (MiB) do processo inteiro. Com o ZIP em fluxo, o pico não cresce com o lote
+MEMORIA: dict[str, Callable[[], None]] = {
+    "memoria.zip[10]": lambda: _zip_propostas(10),
+    "memoria.zip[200]": lambda: _zip_propostas(200),
+}
+
+
+def _unidade(nome: str) -> str:
+    return "MiB" if nome in MEMORIA else "ms"
+
+
+def medir(chamada: Callable, amostras: int) -> float:
+    """Menor tempo, em ms por chamada, entre 'amostras' amostras de pelo menos
+    AMOSTRA_MINIMA s. O mínimo (como no timeit) é bem menos sensível que a mediana
+    à carga da máquina nas chamadas de poucos µs."""
+    inicio = time.perf_counter()
+    chamada()  # aquecimento (caches, modelo do pdf, importações tardias)
+    chamada()
+    por_chamada = max((time.perf_counter() - inicio) / 2, 1e-7)
+    bloco = max(1, int(AMOSTRA_MINIMA / por_chamada))
+    tempos = []
+    for _ in range(amostras):
+        inicio = time.perf_counter()
+        for _ in range(bloco):
+            chamada()
+        tempos.append((time.perf_counter() - inicio) / bloco)
+    return min(tempos) * 1000
+
+
+def pico_memoria(caso: str) -> float:
+    """Pico de memória residente (MiB) de um processo novo que roda o caso."""
+    saida = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"from benchmarks.suite import _rodar_memoria; _rodar_memoria({caso!r})",
+        ],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(saida)
+
+
+def _rodar_memoria(caso: str) -> None:
+    import resource
+
+    MEMORIA[caso]()
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)  # KiB no Linux
+
+
+def modulos() -> list[str]:
+    """Módulos do projeto, como listados no pyproject.toml."""
+    with open(RAIZ / "pyproject.toml", "rb") as arquivo:
+        return tomllib.load(arquivo)["tool"]["setuptools"]["py-modules"]
+
+
+def importacao(modulo: str, amostras: int) -> float:
+    """Mediana, em ms, do tempo de importação a frio (-X importtime) do módulo."""
+    return statistics.median(medir_importacao(modulo)[0] for _ in range(amostras))
+
+
+def rodar(filtros: list[str], amostras: int) -> dict[str, float]:
+    casos = {
+        **{nome: lambda p=p: medir(p(), amostras) for nome, p in CASOS.items()},
+        **{
+            f"importacao.{m}": lambda m=m: importacao(m, max(amostras // 2, 3))
+            for m in modulos()
+        },
+        **{nome: lambda nome=nome: pico_memoria(nome) for nome in MEMORIA},
+    }
+    resultados = {}
+    for nome, caso in casos.items():
+        if filtros and not any(f in nome for f in filtros):
+            continue
+        resultados[nome] = caso()
+        print(f"{nome:38s}: {resultados[nome]:10.3f} {_unidade(nome)}", flush=True)
+    return resultados
+
+
+def comparar(resultados: dict, referencia: dict, limite: float) -> list[str]:
+    """Imprime a variação de cada caso e devolve os que pioraram além do limite (%)."""
+    regressoes = []
+    print(f"\n{'caso':38s} {'referência':>11s} {'atual':>11s} {'variação':>9s}")
+    for nome, atual in resultados.items():
+        base = referencia.get(nome)
+        unidade = _unidade(nome)
+        if base is None:
+            print(f"{nome:38s} {'-':>11s} {atual:9.3f}{unidade} {'novo':>9s}")
+            continue
+        variacao = (atual / base - 1) * 100
+        marca = ""
+        if variacao > limite:
+            marca = "  REGRESSÃO"
+            regressoes.append(nome)
+        elif variacao < -limite:
+            marca = "  melhora"
+        print(
+            f"{nome:38s} {base:9.3f}{unidade} {atual:9.3f}{unidade} "
+            f"{variacao:+8.1f}%{marca}"
+        )
+    return regressoes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks do orçamento, com referência em JSON e comparação."
+    )
+    parser.add_argument(
+        "--casos", nargs="*", default=[], help="Só os casos cujo nome contém um destes"
+    )
+    parser.add_argument("--amostras", type=int, default=7)
+    parser.add_argument("--salvar", type=Path, help="Grava os resultados neste JSON")
+    parser.add_argument(
+        "--comparar", type=Path, help="Compara com a referência deste JSON"
+    )
+    parser.add_argument(
+        "--limite",
+        type=float,
+        default=20.0,
+        help="Piora (%%) a partir da qual um caso é regressão (padrão: 20)",
+    )
+    args = parser.parse_args()
+
+    resultados = rodar(args.casos, args.amostras)
+
+    if args.salvar:
+        args.salvar.write_text(
+            json.dumps(
+                {
+                    "data": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "maquina": platform.platform(),
+                    "unidade": "ms (memoria.*: MiB)",
+                    "casos": resultados,
+                },
+                indent=2,
+                ensure_ascii=False,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        print(f"\nReferência gravada em {args.salvar}")
+
+    if args.comparar:
+        referencia = json.loads(args.comparar.read_text(encoding="utf-8"))["casos"]
+        regressoes = comparar(resultados, referencia, args.limite)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressões acima de {args.limite:.0f}%.")
+            return 1
+        print(f"\nNenhuma regressão acima de {args.limite:.0f}%.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
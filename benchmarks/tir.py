@@ -0,0 +1,82 @@
+# benchmarks/tir.py
+# confere calculos.tir contra o numpy_financial.irr, em lote e num fluxo só,
+# inclusive os fluxos em que o Newton não converge e a TIR sai do fallback (ex.:
+# um investimento que não se paga), e mede o lote contra o irr um a um. Sai com
+# código 1 se algum resultado divergir
+#
+#   python -m benchmarks.tir --fluxos 2000
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import numpy_financial as npf
+
+import calculos
+
+# Fluxos de 25 anos em que o Newton, partindo de 10%, não converge
+SEM_CONVERGENCIA = (
+    [-1e6] + [1000.0] * 25,  # retorno_financeiro com total_projeto=1e6
+    [-50_000.0] + [150.0] * 25,  # kit de 0,1 kWp a R$ 50 mil
+    [-500_000.0] + [5_000.0] * 25,  # kit de 4,5 kWp a R$ 500 mil
+)
+
+
+def _confere(nome: str, obtido, esperado) -> bool:
+    certo = np.allclose(obtido, esperado, rtol=1e-6, atol=1e-9, equal_nan=True)
+    print(f"{nome:40s}: {'ok' if certo else f'DIVERGE ({obtido} != {esperado})'}")
+    return certo
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Confere e mede calculos.tir contra o numpy_financial."
+    )
+    parser.add_argument("--fluxos", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    lote = np.concatenate(
+        [
+            -rng.uniform(10_000, 60_000, (args.fluxos, 1)),
+            rng.uniform(1_000, 8_000, (args.fluxos, 25)),
+        ],
+        axis=1,
+    )
+    lote[::50] = SEM_CONVERGENCIA[0]  # alguns pendentes no meio do lote
+
+    inicio = time.perf_counter()
+    vetorizada = calculos.tir(lote)
+    tempo_lote = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    um_a_um = np.array([npf.irr(fluxo) for fluxo in lote])
+    tempo_irr = time.perf_counter() - inicio
+
+    certos = [_confere(f"lote[{args.fluxos}]", vetorizada, um_a_um)]
+    certos.append(
+        _confere(
+            "lote com 2 eixos (3, 1)",
+            calculos.tir(lote[:3].reshape(3, 1, -1)).ravel(),
+            um_a_um[:3],
+        )
+    )
+    for i, fluxo in enumerate(SEM_CONVERGENCIA):
+        certos.append(
+            _confere(
+                f"fluxo só, sem convergência [{i}]", calculos.tir(fluxo), npf.irr(fluxo)
+            )
+        )
+    certos.append(
+        _confere("fluxo só, sem troca de sinal", calculos.tir([1.0, 2.0]), np.nan)
+    )
+
+    print(
+        f"\nlote: {tempo_lote * 1000:.1f} ms; irr um a um: {tempo_irr * 1000:.1f} ms "
+        f"({tempo_irr / tempo_lote:.0f}x)"
+    )
+    return 0 if all(certos) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
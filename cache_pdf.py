@@ -0,0 +1,147 @@
+# cache_pdf.py
+# cache das propostas geradas, endereçado pelo conteúdo (dados + gráficos + template
+# + perfil do pdf).
+# O gerador_pdf (e com ele o fpdf2) só é importado na primeira proposta
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import date
+from io import BytesIO
+from pathlib import Path
+
+
+def _bytes_grafico(grafico) -> bytes:
+    if isinstance(grafico, BytesIO):
+        return grafico.getvalue()
+    if isinstance(grafico, (bytes, bytearray)):
+        return bytes(grafico)
+    return Path(grafico).read_bytes()
+
+
+def chave_proposta(dados: dict, graficos: dict, perfil: str = "padrao") -> str:
+    """Hash estável (sha256) de tudo o que define o conteúdo do PDF.
+
+    Entram os dados (em JSON canônico), os bytes de cada gráfico, a versão do
+    template, o perfil de saída e a data de hoje, já que criar_pdf imprime a data
+    de geração na assinatura.
+    """
+    from gerador_pdf import VERSAO_TEMPLATE
+
+    h = hashlib.sha256()
+    h.update(f"{VERSAO_TEMPLATE}|{perfil}|{date.today().isoformat()}|".encode())
+    h.update(json.dumps(dados, sort_keys=True, default=str).encode())
+    for nome in sorted(graficos):
+        h.update(f"|{nome}|".encode())
+        h.update(_bytes_grafico(graficos[nome]))
+    return h.hexdigest()
+
+
+class CachePDF:
+    """Cache LRU de PDFs em memória, com uma segunda camada opcional em disco.
+
+    A camada em memória guarda até max_itens PDFs. Se 'pasta' for informada, cada
+    PDF também é gravado em disco e a pasta é mantida abaixo de max_bytes_disco,
+    apagando primeiro os arquivos usados há mais tempo. Seguro para uso entre
+    threads (sessões do streamlit).
+    """
+
+    def __init__(
+        self,
+        max_itens: int = 64,
+        pasta: str | Path | None = None,
+        max_bytes_disco: int = 256 * 1024**2,
+    ):
+        self.max_itens = max_itens
+        self.pasta = Path(pasta) if pasta is not None else None
+        self.max_bytes_disco = max_bytes_disco
+        self._memoria: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.faltas = 0
+        if self.pasta is not None:
+            self.pasta.mkdir(parents=True, exist_ok=True)
+
+    def obter_ou_gerar(
+        self,
+        dados: dict,
+        graficos: dict,
+        gerar: Callable[..., bytes] | None = None,
+        perfil: str = "padrao",
+    ) -> bytes:
+        """Devolve o PDF do cache ou o gera com 'gerar' (padrão: criar_pdf) no
+        perfil de saída 'perfil' e guarda o resultado."""
+        chave = chave_proposta(dados, graficos, perfil)
+        pdf_bytes = self.obter(chave)
+        if pdf_bytes is None:
+            if gerar is None:
+                from gerador_pdf import criar_pdf as gerar
+            pdf_bytes = gerar(dados=dados, graficos=graficos, perfil=perfil)
+            self.guardar(chave, pdf_bytes)
+        return pdf_bytes
+
+    def obter(self, chave: str) -> bytes | None:
+        with self._lock:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                self.acertos_memoria += 1
+                return self._memoria[chave]
+
+            arquivo = self._arquivo(chave)
+            if arquivo is not None and arquivo.exists():
+                pdf_bytes = arquivo.read_bytes()
+                os.utime(arquivo)  # marca o uso para o descarte por LRU
+                self._guardar_memoria(chave, pdf_bytes)
+                self.acertos_disco += 1
+                return pdf_bytes
+
+            self.faltas += 1
+            return None
+
+    def guardar(self, chave: str, pdf_bytes: bytes) -> None:
+        with self._lock:
+            self._guardar_memoria(chave, pdf_bytes)
+            arquivo = self._arquivo(chave)
+            if arquivo is not None:
+                # Grava com outro nome e renomeia: outro processo nunca lê um pdf
+                # pela metade, nem fica com um truncado se este cair no meio
+                temporario = arquivo.with_suffix(f".{os.getpid()}.tmp")
+                temporario.write_bytes(pdf_bytes)
+                os.replace(temporario, arquivo)
+                self._limitar_disco()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            acertos = self.acertos_memoria + self.acertos_disco
+            total = acertos + self.faltas
+            return {
+                "acertos_memoria": self.acertos_memoria,
+                "acertos_disco": self.acertos_disco,
+                "faltas": self.faltas,
+                "taxa_acerto": acertos / total if total else 0.0,
+                "itens_memoria": len(self._memoria),
+            }
+
+    def _arquivo(self, chave: str) -> Path | None:
+        return self.pasta / f"{chave}.pdf" if self.pasta is not None else None
+
+    def _guardar_memoria(self, chave: str, pdf_bytes: bytes) -> None:
+        self._memoria[chave] = pdf_bytes
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_itens:
+            self._memoria.popitem(last=False)
+
+    def _limitar_disco(self) -> None:
+        arquivos = [(a, a.stat()) for a in self.pasta.glob("*.pdf")]
+        total = sum(info.st_size for _, info in arquivos)
+        if total <= self.max_bytes_disco:
+            return
+        for arquivo, info in sorted(arquivos, key=lambda item: item[1].st_mtime):
+            arquivo.unlink(missing_ok=True)
+            total -= info.st_size
+            if total <= self.max_bytes_disco:
+                break
@@ -1,28 +1,239 @@
 # calculos.py
-# separando a lógica matemática e financeira do app e do gerador de pdf
+# separando a lógica matemática e financeira do app e do gerador de pdf. Só depende
+# do NumPy: os DataFrames recebidos são lidos por to_numpy() e colunas, sem pandas
 
-import math
-import pandas as pd
+from __future__ import annotations
 
+from typing import TYPE_CHECKING, NamedTuple
 
-def consumo_medio(df_consumo: pd.DataFrame, dict_disponibilidades: dict):
-    consumo1 = df_consumo["imv1"].mean(skipna=False)
-    consumo2 = df_consumo["imv2"].mean(skipna=False)
-    consumo3 = df_consumo["imv3"].mean(skipna=False)
-    consumo4 = df_consumo["imv4"].mean(skipna=False)
+import numpy as np
 
-    if consumo2 + consumo3 + consumo4 < 1:
-        return consumo1 - dict_disponibilidades["disp_imv1"]
-    else:
-        return (
-            consumo1
-            + consumo2
-            - dict_disponibilidades["disp_imv2"]
-            + consumo3
-            - dict_disponibilidades["disp_imv3"]
-            + consumo4
-            - dict_disponibilidades["disp_imv4"]
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _matriz_consumo(df_consumo: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Consumos (meses x imóveis) e máscara dos meses informados (não vazios)."""
+    consumo = df_consumo.to_numpy(dtype=float, na_value=np.nan)
+    return consumo, ~np.isnan(consumo)
+
+
+def consumo_imoveis(
+    df_consumo: pd.DataFrame, dict_disponibilidades: dict
+) -> np.ndarray:
+    """Consumo médio mensal de cada imóvel menos a sua disponibilidade, em kWh.
+
+    Cada coluna de df_consumo é um imóvel (quantos forem, no autoconsumo remoto) e
+    cada linha um mês (12 meses ou um histórico de vários anos). Meses em branco
+    ficam fora da média do imóvel em vez de anular o resultado. Imóveis sem
+    consumo (só meses em branco ou zerados) valem zero e não descontam
+    disponibilidade. A disponibilidade do imóvel 'imvN' vem de
+    dict_disponibilidades['disp_imvN'] (zero se não houver).
+    """
+    media, disponibilidade = _medias_imoveis(df_consumo, dict_disponibilidades)
+    return np.where(media > 0, media - disponibilidade, 0.0)
+
+
+def disponibilidade_total(
+    df_consumo: pd.DataFrame, dict_disponibilidades: dict
+) -> float:
+    """Soma das disponibilidades (kWh/mês) dos imóveis com consumo."""
+    media, disponibilidade = _medias_imoveis(df_consumo, dict_disponibilidades)
+    return float(disponibilidade[media > 0].sum())
+
+
+def _medias_imoveis(
+    df_consumo: pd.DataFrame, dict_disponibilidades: dict
+) -> tuple[np.ndarray, np.ndarray]:
+    """Consumo médio dos meses informados e disponibilidade de cada imóvel."""
+    consumo, informados = _matriz_consumo(df_consumo)
+    meses = informados.sum(axis=0)
+    soma = np.where(informados, consumo, 0.0).sum(axis=0)
+    media = np.divide(soma, meses, out=np.zeros(len(meses)), where=meses > 0)
+    disponibilidade = np.array(
+        [dict_disponibilidades.get(f"disp_{imv}", 0) for imv in df_consumo.columns],
+        dtype=float,
+    )
+    return media, disponibilidade
+
+
+def consumo_medio(df_consumo: pd.DataFrame, dict_disponibilidades: dict) -> float:
+    """Consumo médio mensal a compensar, somado entre os imóveis (ver consumo_imoveis)."""
+    return float(consumo_imoveis(df_consumo, dict_disponibilidades).sum())
+
+
+def perfil_mensal(df_consumo: pd.DataFrame) -> np.ndarray:
+    """Consumo total dos imóveis em cada mês do ano (jan a dez), em kWh.
+
+    Com um histórico de vários anos (linhas em múltiplos de 12, a partir de
+    janeiro), cada mês é a média dos anos informados; meses sem nenhum valor
+    ficam zerados.
+    """
+    consumo, informados = _matriz_consumo(df_consumo)
+    if len(consumo) % 12:
+        raise ValueError(
+            f"O consumo deve ter 12 meses por ano, não {len(consumo)} linhas."
         )
+    consumo = np.where(informados, consumo, 0.0).reshape(-1, 12, consumo.shape[1])
+    anos = informados.reshape(consumo.shape).sum(axis=0)
+    media = np.divide(
+        consumo.sum(axis=0), anos, out=np.zeros(anos.shape), where=anos > 0
+    )
+    return media.sum(axis=1)
+
+
+class TabelaProjeto(NamedTuple):
+    """Tabela de preços de projeto compilada em arrays ordenados por faixa.
+
+    Cada faixa i cobre potências em (de[i], ate[i]] kWp e custa precos[i].
+    """
+
+    de: np.ndarray
+    ate: np.ndarray
+    precos: np.ndarray
+
+
+def tabela_projeto(df_projeto: pd.DataFrame | TabelaProjeto) -> TabelaProjeto:
+    """Compila o DataFrame de preços de projeto para buscas por searchsorted.
+
+    Compile uma vez e reutilize o resultado no lugar do DataFrame: todas as funções
+    que recebem df_projeto aceitam também uma TabelaProjeto.
+    """
+    if isinstance(df_projeto, TabelaProjeto):
+        return df_projeto
+    ordem = np.argsort(df_projeto["ate"].to_numpy(dtype=float))
+    tabela = TabelaProjeto(
+        de=df_projeto["de"].to_numpy(dtype=float)[ordem],
+        ate=df_projeto["ate"].to_numpy(dtype=float)[ordem],
+        precos=df_projeto["preco (R$)"].to_numpy(dtype=float)[ordem],
+    )
+    if np.any(tabela.de >= tabela.ate) or np.any(tabela.de[1:] < tabela.ate[:-1]):
+        raise ValueError("As faixas da tabela de projeto se sobrepõem ou estão vazias.")
+    return tabela
+
+
+class TabelaPreco(NamedTuple):
+    """Tabela de preços de serviços compilada em arrays (quantidade e valor unit.)."""
+
+    qtd: np.ndarray
+    valor_unit: np.ndarray
+
+
+def tabela_preco(df_preco: pd.DataFrame | TabelaPreco) -> TabelaPreco:
+    """Compila o DataFrame de preços de serviços em arrays, sem alterá-lo.
+
+    Como em tabela_projeto, compile uma vez e reutilize: as funções que recebem
+    df_preco aceitam também uma TabelaPreco.
+    """
+    if isinstance(df_preco, TabelaPreco):
+        return df_preco
+    return TabelaPreco(
+        qtd=df_preco["Qtd"].to_numpy(dtype=float, na_value=np.nan),
+        valor_unit=df_preco["Valor Unit (R$)"].to_numpy(dtype=float, na_value=np.nan),
+    )
+
+
+def orcamento_lote(
+    potencia_kit,
+    ganho_perda,
+    custo_kit,
+    lucro_inovasol,
+    comissao,
+    adicional_projeto,
+    df_projeto: pd.DataFrame | TabelaProjeto,
+    df_preco: pd.DataFrame | TabelaPreco,
+    df_impostos: pd.DataFrame,
+    potencia_referencia: float = 7.8,
+) -> dict:
+    """Calcula vários orçamentos de uma só vez, de forma vetorizada com NumPy.
+
+    Os argumentos numéricos podem ser escalares ou arrays (são combinados por
+    broadcasting), de modo que um catálogo inteiro de kits é precificado em uma
+    única passada. As tabelas (projeto, preço e impostos) são comuns a todos os
+    orçamentos. Percentuais seguem a mesma convenção das funções escalares (ex.: 30
+    para 30 %).
+
+    Retorna um dicionário de arrays com as chaves 'geracao_mensal', 'custo_projeto',
+    'sub_total', 'total_nf', 'total_projeto', 'custo_wp', 'custo_wp_inovasol' e
+    'custo_wp_equip'.
+    """
+    potencia_kit, ganho_perda, custo_kit, lucro_inovasol, comissao, adicional = (
+        np.broadcast_arrays(
+            *(
+                np.asarray(x, dtype=float)
+                for x in (
+                    potencia_kit,
+                    ganho_perda,
+                    custo_kit,
+                    lucro_inovasol,
+                    comissao,
+                    adicional_projeto,
+                )
+            )
+        )
+    )
+
+    geracao = _geracao_lote(potencia_kit, ganho_perda, potencia_referencia)
+    custo_proj = _custo_projeto_lote(potencia_kit, df_projeto, adicional)
+    sub_total = custo_servicos(df_preco) + custo_proj
+    total_nf, total_projeto = _totais(
+        sub_total, lucro_inovasol, comissao, df_impostos, custo_kit
+    )
+
+    return {
+        "geracao_mensal": geracao,
+        "custo_projeto": custo_proj,
+        "sub_total": sub_total,
+        "total_nf": total_nf,
+        "total_projeto": total_projeto,
+        "custo_wp": total_projeto / potencia_kit,
+        "custo_wp_inovasol": total_nf / potencia_kit,
+        "custo_wp_equip": custo_kit / potencia_kit,
+    }
+
+
+def _geracao_lote(potencia_kit, ganho_perda, potencia_referencia):
+    return ((potencia_kit * 1000) / potencia_referencia) * ((ganho_perda / 100) + 1)
+
+
+def _custo_projeto_lote(potencia_kit, df_projeto, adicional_projeto):
+    return (1 + adicional_projeto / 100) * _preco_projeto_lote(potencia_kit, df_projeto)
+
+
+def _preco_projeto_lote(potencia_kit, df_projeto) -> np.ndarray:
+    """Busca o preço de projeto da faixa (de, ate] de cada potência do array.
+
+    A busca é binária (searchsorted) sobre os limites das faixas. Potências acima
+    da última faixa são extrapoladas repetindo a largura e o incremento de preço
+    das duas últimas faixas; potências não positivas ou que caem num buraco da
+    tabela geram ValueError.
+    """
+    tabela = tabela_projeto(df_projeto)
+    potencia_kit = np.asarray(potencia_kit, dtype=float)
+
+    invalida = ~(potencia_kit > tabela.de[0])
+    idx = np.searchsorted(tabela.ate, potencia_kit, side="left")
+    acima = idx == len(tabela.ate)
+    idx = np.minimum(idx, len(tabela.ate) - 1)
+    invalida |= ~acima & ~(potencia_kit > tabela.de[idx])
+    if invalida.any():
+        raise ValueError(
+            "Potência fora das faixas da tabela de projeto: "
+            f"{potencia_kit[invalida]} kWp"
+        )
+
+    precos = tabela.precos[idx]
+    if acima.any():
+        if len(tabela.ate) < 2:
+            raise ValueError(
+                "Potência acima da tabela de projeto: "
+                f"{potencia_kit[acima]} kWp (máximo {tabela.ate[-1]} kWp)"
+            )
+        largura = tabela.ate[-1] - tabela.ate[-2]
+        incremento = tabela.precos[-1] - tabela.precos[-2]
+        faixas_extras = np.ceil((potencia_kit - tabela.ate[-1]) / largura)
+        precos = np.where(acima, precos + faixas_extras * incremento, precos)
+    return precos
 
 
 def geracao_mensal(
@@ -31,42 +242,383 @@ def geracao_mensal(
     """Calcula a geração média mensal com base em uma geração de referencia. Como referencia se considera uma geração de 1000 kWh/mês para a 'potencia_referencia.
     Ex. 7,8 kWp geram 1000 kWh/mês na inclinação 0° na região de Belo Horizonte. Estimativa conservadora.
     """
-    geracao_mensal = ((potencia_kit * 1000) / potencia_referencia) * (
-        (ganho_perda / 100) + 1
-    )
-    return geracao_mensal
+    return float(_geracao_lote(potencia_kit, ganho_perda, potencia_referencia))
 
 
 def custo_projeto(
-    potencia_kit: float, df_projeto: pd.DataFrame, adicional_projeto: float
+    potencia_kit: float,
+    df_projeto: pd.DataFrame | TabelaProjeto,
+    adicional_projeto: float,
 ) -> float:
-    mask = (potencia_kit > df_projeto["de"]) & (potencia_kit <= df_projeto["ate"])
-    preco_projeto = df_projeto.loc[mask, "preco (R$)"].iloc[0]
-    return (1 + adicional_projeto / 100) * preco_projeto
+    return float(_custo_projeto_lote(potencia_kit, df_projeto, adicional_projeto))
+
+
+def custo_servicos(df_preco: pd.DataFrame | TabelaPreco) -> float:
+    """Soma de Qtd x Valor Unit da tabela de preços.
+
+    Linhas incompletas (ex.: uma linha nova na tabela editada do app) contam como
+    zero.
+    """
+    tabela = tabela_preco(df_preco)
+    return float(np.nansum(tabela.qtd * tabela.valor_unit))
+
+
+def _totais(sub_total, lucro_inovasol, comissao, df_impostos, custo_kit):
+    """Valor da NF (com lucro, comissão e impostos por dentro) e total do projeto."""
+    valor_lucro = (lucro_inovasol / 100) * sub_total
+    valor_comissao = (comissao / 100) * sub_total
+    valor_impostos = df_impostos["Valor"].to_numpy(dtype=float).sum() / 100
+    total_nf = (sub_total + valor_lucro + valor_comissao) / (1 - valor_impostos)
+    return total_nf, total_nf + custo_kit
 
 
 def custo_total(dict_custos: dict) -> dict:
-    dict_return = {}
-    custo_proj = custo_projeto(
+    """Valor da NF e total do projeto de um orçamento.
+
+    Só lê as tabelas de dict_custos (não grava colunas nelas), então pode ser
+    chamada de várias threads com as mesmas tabelas.
+    """
+    sub_total = custo_servicos(dict_custos["df_preco"]) + custo_projeto(
         dict_custos["potencia_kit"],
         dict_custos["df_projeto"],
         dict_custos["adicional_projeto"],
     )
-    df_preco = dict_custos["df_preco"]
-    df_preco["valor_total"] = df_preco["Qtd"] * df_preco["Valor Unit (R$)"]
-    sub_total = df_preco["valor_total"].sum() + custo_proj
-    lucro_inovasol = (dict_custos["lucro_inovasol"] / 100) * sub_total
-    comissao = (dict_custos["comissao"] / 100) * sub_total
-    valor_impostos = dict_custos["df_impostos"]["Valor"].sum() / 100
-    dict_return["total_nf"] = (sub_total + lucro_inovasol + comissao) / (
-        1 - valor_impostos
+    total_nf, total_projeto = _totais(
+        sub_total,
+        dict_custos["lucro_inovasol"],
+        dict_custos["comissao"],
+        dict_custos["df_impostos"],
+        dict_custos["custo_kit"],
     )
-    dict_return["total_projeto"] = dict_return["total_nf"] + dict_custos["custo_kit"]
-    return dict_return
+    return {"total_nf": float(total_nf), "total_projeto": float(total_projeto)}
+
+
+def tarifa_com_impostos(tarifa: float, icms: float, pis: float, cofins: float):
+    """Aplica PIS/COFINS e ICMS (por dentro) a uma tarifa. Percentuais em %."""
+    return tarifa / (1 - (pis / 100) - (cofins / 100)) / (1 - (icms / 100))
+
+
+# Percentual do Fio B cobrado sobre a energia injetada na transição da Lei 14.300/2022.
+# A partir de 2029 considera-se a cobrança integral.
+FIO_B_LEI_14300 = {2023: 15, 2024: 30, 2025: 45, 2026: 60, 2027: 75, 2028: 90}
+
+
+def percentual_fio_b(ano) -> np.ndarray:
+    """Fração (0 a 1) do Fio B paga sobre a energia injetada em cada ano civil."""
+    ano = np.asarray(ano)
+    anos_tabela = np.fromiter(FIO_B_LEI_14300.keys(), dtype=int)
+    pct_tabela = np.fromiter(FIO_B_LEI_14300.values(), dtype=float) / 100
+    idx = np.clip(ano - anos_tabela[0], 0, len(anos_tabela) - 1)
+    return np.where(
+        ano < anos_tabela[0],
+        0.0,
+        np.where(ano > anos_tabela[-1], 1.0, pct_tabela[idx]),
+    )
+
+
+def fluxo_caixa(
+    investimento,
+    geracao_mensal,
+    tarifa_tusd,
+    tarifa_te,
+    fator_simultaneidade,
+    custo_fio_b,
+    tma,
+    anos: int = 25,
+    reajuste_tarifa=6.0,
+    degradacao=0.5,
+    ano_inicio: int = 2026,
+    consumo_mensal=None,
+) -> dict:
+    """Fluxo de caixa do sistema fotovoltaico, calculado mês a mês com NumPy.
+
+    A economia de cada mês é a energia gerada (com degradação anual dos módulos)
+    valorada pela tarifa cheia (TUSD + TE com impostos, reajustada a cada ano),
+    descontando o Fio B sobre a parcela injetada na rede (1 - fator de
+    simultaneidade), conforme a transição da Lei 14.300. Se consumo_mensal (kWh)
+    for informado, só a energia até o consumo gera economia; o excedente não é
+    valorado.
+
+    Tarifas e Fio B em R$/kWh já com impostos; tma, reajuste_tarifa e degradacao
+    em % a.a.; fator_simultaneidade entre 0 e 1. Todos os parâmetros numéricos
+    (exceto anos e ano_inicio) aceitam arrays e são combinados por broadcasting:
+    os resultados ganham o eixo do tempo como último eixo, o que permite avaliar
+    milhares de cenários de uma vez.
+    """
+    investimento, geracao_mensal, tarifa, fator_simultaneidade, custo_fio_b = (
+        np.asarray(x, dtype=float)[..., None]
+        for x in (
+            investimento,
+            geracao_mensal,
+            np.add(tarifa_tusd, tarifa_te),
+            fator_simultaneidade,
+            custo_fio_b,
+        )
+    )
+    tma, reajuste_tarifa, degradacao = (
+        np.asarray(x, dtype=float) / 100 for x in (tma, reajuste_tarifa, degradacao)
+    )
+
+    ano = np.arange(anos)
+    fator_degradacao = (1 - degradacao[..., None]) ** ano
+    fator_reajuste = (1 + reajuste_tarifa[..., None]) ** ano
+    fio_b = custo_fio_b * percentual_fio_b(ano_inicio + ano)
+
+    # Economia média mensal de cada ano, repetida nos 12 meses
+    energia = geracao_mensal * fator_degradacao
+    energia_injetada = (1 - fator_simultaneidade) * energia
+    if consumo_mensal is not None:
+        energia = np.minimum(
+            energia, np.asarray(consumo_mensal, dtype=float)[..., None]
+        )
+        energia_injetada = (1 - fator_simultaneidade) * energia
+    economia_anual = 12 * fator_reajuste * (energia * tarifa - energia_injetada * fio_b)
+    economia_mensal = np.repeat(economia_anual / 12, 12, axis=-1)
+    return _indicadores(investimento, economia_anual, economia_mensal, tma)
+
+
+def fluxo_economia(investimento, economia_mensal, tma) -> dict:
+    """Fluxo de caixa e indicadores a partir da economia de cada mês, já calculada.
+
+    economia_mensal (R$) tem os meses no último eixo, em anos completos, como a
+    economia de compensacao.simular achatada em (..., anos * 12). tma em % a.a.
+    Retorna as mesmas chaves de fluxo_caixa.
+    """
+    economia_mensal = np.asarray(economia_mensal, dtype=float)
+    economia_anual = economia_mensal.reshape(economia_mensal.shape[:-1] + (-1, 12)).sum(
+        axis=-1
+    )
+    return _indicadores(
+        np.asarray(investimento, dtype=float)[..., None],
+        economia_anual,
+        economia_mensal,
+        np.asarray(tma, dtype=float) / 100,
+    )
+
+
+def _indicadores(investimento, economia_anual, economia_mensal, tma) -> dict:
+    # investimento (..., 1), economias (..., anos) e (..., meses), tma em fração
+    fluxo_mensal = _com_investimento(investimento, economia_mensal)
+    fluxo_anual = _com_investimento(investimento, economia_anual)
+
+    tma_mensal = (1 + tma) ** (1 / 12) - 1
+    fluxo_mensal_descontado = fluxo_mensal * _fator_desconto(
+        tma_mensal, fluxo_mensal.shape[-1]
+    )
+    fluxo_anual_descontado = fluxo_anual * _fator_desconto(tma, fluxo_anual.shape[-1])
+
+    return {
+        "economia_anual": economia_anual,
+        "economia_mensal": economia_mensal,
+        "fluxo_mensal": fluxo_mensal,
+        "fluxo_anual": fluxo_anual,
+        "fluxo_acumulado": np.cumsum(fluxo_anual, axis=-1),
+        "fluxo_descontado_acumulado": np.cumsum(fluxo_anual_descontado, axis=-1),
+        "vpl": fluxo_anual_descontado.sum(axis=-1),
+        "tir": tir(fluxo_anual),
+        "payback": payback(fluxo_mensal) / 12,
+        "payback_descontado": payback(fluxo_mensal_descontado) / 12,
+    }
+
+
+def _com_investimento(investimento: np.ndarray, fluxo: np.ndarray) -> np.ndarray:
+    """Prefixa o fluxo com o desembolso inicial (período 0)."""
+    lote = np.broadcast_shapes(investimento.shape[:-1], fluxo.shape[:-1])
+    return np.concatenate(
+        [
+            np.broadcast_to(-investimento, lote + (1,)),
+            np.broadcast_to(fluxo, lote + fluxo.shape[-1:]),
+        ],
+        axis=-1,
+    )
+
+
+def _fator_desconto(taxa, periodos: int) -> np.ndarray:
+    return (1 + np.asarray(taxa)[..., None]) ** -np.arange(periodos)
+
+
+def payback(fluxo) -> np.ndarray:
+    """Número de períodos (fracionário) até o fluxo acumulado ficar positivo.
+
+    Interpola linearmente dentro do período da virada. Retorna NaN quando o
+    investimento não se paga no horizonte do fluxo.
+    """
+    fluxo = np.asarray(fluxo, dtype=float)
+    acumulado = np.cumsum(fluxo, axis=-1)
+    positivo = acumulado >= 0
+    idx = np.argmax(positivo, axis=-1)[..., None]
+    anterior = np.take_along_axis(acumulado, np.maximum(idx - 1, 0), axis=-1)
+    no_periodo = np.take_along_axis(fluxo, idx, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        periodos = np.where(idx > 0, idx - 1 - anterior / no_periodo, 0.0)[..., 0]
+    return np.where(positivo.any(axis=-1), periodos, np.nan)
+
+
+def tir(fluxo, chute: float = 0.1, iteracoes: int = 50) -> np.ndarray:
+    """Taxa interna de retorno de um ou vários fluxos (tempo no último eixo).
+
+    Resolve todos os fluxos de uma vez por Newton-Raphson vetorizado; os que não
+    convergirem caem no numpy_financial.irr, um a um.
+    """
+    fluxo = np.asarray(fluxo, dtype=float)
+    # Períodos na frente e fluxos lado a lado: o VPL é um polinômio em
+    # x = 1 / (1 + taxa), avaliado com a derivada pelo método de Horner
+    coeficientes = np.moveaxis(fluxo, -1, 0).reshape(fluxo.shape[-1], -1)
+    taxa = np.full(coeficientes.shape[1], chute)
+    convergiu = np.zeros(coeficientes.shape[1], dtype=bool)
+    vpl, derivada = np.empty_like(taxa), np.empty_like(taxa)
+    with np.errstate(all="ignore"):
+        for _ in range(iteracoes):
+            x = 1 / (1 + taxa)
+            vpl[:] = derivada[:] = 0.0
+            for valor in coeficientes[::-1]:
+                derivada *= x
+                derivada += vpl
+                vpl *= x
+                vpl += valor
+            # d(VPL)/d(taxa) = -x² P'(x)
+            passo = vpl / (-x * x * derivada)
+            taxa = np.maximum(taxa - passo, -0.99)
+            convergiu = np.abs(passo) < 1e-10
+            if convergiu.all():
+                break
+    taxa = taxa.reshape(fluxo.shape[:-1])
+    convergiu = convergiu.reshape(fluxo.shape[:-1])
+
+    # Sem troca de sinal não existe TIR
+    tem_tir = (fluxo.min(axis=-1) < 0) & (fluxo.max(axis=-1) > 0)
+    pendentes = tem_tir & ~(convergiu & np.isfinite(taxa))
+    if pendentes.any():
+        import numpy_financial as npf
+
+        # Numa vista 1-d, que também cobre um fluxo só (pendentes com 0 dimensões)
+        fluxos = fluxo.reshape(-1, fluxo.shape[-1])
+        taxas = np.array(taxa, dtype=float).reshape(-1)
+        for i in np.flatnonzero(pendentes):
+            taxas[i] = npf.irr(fluxos[i])
+        taxa = taxas.reshape(pendentes.shape)
+    return np.where(tem_tir, taxa, np.nan)
+
+
+def indicadores_economia(investimento, economia, tma) -> dict:
+    """VPL, TIR e paybacks direto da economia (R$) em (..., anos, 12).
+
+    Dá os mesmos 'vpl', 'tir', 'payback' e 'payback_descontado' de
+    fluxo_economia sem montar os fluxos mês a mês: com economia que não fica
+    negativa o acumulado só cresce, então a virada é achada nas somas anuais e
+    só o ano dela é percorrido mês a mês. É o caminho dos lotes grandes (a
+    análise de risco, com economia de compensacao.economia). Havendo economia
+    negativa, cai em fluxo_economia.
+    """
+    economia = np.asarray(economia, dtype=float)
+    anos = economia.shape[-2]
+    lote = np.broadcast_shapes(
+        economia.shape[:-2], np.shape(investimento), np.shape(tma)
+    )
+    if (economia < 0).any():
+        resultado = fluxo_economia(
+            investimento, economia.reshape(economia.shape[:-2] + (-1,)), tma
+        )
+        return {
+            chave: np.broadcast_to(resultado[chave], lote)
+            for chave in ("vpl", "tir", "payback", "payback_descontado")
+        }
+
+    # Cenários no último eixo, (anos, 12, n): contíguo quando vem de
+    # compensacao.economia, que já calcula assim
+    n = int(np.prod(lote))
+    economia = np.moveaxis(
+        np.broadcast_to(economia, lote + (anos, 12)).reshape(n, anos, 12), 0, -1
+    )
+    investimento = np.broadcast_to(np.asarray(investimento, dtype=float), lote).ravel()
+    taxa = np.broadcast_to(np.asarray(tma, dtype=float) / 100, lote).ravel()
+
+    anual = economia.sum(axis=1)
+    desconto_anual = (1 + taxa) ** -np.arange(anos + 1)[:, None]
+    # Mês m do ano a descontado por (1 + tma) ** -(a + (m + 1) / 12)
+    peso_mes = (1 + taxa) ** -(np.arange(1, 13)[:, None] / 12)
+    anual_descontado = np.einsum("amn,mn->an", economia, peso_mes) * desconto_anual[:-1]
+
+    fluxo_anual = np.concatenate([-investimento[None], anual])
+    return {
+        "vpl": (fluxo_anual * desconto_anual).sum(axis=0).reshape(lote),
+        "tir": tir(fluxo_anual.T).reshape(lote),
+        "payback": _payback_anual(investimento, economia, anual).reshape(lote),
+        "payback_descontado": _payback_anual(
+            investimento, economia, anual_descontado, peso_mes, desconto_anual
+        ).reshape(lote),
+    }
+
+
+def _payback_anual(
+    investimento, economia, anual, peso_mes=None, desconto_anual=None
+) -> np.ndarray:
+    # Payback (anos) com economia (anos, 12, n) >= 0 e suas somas anuais (anos, n),
+    # descontadas com peso_mes (12, n) e desconto_anual (anos, n) se vierem
+    anos, _, n = economia.shape
+    cenario = np.arange(n)
+    acumulado = np.cumsum(anual, axis=0)
+    ano = (acumulado < investimento).sum(axis=0)  # anos inteiros antes da virada
+    pagou = ano < anos
+    ano = np.minimum(ano, anos - 1)
+    mensal = economia[ano, :, cenario].T
+    if peso_mes is not None:
+        mensal = mensal * peso_mes * desconto_anual[ano, cenario]
+    antes = np.where(ano > 0, acumulado[ano - 1, cenario], 0.0) - investimento
+    acumulado_mes = antes + np.cumsum(mensal, axis=0)
+    mes = np.minimum((acumulado_mes < 0).sum(axis=0), 11)
+    no_mes = mensal[mes, cenario]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        periodos = 12 * ano + mes - (acumulado_mes[mes, cenario] - no_mes) / no_mes
+    return np.where(investimento <= 0, 0.0, np.where(pagou, periodos / 12, np.nan))
 
 
 def retorno_financeiro(dict_custos: dict, tma: float, prazo_vpl: int) -> dict:
-    dict_retorno = {}
+    """Indicadores de retorno (VPL, TIR, paybacks e fluxos) de um orçamento.
+
+    dict_custos deve conter 'total_projeto', 'geracao_mensal', 'tarifa_tusd',
+    'tarifa_te', 'fator_simultaneidade' e 'custo_fio_b' (tarifas em R$/kWh com
+    impostos) e, opcionalmente, 'reajuste_tarifa', 'degradacao' (% a.a.),
+    'ano_inicio' e 'consumo_mensal' (kWh). tma em % a.a. e prazo_vpl em anos.
+
+    Com 'economia_mensal' (R$ por mês, prazo_vpl * 12 valores, ex.: a simulação
+    da compensação), o fluxo parte dela e as tarifas não são usadas.
+    """
+    if "economia_mensal" in dict_custos:
+        fluxo = fluxo_economia(
+            dict_custos["total_projeto"],
+            np.asarray(dict_custos["economia_mensal"])[: prazo_vpl * 12],
+            tma,
+        )
+    else:
+        opcionais = {
+            chave: dict_custos[chave]
+            for chave in (
+                "reajuste_tarifa",
+                "degradacao",
+                "ano_inicio",
+                "consumo_mensal",
+            )
+            if chave in dict_custos
+        }
+        fluxo = fluxo_caixa(
+            investimento=dict_custos["total_projeto"],
+            geracao_mensal=dict_custos["geracao_mensal"],
+            tarifa_tusd=dict_custos["tarifa_tusd"],
+            tarifa_te=dict_custos["tarifa_te"],
+            fator_simultaneidade=dict_custos["fator_simultaneidade"],
+            custo_fio_b=dict_custos["custo_fio_b"],
+            tma=tma,
+            anos=prazo_vpl,
+            **opcionais,
+        )
+    dict_retorno = {
+        chave: float(fluxo[chave])
+        for chave in ("vpl", "tir", "payback", "payback_descontado")
+    }
+    dict_retorno["economia_primeiro_ano"] = float(fluxo["economia_anual"][0])
+    for chave in ("fluxo_anual", "fluxo_acumulado", "fluxo_mensal"):
+        dict_retorno[chave] = fluxo[chave]
     return dict_retorno
 
 
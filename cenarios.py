@@ -0,0 +1,140 @@
+# cenarios.py
+# análise de sensibilidade: avalia uma grade inteira de cenários de uma vez
+
+import numpy as np
+
+import calculos
+import compensacao
+
+EIXOS = ("tma", "reajuste_tarifa", "lucro_inovasol", "comissao")
+
+
+def grade_cenarios(
+    dict_base: dict,
+    tma,
+    reajuste_tarifa,
+    lucro_inovasol,
+    comissao,
+    payback_alvo: float | None = None,
+    anos: int = 25,
+    descontado: bool = False,
+) -> dict:
+    """Avalia payback, TIR e VPL para todas as combinações dos quatro eixos.
+
+    dict_base reúne os dados fixos do orçamento: as chaves de calculos.custo_total
+    (exceto lucro e comissão) e as de calculos.retorno_financeiro (exceto
+    'total_projeto'). Cada eixo é um array 1D; os resultados têm forma
+    (tma, reajuste_tarifa, lucro_inovasol, comissao).
+
+    Nada é calculado em laço: o investimento é calculado uma vez por par
+    (lucro, comissão) com calculos.orcamento_lote, a economia uma vez por reajuste
+    e a grade completa sai do broadcasting entre eles. Com 'perfil_geracao' e
+    'perfil_consumo' em dict_base (o dict_fluxo do orçamento), a economia vem de
+    compensacao.simular, como no payback do orçamento; sem eles, de
+    calculos.fluxo_caixa, limitada por 'consumo_mensal' se houver.
+
+    Se payback_alvo (anos) for informado, retorna também 'lucro_maximo' e
+    'preco_maximo' com forma (tma, reajuste_tarifa, comissao): o maior lucro da
+    grade, e o respectivo preço, cujo payback ainda atende o alvo (NaN se nenhum
+    atende). descontado=True usa o payback descontado na comparação.
+    """
+    eixos = {
+        nome: np.atleast_1d(np.asarray(valores, dtype=float))
+        for nome, valores in zip(
+            EIXOS, (tma, reajuste_tarifa, lucro_inovasol, comissao)
+        )
+    }
+    tma, reajuste_tarifa, lucro_inovasol, comissao = (
+        _no_eixo(valores, i) for i, valores in enumerate(eixos.values())
+    )
+
+    lote = calculos.orcamento_lote(
+        potencia_kit=dict_base["potencia_kit"],
+        ganho_perda=0,
+        custo_kit=dict_base["custo_kit"],
+        lucro_inovasol=lucro_inovasol,
+        comissao=comissao,
+        adicional_projeto=dict_base["adicional_projeto"],
+        df_projeto=dict_base["df_projeto"],
+        df_preco=dict_base["df_preco"],
+        df_impostos=dict_base["df_impostos"],
+    )
+    if "perfil_consumo" in dict_base:
+        # Economia mês a mês da simulação da compensação, uma vez por reajuste
+        simulacao = compensacao.simular(
+            dict_base["perfil_geracao"],
+            dict_base["perfil_consumo"],
+            dict_base["tarifa_tusd"],
+            dict_base["tarifa_te"],
+            dict_base["custo_fio_b"],
+            dict_base["fator_simultaneidade"],
+            disponibilidade=dict_base.get("disponibilidade", 0.0),
+            anos=anos,
+            reajuste_tarifa=reajuste_tarifa,
+            degradacao=dict_base.get("degradacao", 0.5),
+            ano_inicio=dict_base.get("ano_inicio", 2026),
+        )
+        fluxo = calculos.fluxo_economia(
+            lote["total_projeto"],
+            simulacao["economia"].reshape(reajuste_tarifa.shape + (-1,)),
+            tma=tma,
+        )
+    else:
+        fluxo = calculos.fluxo_caixa(
+            investimento=lote["total_projeto"],
+            geracao_mensal=dict_base["geracao_mensal"],
+            tarifa_tusd=dict_base["tarifa_tusd"],
+            tarifa_te=dict_base["tarifa_te"],
+            fator_simultaneidade=dict_base["fator_simultaneidade"],
+            custo_fio_b=dict_base["custo_fio_b"],
+            tma=tma,
+            anos=anos,
+            reajuste_tarifa=reajuste_tarifa,
+            degradacao=dict_base.get("degradacao", 0.5),
+            ano_inicio=dict_base.get("ano_inicio", 2026),
+            consumo_mensal=dict_base.get("consumo_mensal"),
+        )
+
+    forma = tuple(len(valores) for valores in eixos.values())
+    resultado = {
+        "eixos": eixos,
+        "total_projeto": np.broadcast_to(lote["total_projeto"], forma),
+    }
+    for chave in ("payback", "payback_descontado", "tir", "vpl"):
+        resultado[chave] = np.broadcast_to(fluxo[chave], forma)
+
+    if payback_alvo is not None:
+        resultado.update(
+            _lucro_maximo(
+                resultado["payback_descontado" if descontado else "payback"],
+                resultado["total_projeto"],
+                eixos["lucro_inovasol"],
+                payback_alvo,
+            )
+        )
+    return resultado
+
+
+def _no_eixo(valores: np.ndarray, eixo: int) -> np.ndarray:
+    """Posiciona um array 1D no eixo informado da grade de 4 dimensões."""
+    forma = [1] * len(EIXOS)
+    forma[eixo] = -1
+    return valores.reshape(forma)
+
+
+def _lucro_maximo(
+    payback: np.ndarray,
+    total_projeto: np.ndarray,
+    lucros: np.ndarray,
+    payback_alvo: float,
+) -> dict:
+    atende = payback <= payback_alvo
+    lucro = np.where(atende, lucros[:, None], -np.inf)
+    idx = np.argmax(lucro, axis=2)[:, :, None, :]
+    algum = atende.any(axis=2)
+    return {
+        "lucro_maximo": np.where(algum, lucros[idx[:, :, 0, :]], np.nan),
+        "preco_maximo": np.where(
+            algum, np.take_along_axis(total_projeto, idx, axis=2)[:, :, 0, :], np.nan
+        ),
+    }
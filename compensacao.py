@@ -0,0 +1,341 @@
+# compensacao.py
+# simulação do sistema de compensação de energia (Lei 14.300) mês a mês: autoconsumo
+# instantâneo, energia injetada, Fio B sobre a energia compensada e banco de
+# créditos com validade de 60 meses. Alimenta a "Nova Conta" e a "Economia 1º Ano"
+
+import numpy as np
+
+import calculos
+
+# Meses de validade dos créditos de energia injetada
+VALIDADE_CREDITOS = 60
+
+DIAS_MES = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+# Perfis diários (peso de cada hora) do modo horário: geração em sino entre 6h e
+# 18h e um consumo residencial com pico no início da noite
+PERFIL_SOLAR = np.clip(np.sin(np.pi * (np.arange(24) + 0.5 - 6) / 12), 0, None)
+PERFIL_CONSUMO = np.array(
+    [2, 2, 2, 2, 2, 3, 4, 4, 4, 3, 3, 3, 4, 3, 3, 3, 4, 5, 7, 8, 7, 6, 4, 3],
+    dtype=float,
+)
+
+
+def _por_hora(mensal: np.ndarray, perfil) -> np.ndarray:
+    """Distribui totais mensais (..., 12) pelas 8760 horas do ano conforme o perfil.
+
+    O perfil pode ter 24 pesos (o mesmo dia o ano todo) ou 8760 (um ano inteiro);
+    dentro de cada mês ele é normalizado para somar o total do mês.
+    """
+    perfil = np.asarray(perfil, dtype=float)
+    if perfil.shape == (24,):
+        perfil = np.tile(perfil, 365)
+    if perfil.shape != (8760,):
+        raise ValueError("O perfil horário deve ter 24 ou 8760 valores.")
+    mes_da_hora = np.repeat(np.arange(12), DIAS_MES * 24)
+    total_mes = np.bincount(mes_da_hora, weights=perfil, minlength=12)
+    return mensal[..., mes_da_hora] * (perfil / total_mes[mes_da_hora])
+
+
+def _autoconsumo_horario(
+    geracao: np.ndarray, consumo: np.ndarray, perfil_geracao, perfil_consumo
+) -> np.ndarray:
+    """Autoconsumo (..., anos, 12) pelo mínimo hora a hora entre geração e consumo."""
+    geracao_hora = _por_hora(geracao, perfil_geracao)
+    consumo_hora = _por_hora(consumo, perfil_consumo)
+    inicio_mes = np.r_[0, np.cumsum(DIAS_MES * 24)[:-1]]
+    return np.add.reduceat(np.minimum(geracao_hora, consumo_hora), inicio_mes, axis=-1)
+
+
+def _meses(x: np.ndarray) -> np.ndarray:
+    """(..., 1) ou escalar -> o mesmo valor nos 12 meses; (..., 12) fica como está."""
+    x = np.atleast_1d(x)
+    return np.broadcast_to(x, x.shape[:-1] + (12,))
+
+
+class _BancoCreditos:
+    """Banco de créditos de um lote de cenários, avançado um mês por vez.
+
+    Cada mês compensa primeiro com a própria energia injetada e depois com os
+    créditos mais antigos. A sobra vira crédito, que vale pelos 'validade' meses
+    seguintes e depois expira. Como os créditos saem sempre do mais antigo, o banco
+    é um trecho do acumulado das sobras: entre o que já saiu (usado ou expirado) e
+    o que já entrou. Basta guardar os acumulados dos últimos 'validade' meses, e
+    cada mês custa poucas operações por cenário, vetorizadas no lote.
+    """
+
+    def __init__(self, forma: tuple, validade: int):
+        self.validade = validade
+        self.mes = 0
+        self.saiu = np.zeros(forma)
+        # Créditos que entraram antes de cada um dos últimos 'validade' meses, em
+        # rodízio: o do mês t fica na posição t % validade
+        self._entrou = np.zeros((validade,) + forma)
+        self._banco = np.empty(forma)
+
+    def compensar(self, falta, sobra, usada, expirada=None) -> None:
+        """Usa créditos para a falta do mês (grava em usada) e guarda a sobra.
+
+        falta é o consumo compensável que a injeção do mês não cobriu e sobra é a
+        injeção que passou dele; com expirada, grava também o que expirou no mês.
+        """
+        entrou = self._entrou[self.mes % self.validade]
+        # Ainda guarda o que tinha entrado 'validade' meses atrás; vira o próximo
+        proximo = self._entrou[(self.mes + 1) % self.validade]
+        np.subtract(entrou, self.saiu, out=self._banco)
+        np.maximum(self._banco, 0, out=self._banco)
+        np.minimum(falta, self._banco, out=usada)
+        self.saiu += usada
+        if self.mes + 1 >= self.validade:
+            # O que resta dos créditos de 'validade' meses atrás expira
+            if expirada is not None:
+                np.subtract(proximo, self.saiu, out=expirada)
+                np.maximum(expirada, 0, out=expirada)
+            np.maximum(self.saiu, proximo, out=self.saiu)
+        elif expirada is not None:
+            expirada[...] = 0
+        np.add(entrou, sobra, out=proximo)
+        self.mes += 1
+
+    def saldo(self, out) -> None:
+        """Créditos no banco depois do último mês compensado."""
+        np.subtract(self._entrou[self.mes % self.validade], self.saiu, out=out)
+        np.maximum(out, 0, out=out)
+
+
+def _banco_creditos(
+    injetada: np.ndarray, compensavel: np.ndarray, validade: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compensação mês a mês com o banco de créditos (ver _BancoCreditos).
+
+    Retorna (compensada, expirada, saldo), com a forma de injetada (..., meses).
+    """
+    direta = np.minimum(injetada, compensavel)
+    # Meses no primeiro eixo e cenários achatados num só, para que cada mês seja
+    # um bloco contíguo na memória
+    meses = injetada.shape[-1]
+    falta, sobra = (
+        np.moveaxis(x, -1, 0).reshape(meses, -1)
+        for x in (compensavel - direta, injetada - direta)
+    )
+    usada, expirada, saldo = (np.empty_like(falta) for _ in range(3))
+    banco = _BancoCreditos(falta.shape[1:], validade)
+    for mes in range(meses):
+        banco.compensar(falta[mes], sobra[mes], usada[mes], expirada[mes])
+        banco.saldo(saldo[mes])
+    usada, expirada, saldo = (
+        np.moveaxis(x.reshape((meses,) + injetada.shape[:-1]), 0, -1)
+        for x in (usada, expirada, saldo)
+    )
+    return direta + usada, expirada, saldo
+
+
+def simular(
+    geracao_mensal,
+    consumo_mensal,
+    tarifa_tusd,
+    tarifa_te,
+    custo_fio_b,
+    fator_simultaneidade,
+    disponibilidade=0.0,
+    anos: int = 25,
+    reajuste_tarifa=6.0,
+    degradacao=0.5,
+    ano_inicio: int = 2026,
+    validade: int = VALIDADE_CREDITOS,
+    horario: bool = False,
+    perfil_geracao=PERFIL_SOLAR,
+    perfil_consumo=PERFIL_CONSUMO,
+) -> dict:
+    """Simula a conta de energia com o sistema, mês a mês, por 'anos' anos.
+
+    geracao_mensal e consumo_mensal (kWh) são um valor para todos os meses ou 12
+    valores no último eixo (jan a dez, repetidos todo ano); disponibilidade é o
+    consumo mínimo faturado (kWh por mês). Tarifas e Fio B em R$/kWh já com impostos, reajustadas a cada ano;
+    reajuste_tarifa e degradacao em % a.a. Os parâmetros numéricos aceitam arrays
+    e são combinados por broadcasting: os resultados ganham (anos, 12) como
+    últimos eixos.
+
+    A cada mês, a fração fator_simultaneidade da geração é consumida na hora (até o
+    consumo do mês) e o restante é injetado. A energia injetada compensa o consumo
+    da rede acima da disponibilidade, pagando o Fio B da Lei 14.300 sobre o que
+    foi compensado; a sobra vira crédito válido por 'validade' meses. Com
+    horario=True, o autoconsumo vem do mínimo hora a hora entre a geração e o
+    consumo distribuídos pelos perfis (24 ou 8760 pesos) e fator_simultaneidade não
+    é usado.
+    """
+    geracao, consumo, tarifa, fio_b, simultaneidade, disponibilidade = (
+        np.asarray(x, dtype=float)
+        for x in (
+            geracao_mensal,
+            consumo_mensal,
+            np.add(tarifa_tusd, tarifa_te),
+            custo_fio_b,
+            fator_simultaneidade,
+            disponibilidade,
+        )
+    )
+    reajuste, degradacao = (
+        np.asarray(x, dtype=float)[..., None, None] / 100
+        for x in (reajuste_tarifa, degradacao)
+    )
+    ano = np.arange(anos)[:, None]
+    geracao = _meses(geracao)[..., None, :] * (1 - degradacao) ** ano
+    consumo = _meses(consumo)[..., None, :]
+
+    if horario:
+        autoconsumo = _autoconsumo_horario(
+            geracao, consumo, perfil_geracao, perfil_consumo
+        )
+    else:
+        autoconsumo = np.minimum(simultaneidade[..., None, None] * geracao, consumo)
+    lote = np.broadcast_shapes(
+        autoconsumo.shape, geracao.shape, consumo.shape, disponibilidade.shape + (1, 1)
+    )
+    autoconsumo, geracao, consumo = (
+        np.broadcast_to(x, lote) for x in (autoconsumo, geracao, consumo)
+    )
+    injetada = geracao - autoconsumo
+    consumo_rede = consumo - autoconsumo
+    compensavel = np.maximum(consumo_rede - disponibilidade[..., None, None], 0)
+
+    meses = lote[:-2] + (anos * 12,)
+    compensada, expirada, saldo = (
+        x.reshape(lote)
+        for x in _banco_creditos(
+            injetada.reshape(meses), compensavel.reshape(meses), validade
+        )
+    )
+
+    fator_reajuste = (1 + reajuste) ** ano
+    tarifa_ano = tarifa[..., None, None] * fator_reajuste
+    fio_b_ano = (
+        fio_b[..., None, None]
+        * fator_reajuste
+        * calculos.percentual_fio_b(ano_inicio + ano)
+    )
+    minimo = disponibilidade[..., None, None]
+    conta_sem_solar = tarifa_ano * np.maximum(consumo, minimo)
+    conta_com_solar = (
+        tarifa_ano * np.maximum(consumo_rede - compensada, minimo)
+        + fio_b_ano * compensada
+    )
+    economia = conta_sem_solar - conta_com_solar
+    geracao_ano1 = geracao[..., 0, :].sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        simultaneidade_efetiva = autoconsumo[..., 0, :].sum(axis=-1) / geracao_ano1
+
+    return {
+        "autoconsumo": autoconsumo,
+        "injetada": injetada,
+        "compensada": compensada,
+        "creditos_expirados": expirada,
+        "saldo_creditos": saldo,
+        "conta_sem_solar": conta_sem_solar,
+        "conta_com_solar": conta_com_solar,
+        "economia": economia,
+        "economia_anual": economia.sum(axis=-1),
+        "economia_primeiro_ano": economia[..., 0, :].sum(axis=-1),
+        "conta_atual": conta_sem_solar[..., 0, :].mean(axis=-1),
+        "nova_conta": conta_com_solar[..., 0, :].mean(axis=-1),
+        "fator_simultaneidade": simultaneidade_efetiva,
+    }
+
+
+def economia(
+    geracao_mensal,
+    consumo_mensal,
+    tarifa_tusd,
+    tarifa_te,
+    custo_fio_b,
+    fator_simultaneidade,
+    disponibilidade=0.0,
+    anos: int = 25,
+    reajuste_tarifa=6.0,
+    degradacao=0.5,
+    ano_inicio: int = 2026,
+    validade: int = VALIDADE_CREDITOS,
+) -> np.ndarray:
+    """Só a 'economia' (R$, (..., anos, 12)) de simular, para lotes grandes.
+
+    Mesmos parâmetros e o mesmo modelo de simular (sem o modo horário), mas os
+    cenários vão achatados no último eixo e o cálculo anda um ano por vez, com os
+    arrays (12, cenários) do ano reaproveitados: cabem no cache e nada além da
+    economia fica na memória. É o caminho da análise de risco.
+    """
+    geracao, consumo = (
+        _meses(np.asarray(x, dtype=float)) for x in (geracao_mensal, consumo_mensal)
+    )
+    tarifa, fio_b, simultaneidade, minimo, reajuste, degradacao = (
+        np.asarray(x, dtype=float)
+        for x in (
+            np.add(tarifa_tusd, tarifa_te),
+            custo_fio_b,
+            fator_simultaneidade,
+            disponibilidade,
+            reajuste_tarifa,
+            degradacao,
+        )
+    )
+    lote = np.broadcast_shapes(
+        geracao.shape[:-1],
+        consumo.shape[:-1],
+        tarifa.shape,
+        fio_b.shape,
+        simultaneidade.shape,
+        minimo.shape,
+        reajuste.shape,
+        degradacao.shape,
+    )
+    n = int(np.prod(lote))
+
+    def cenarios(x: np.ndarray, mensal: bool = False) -> np.ndarray:
+        # Cenários no último eixo: (12, n) nos mensais e (n,) nos demais; o que
+        # é igual em todos os cenários fica com eixo 1, combinado por broadcasting
+        if mensal:
+            if x.ndim == 1:
+                return x[:, None]
+            return np.ascontiguousarray(
+                np.broadcast_to(x, lote + (12,)).reshape(n, 12).T
+            )
+        return x if x.ndim == 0 else np.broadcast_to(x, lote).ravel()
+
+    geracao, consumo = cenarios(geracao, True), cenarios(consumo, True)
+    simultaneidade, minimo = cenarios(simultaneidade), cenarios(minimo)
+    ano = np.arange(anos)[:, None]
+    fator_degradacao = (1 - cenarios(degradacao) / 100) ** ano
+    fator_reajuste = (1 + cenarios(reajuste) / 100) ** ano
+    tarifa_ano = cenarios(tarifa) * fator_reajuste
+    fio_b_ano = (
+        cenarios(fio_b) * fator_reajuste * calculos.percentual_fio_b(ano_inicio + ano)
+    )
+    # Com o sistema se fatura o mínimo mais o que ficou sem compensar, então a
+    # economia é (faturado a mais sem o sistema - não compensado) * tarifa
+    # + compensada * (tarifa - Fio B)
+    acima_minimo = consumo - minimo
+    faturado_a_mais = np.maximum(acima_minimo, 0)
+    margem_ano = tarifa_ano - fio_b_ano
+
+    resultado = np.empty((anos, 12, n))
+    direta, autoconsumo, compensavel, falta, sobra, compensada = (
+        np.empty((12, n)) for _ in range(6)
+    )
+    banco = _BancoCreditos((n,), validade)
+    for i in range(anos):
+        np.multiply(geracao, fator_degradacao[i], out=sobra)
+        np.multiply(sobra, simultaneidade, out=autoconsumo)
+        np.minimum(autoconsumo, consumo, out=autoconsumo)
+        sobra -= autoconsumo  # injetada
+        np.subtract(acima_minimo, autoconsumo, out=compensavel)
+        np.maximum(compensavel, 0, out=compensavel)
+        np.minimum(sobra, compensavel, out=direta)
+        np.subtract(compensavel, direta, out=falta)
+        sobra -= direta
+        for mes in range(12):
+            banco.compensar(falta[mes], sobra[mes], compensada[mes])
+        compensada += direta
+        np.subtract(faturado_a_mais, compensavel, out=resultado[i])
+        resultado[i] *= tarifa_ano[i]
+        compensada *= margem_ano[i]
+        resultado[i] += compensada
+    return np.moveaxis(resultado, -1, 0).reshape(lote + (anos, 12))
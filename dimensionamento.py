@@ -0,0 +1,159 @@
+# dimensionamento.py
+# escolha do número de módulos do kit a partir do consumo do cliente
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+import calculos
+import compensacao
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CRITERIOS = ("vpl", "payback")
+
+
+def curva_custo_kit(
+    potencia_kit, custo_kit_referencia: float, potencia_referencia: float, expoente=0.9
+) -> np.ndarray:
+    """Modelo de custo do kit: escala o kit de referência por uma lei de potência.
+
+    Com expoente < 1 o R$/Wp cai conforme o kit cresce (ganho de escala na compra
+    de inversores e estruturas). O kit de referência costuma ser a cotação que o
+    vendedor já tem em mãos.
+    """
+    potencia_kit = np.asarray(potencia_kit, dtype=float)
+    return custo_kit_referencia * (potencia_kit / potencia_referencia) ** expoente
+
+
+def dimensionar_kit(
+    df_consumo: pd.DataFrame,
+    dict_disponibilidades: dict,
+    ganho_perda: float,
+    potencia_modulos: float,
+    dict_custos: dict,
+    dict_fluxo: dict,
+    tma: float,
+    anos: int = 25,
+    criterio: str = "vpl",
+    expoente_custo: float = 0.9,
+    potencia_referencia: float = 7.8,
+) -> dict:
+    """Encontra o número de módulos que maximiza o VPL ou minimiza o payback.
+
+    Todos os tamanhos de kit possíveis (de 1 módulo até o limite da tabela de
+    projeto) são avaliados de uma só vez: preço pelas faixas de df_projeto com
+    calculos.orcamento_lote, custo do kit por curva_custo_kit (tendo o kit de
+    dict_custos como referência) e retorno pela simulação da compensação
+    (compensacao.simular), com o perfil de geração do orçamento escalado pela
+    potência de cada candidato, como no payback do orçamento.
+
+    dict_custos segue calculos.custo_total e dict_fluxo é o do orçamento. Sem
+    'perfil_geracao' e 'perfil_consumo' em dict_fluxo, o retorno vem de
+    calculos.fluxo_caixa, com a geração por potencia_referencia e a economia
+    limitada ao consumo médio do cliente.
+    Se nenhum candidato se paga em 'anos', o critério do payback cai no do VPL.
+    Retorna o melhor candidato, o critério usado em 'criterio' e os arrays de todos
+    os candidatos em 'candidatos'.
+    """
+    if criterio not in CRITERIOS:
+        raise ValueError(f"Critério inválido: {criterio!r}. Use um de {CRITERIOS}.")
+
+    consumo = calculos.consumo_medio(df_consumo, dict_disponibilidades)
+    if not consumo > 0:
+        raise ValueError("O consumo médio precisa ser positivo para dimensionar o kit.")
+    potencia_maxima = calculos.tabela_projeto(dict_custos["df_projeto"]).ate[-1]
+    n_modulos = np.arange(1, int(potencia_maxima * 1000 // potencia_modulos) + 1)
+    potencia_kit = n_modulos * potencia_modulos / 1000
+
+    custo_kit = curva_custo_kit(
+        potencia_kit,
+        dict_custos["custo_kit"],
+        dict_custos["potencia_kit"],
+        expoente_custo,
+    )
+    lote = calculos.orcamento_lote(
+        potencia_kit=potencia_kit,
+        ganho_perda=ganho_perda,
+        custo_kit=custo_kit,
+        lucro_inovasol=dict_custos["lucro_inovasol"],
+        comissao=dict_custos["comissao"],
+        adicional_projeto=dict_custos["adicional_projeto"],
+        df_projeto=dict_custos["df_projeto"],
+        df_preco=dict_custos["df_preco"],
+        df_impostos=dict_custos["df_impostos"],
+        potencia_referencia=potencia_referencia,
+    )
+    if "perfil_consumo" in dict_fluxo:
+        # Perfil de geração do orçamento, proporcional à potência de cada candidato,
+        # e economia pela simulação da compensação, como no retorno do orçamento
+        perfil_geracao = (
+            np.asarray(dict_fluxo["perfil_geracao"], dtype=float)
+            * (potencia_kit / dict_custos["potencia_kit"])[:, None]
+        )
+        geracao_mensal = perfil_geracao.mean(axis=-1)
+        simulacao = compensacao.simular(
+            perfil_geracao,
+            dict_fluxo["perfil_consumo"],
+            dict_fluxo["tarifa_tusd"],
+            dict_fluxo["tarifa_te"],
+            dict_fluxo["custo_fio_b"],
+            dict_fluxo["fator_simultaneidade"],
+            disponibilidade=dict_fluxo.get("disponibilidade", 0.0),
+            anos=anos,
+            reajuste_tarifa=dict_fluxo.get("reajuste_tarifa", 6.0),
+            degradacao=dict_fluxo.get("degradacao", 0.5),
+            ano_inicio=dict_fluxo.get("ano_inicio", 2026),
+        )
+        fluxo = calculos.fluxo_economia(
+            lote["total_projeto"],
+            simulacao["economia"].reshape(len(potencia_kit), -1),
+            tma=tma,
+        )
+    else:
+        geracao_mensal = lote["geracao_mensal"]
+        fluxo = calculos.fluxo_caixa(
+            investimento=lote["total_projeto"],
+            geracao_mensal=geracao_mensal,
+            tarifa_tusd=dict_fluxo["tarifa_tusd"],
+            tarifa_te=dict_fluxo["tarifa_te"],
+            fator_simultaneidade=dict_fluxo["fator_simultaneidade"],
+            custo_fio_b=dict_fluxo["custo_fio_b"],
+            tma=tma,
+            anos=anos,
+            reajuste_tarifa=dict_fluxo.get("reajuste_tarifa", 6.0),
+            degradacao=dict_fluxo.get("degradacao", 0.5),
+            ano_inicio=dict_fluxo.get("ano_inicio", 2026),
+            consumo_mensal=consumo,
+        )
+
+    candidatos = {
+        "n_modulos": n_modulos,
+        "potencia_kit": potencia_kit,
+        "custo_kit": custo_kit,
+        "total_projeto": lote["total_projeto"],
+        "geracao_mensal": geracao_mensal,
+        "vpl": fluxo["vpl"],
+        "payback": fluxo["payback"],
+        "tir": fluxo["tir"],
+    }
+    if criterio == "payback" and np.isnan(fluxo["payback"]).all():
+        # Nenhum kit se paga no horizonte, então não há menor payback: vale o
+        # maior VPL (o kit que menos perde)
+        criterio = "vpl"
+    if criterio == "vpl":
+        melhor = int(np.argmax(fluxo["vpl"]))
+    else:
+        payback = np.where(np.isnan(fluxo["payback"]), np.inf, fluxo["payback"])
+        melhor = int(np.argmin(payback))
+
+    dict_retorno = {
+        chave: valores[melhor].item() for chave, valores in candidatos.items()
+    }
+    dict_retorno["consumo_mensal"] = float(consumo)
+    dict_retorno["criterio"] = criterio
+    dict_retorno["candidatos"] = candidatos
+    return dict_retorno
@@ -1,9 +1,72 @@
 from fpdf import FPDF
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+import hashlib
+from functools import cache
+from typing import Any, BinaryIO
+import os
+import pickle
+
+import metricas
+import recursos
+from recursos import COR_CINZA, COR_CINZA_CLARO, COR_VERDE
+
+# Versão do layout da proposta. Incrementar a cada mudança visual no pdf, para que
+# o cache de propostas (cache_pdf.py) não devolva PDFs no layout antigo.
+VERSAO_TEMPLATE = "3"
+
+# Resolução de impressão das imagens fixas (logo e esquema)
+DPI_IMAGENS = 300
+
+
+@dataclass(frozen=True, slots=True)
+class PerfilPDF:
+    """Fonte, símbolos e compressão das imagens de um perfil de saída do pdf."""
+
+    fonte: str = "Helvetica"
+    fonte_embutida: bool = False  # TTF de recursos.FONTES, reduzida aos glyphs usados
+    marcador: str = chr(149)  # bullet na codificação WinAnsi das fontes padrão
+    confirmacao: str = "v"  # as fontes padrão não têm o ✓
+    qualidade_jpeg: int | None = None  # imagens sem transparência em JPEG
+    compressao: int = -1  # nível do deflate das demais imagens
+
+
+# "padrao": fontes padrão do pdf, nada embutido, o mais rápido de gerar.
+# "otimizado": DejaVu Sans embutida (só os glyphs usados), bullets e ✓ de verdade e
+# o esquema em JPEG, ~5x menor para envio por WhatsApp e e-mail. Comparação de
+# tamanho e tempo: python -m benchmarks.perfis_pdf
+PERFIS = {
+    "padrao": PerfilPDF(),
+    "otimizado": PerfilPDF(
+        fonte="DejaVu",
+        fonte_embutida=True,
+        marcador="•",
+        confirmacao="✓",
+        qualidade_jpeg=85,
+        compressao=9,
+    ),
+}
+
+
+class _TransbordouModelo(Exception):
+    """A parte variável de uma página passou do espaço dela no modelo."""
 
 
 class PDFProposta(FPDF):
+    # Desligado no modelo das páginas fixas: o rodapé é desenhado só no preenchimento
+    rodape = True
+    perfil = PERFIS["padrao"]
+    # Ligado ao preencher o modelo, em que as páginas seguintes já existem
+    sobre_modelo = False
+
+    @property
+    def accept_page_break(self) -> bool:
+        # Sobre o modelo, a quebra automática reabriria a página seguinte e
+        # escreveria o resto por cima da parte fixa dela
+        if self.sobre_modelo:
+            raise _TransbordouModelo(f"página {self.page}")
+        return self.auto_page_break
+
     def header(self):
         # O cabeçalho é personalizado por página no design fornecido,
         # então deixaremos este método genérico ou vazio se não houver repetição fixa.
@@ -11,85 +74,116 @@ class PDFProposta(FPDF):
 
     def footer(self):
         # Rodapé simples com numeração de página
+        if not self.rodape:
+            return
         self.set_y(-15)
-        self.set_font("Helvetica", "I", 8)
+        self.set_font(self.perfil.fonte, "I", 8)
+        self.set_text_color(0, 0, 0)
         self.cell(0, 10, f"Página {self.page_no()}", align="C")
 
+    def file_id(self):
+        # O /ID padrão do fpdf2 é o md5 do arquivo inteiro, dominado pelas imagens
+        # fixas; o conteúdo das páginas e a data de criação já identificam a proposta
+        h = hashlib.md5(usedforsecurity=False)
+        for pagina in self.pages.values():
+            h.update(pagina.contents.content_stream())  # já comprimido na saída
+        h.update(self.creation_date.strftime("%Y%m%d%H%M%S").encode())
+        return f"<{h.hexdigest().upper()}><{h.hexdigest().upper()}>"
 
-def criar_pdf(dados: dict, graficos: Any) -> bytes:
-    """
-    Gera o PDF da proposta comercial.
 
-    Args:
-        dados (dict): Dicionário com dados do cliente, sistema e financeiros.
-        graficos (dict): Dicionário com objetos BytesIO ou caminhos das imagens dos gráficos.
-    """
+def _traco_verde(pdf: FPDF):
+    # Traço da linha decorativa da capa, usado também nas bordas e na assinatura
+    pdf.set_draw_color(*COR_VERDE)
+    pdf.set_line_width(1)
+
+
+def _inserir_imagem(pdf: FPDF, nome: str, **posicao):
+    # Imagem fixa na resolução de impressão, com a compressão do perfil
+    return recursos.inserir_imagem(
+        pdf,
+        nome,
+        dpi=DPI_IMAGENS,
+        qualidade_jpeg=pdf.perfil.qualidade_jpeg,
+        compressao=pdf.perfil.compressao,
+        **posicao,
+    )
 
-    # --- Configurações Iniciais ---
-    pdf = PDFProposta(orientation="P", unit="mm", format="A4")
-    pdf.set_auto_page_break(auto=True, margin=15)
 
-    # Cores da Marca (Baseado no PDF)
-    COR_VERDE = (184, 212, 50)  # Aproximação do verde limão
-    COR_CINZA = (80, 80, 80)  # Cinza escuro
-    COR_CINZA_CLARO = (240, 240, 240)
+# Quebras de linha dos textos fixos, por (fonte, tamanho, largura, texto)
+_LINHAS: dict[tuple, list[str]] = {}
 
-    # ==============================================================================
-    # PÁGINA 1: CAPA
-    # ==============================================================================
-    pdf.add_page()
 
+def _texto_fixo(pdf: FPDF, h: float, texto: str):
+    """multi_cell (alinhado à esquerda) de um texto fixo em posição variável.
+
+    A quebra de linhas, que é a parte cara do multi_cell, é calculada uma vez por
+    processo; depois cada linha vira um cell simples.
+    """
+    chave = (pdf.font_family, pdf.font_style, pdf.font_size_pt, pdf.epw, texto)
+    if chave not in _LINHAS:
+        _LINHAS[chave] = pdf.multi_cell(
+            0, h, texto, align="L", dry_run=True, output="LINES"
+        )
+    for linha in _LINHAS[chave]:
+        pdf.cell(0, h, linha, new_x="LMARGIN", new_y="NEXT")
+
+
+# ==============================================================================
+# PÁGINA 1: CAPA
+# ==============================================================================
+def _capa(pdf: FPDF):
     # Logo
-    pdf.image(
-        "images/Logotipo_Inovasol.png", x=10, y=10, w=60
-    )  # Descomente se tiver a imagem
+    _inserir_imagem(pdf, "logo", x=10, y=10, w=60)
     pdf.ln(20)  # Espaço após logo
 
-    pdf.set_font("Helvetica", "B", 24)
+    pdf.set_font(pdf.perfil.fonte, "B", 24)
     pdf.set_text_color(*COR_CINZA)
     pdf.cell(0, 20, "Proposta de Orçamento", ln=True, align="R")
 
-    pdf.set_font("Helvetica", "", 16)
+    pdf.set_font(pdf.perfil.fonte, "", 16)
     pdf.set_text_color(*COR_VERDE)
     pdf.cell(0, 10, "Sistema Fotovoltaico Conectado à Rede", ln=True, align="R")
 
     # Linha decorativa
-    pdf.set_draw_color(*COR_VERDE)
-    pdf.set_line_width(1)
+    _traco_verde(pdf)
     pdf.line(10, 65, 200, 65)
 
-    # Dados do Cliente (Centro da página)
     pdf.ln(40)
+
+
+def _capa_dados(pdf: FPDF, dados: dict, graficos: Any):
+    # Dados do Cliente (Centro da página)
     pdf.set_text_color(*COR_CINZA)
-    pdf.set_font("Helvetica", "B", 20)
+    pdf.set_font(pdf.perfil.fonte, "B", 20)
     pdf.cell(0, 10, dados.get("nome_cliente", "Nome do cliente"), ln=True, align="C")
 
-    pdf.set_font("Helvetica", "", 16)
+    pdf.set_font(pdf.perfil.fonte, "", 16)
     pdf.cell(0, 10, dados.get("cidade", "Cidade do cliente"), ln=True, align="C")
 
     # Rodapé da Capa
     pdf.set_y(-50)
-    pdf.set_font("Helvetica", "", 12)
+    pdf.set_font(pdf.perfil.fonte, "", 12)
+    pdf.set_text_color(*COR_CINZA)
     pdf.cell(
         0, 10, f"Proposta: {dados.get('numero_proposta', '999')}", ln=True, align="R"
     )
     pdf.cell(0, 10, f"{dados.get('data', '01-01-2026')}", ln=True, align="R")
 
-    # ==============================================================================
-    # PÁGINA 2: FUNCIONAMENTO
-    # ==============================================================================
-    pdf.add_page()
 
+# ==============================================================================
+# PÁGINA 2: FUNCIONAMENTO
+# ==============================================================================
+def _funcionamento(pdf: FPDF):
     # Imagem esquemática (Sol -> Casa)
-    # pdf.image("assets/esquema_solar.png", x=10, y=20, w=190)
-    pdf.ln(80)  # Espaço reservado para a imagem
+    esquema = _inserir_imagem(pdf, "esquema", x=10, y=15, w=190)
+    pdf.set_y(15 + esquema["rendered_height"] + 5)
 
     # Título: Sobre a Inovasol
-    pdf.set_font("Helvetica", "B", 14)
+    pdf.set_font(pdf.perfil.fonte, "B", 14)
     pdf.set_text_color(*COR_VERDE)
     pdf.cell(0, 10, "Sobre a Inovasol", ln=True)
 
-    pdf.set_font("Helvetica", "", 10)
+    pdf.set_font(pdf.perfil.fonte, "", 10)
     pdf.set_text_color(0, 0, 0)
     texto_sobre = (
         "Criada em 2015 é formada por engenheiros com mais de 35 anos de experiência "
@@ -99,7 +193,7 @@ def criar_pdf(dados: dict, graficos: Any) -> bytes:
     pdf.ln(5)
 
     # Lista numerada: Funcionamento
-    pdf.set_font("Helvetica", "B", 14)
+    pdf.set_font(pdf.perfil.fonte, "B", 14)
     pdf.set_text_color(*COR_VERDE)
     pdf.cell(0, 10, "Funcionamento do Sistema Fotovoltaico", ln=True)
 
@@ -111,25 +205,25 @@ def criar_pdf(dados: dict, graficos: Any) -> bytes:
         "A rede da concessionária supre a energia à noite.",
     ]
 
-    pdf.set_font("Helvetica", "", 10)
+    pdf.set_font(pdf.perfil.fonte, "", 10)
     pdf.set_text_color(0, 0, 0)
 
     for i, item in enumerate(itens_funcionamento, 1):
-        pdf.set_font("Helvetica", "B", 12)
+        pdf.set_font(pdf.perfil.fonte, "B", 12)
         pdf.set_text_color(*COR_VERDE)
         pdf.cell(10, 8, f"{i}.", ln=0)  # Número verde
 
-        pdf.set_font("Helvetica", "", 10)
+        pdf.set_font(pdf.perfil.fonte, "", 10)
         pdf.set_text_color(0, 0, 0)
-        pdf.multi_cell(0, 8, item)  # Texto preto
+        pdf.multi_cell(0, 8, item, new_x="LMARGIN", new_y="NEXT")  # Texto preto
 
-    # ==============================================================================
-    # PÁGINA 3: VANTAGENS E PRAZOS
-    # ==============================================================================
-    pdf.add_page()
 
+# ==============================================================================
+# PÁGINA 3: VANTAGENS E PRAZOS
+# ==============================================================================
+def _vantagens(pdf: FPDF):
     # Vantagens
-    pdf.set_font("Helvetica", "B", 14)
+    pdf.set_font(pdf.perfil.fonte, "B", 14)
     pdf.set_text_color(*COR_VERDE)
     pdf.cell(0, 10, "Vantagens do Sistema Fotovoltaico", ln=True)
 
@@ -141,17 +235,17 @@ def criar_pdf(dados: dict, graficos: Any) -> bytes:
         "Marketing ecológico e baixo impacto ambiental.",
     ]
 
-    pdf.set_font("Helvetica", "", 10)
+    pdf.set_font(pdf.perfil.fonte, "", 10)
     pdf.set_text_color(0, 0, 0)
 
     for v in vantagens:
-        pdf.cell(5, 6, chr(149), ln=0)  # Bullet point
-        pdf.multi_cell(0, 6, v)
+        pdf.cell(5, 6, pdf.perfil.marcador, ln=0)  # Bullet point
+        pdf.multi_cell(0, 6, v, new_x="LMARGIN", new_y="NEXT")
 
     pdf.ln(10)
 
     # Etapas e Prazos (Simulação visual)
-    pdf.set_font("Helvetica", "B", 14)
+    pdf.set_font(pdf.perfil.fonte, "B", 14)
     pdf.set_text_color(*COR_VERDE)
     pdf.cell(0, 10, "Etapas e Prazos", ln=True)
 
@@ -173,27 +267,31 @@ def criar_pdf(dados: dict, graficos: Any) -> bytes:
         pdf.rect(x, y_start, w_box, 20, "F")
 
         pdf.set_xy(x, y_start + 2)
-        pdf.set_font("Helvetica", "B", 8)
+        pdf.set_font(pdf.perfil.fonte, "B", 8)
         pdf.set_text_color(255, 255, 255)  # Texto branco
         pdf.multi_cell(w_box, 4, nome, align="C")
 
         pdf.set_xy(x, y_start + 12)
-        pdf.set_font("Helvetica", "", 8)
+        pdf.set_font(pdf.perfil.fonte, "", 8)
         pdf.cell(w_box, 5, prazo, align="C")
 
-    # ==============================================================================
-    # PÁGINA 4: DADOS TÉCNICOS E GRÁFICO MENSAL
-    # ==============================================================================
-    pdf.add_page()
 
+# ==============================================================================
+# PÁGINA 4: DADOS TÉCNICOS E GRÁFICO MENSAL
+# ==============================================================================
+def _caracteristicas(pdf: FPDF):
     # Título
-    pdf.set_font("Helvetica", "B", 14)
+    pdf.set_font(pdf.perfil.fonte, "B", 14)
     pdf.set_text_color(*COR_VERDE)
     pdf.cell(0, 10, "Características do SFV", ln=True)
 
+
+def _caracteristicas_dados(pdf: FPDF, dados: dict, graficos: Any):
+    _traco_verde(pdf)
+
     # Tabela Técnica Estilizada (Verde e Cinza alternados como no PDF)
     def linha_tecnica(rotulo, valor):
-        pdf.set_font("Helvetica", "", 10)
+        pdf.set_font(pdf.perfil.fonte, "", 10)
         pdf.set_fill_color(*COR_VERDE)  # Fundo Verde
         pdf.set_text_color(0, 0, 0)
         pdf.cell(90, 8, rotulo, fill=True, border=0)
@@ -227,28 +325,31 @@ def criar_pdf(dados: dict, graficos: Any) -> bytes:
     pdf.ln(5)
 
     # Texto de Garantia
-    pdf.set_font("Helvetica", "B", 10)
+    pdf.set_font(pdf.perfil.fonte, "B", 10)
     pdf.set_text_color(0, 0, 0)
     pdf.cell(0, 8, "Garantia", ln=True)
-    pdf.set_font("Helvetica", "", 9)
-    pdf.multi_cell(
-        0,
+    pdf.set_font(pdf.perfil.fonte, "", 9)
+    _texto_fixo(
+        pdf,
         5,
         "Os módulos têm garantia de 15 anos contra defeitos e 25 anos de performance (80%).\nInversores: Garantia padrão de 5 a 10 anos.\nInstalação: 2 anos.",
     )
 
-    # ==============================================================================
-    # PÁGINA 5: INVESTIMENTO
-    # ==============================================================================
-    pdf.add_page()
 
-    pdf.set_font("Helvetica", "B", 14)
+# ==============================================================================
+# PÁGINA 5: INVESTIMENTO
+# ==============================================================================
+def _investimento(pdf: FPDF):
+    _traco_verde(pdf)
+
+    pdf.set_font(pdf.perfil.fonte, "B", 14)
     pdf.set_text_color(*COR_VERDE)
     pdf.cell(0, 10, "Investimento", ln=True)
 
     # Tabela de Itens (Usando pdf.table() para facilitar, ou manual para cores específicas)
     # Vamos fazer manual para replicar o estilo de linhas alternadas se necessário,
     # mas o fpdf2 table é ótimo.
+    pdf.set_fill_color(*COR_CINZA)  # Fundo das células
 
     with pdf.table() as table:
         headers = table.row()
@@ -270,25 +371,14 @@ def criar_pdf(dados: dict, graficos: Any) -> bytes:
             row.cell(desc)
 
     pdf.ln(10)
-
-    # Valor Total
-    pdf.set_fill_color(*COR_VERDE)
-    pdf.set_text_color(255, 255, 255)
-    pdf.set_font("Helvetica", "B", 16)
-    pdf.cell(
-        0,
-        15,
-        f"Valor do Investimento: R$ {dados.get('valor_total', '')}",
-        fill=True,
-        ln=True,
-        align="C",
-    )
+    y_valor = pdf.get_y()
+    pdf.set_y(y_valor + 15)  # Espaço do valor total, preenchido por proposta
 
     pdf.ln(10)
 
     # Formas de Pagamento
     pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Helvetica", "B", 12)
+    pdf.set_font(pdf.perfil.fonte, "B", 12)
     pdf.cell(0, 8, "Formas de pagamento:", ln=True)
 
     pagamentos = [
@@ -296,13 +386,13 @@ def criar_pdf(dados: dict, graficos: Any) -> bytes:
         "Entrada + Parcelamento",
         "Financiamento Bancário (BV, Santander, etc)",
     ]
-    pdf.set_font("Helvetica", "", 10)
+    pdf.set_font(pdf.perfil.fonte, "", 10)
     for p in pagamentos:
-        pdf.cell(5, 6, "v", ln=0)  # Checkmark simulado
+        pdf.cell(5, 6, pdf.perfil.confirmacao, ln=0)  # Checkmark
         pdf.cell(0, 6, p, ln=True)
 
     pdf.ln(5)
-    pdf.set_font("Helvetica", "I", 9)
+    pdf.set_font(pdf.perfil.fonte, "I", 9)
     pdf.cell(
         0,
         5,
@@ -310,19 +400,42 @@ def criar_pdf(dados: dict, graficos: Any) -> bytes:
         ln=True,
     )
 
-    # ==============================================================================
-    # PÁGINA 6: FINANCEIRO E FECHAMENTO
-    # ==============================================================================
-    pdf.add_page()
+    pdf.set_y(y_valor)
 
-    pdf.set_font("Helvetica", "B", 14)
+
+def _investimento_dados(pdf: FPDF, dados: dict, graficos: Any):
+    # Valor Total
+    pdf.set_fill_color(*COR_VERDE)
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font(pdf.perfil.fonte, "B", 16)
+    pdf.cell(
+        0,
+        15,
+        f"Valor do Investimento: R$ {dados.get('valor_total', '')}",
+        fill=True,
+        ln=True,
+        align="C",
+    )
+
+
+# ==============================================================================
+# PÁGINA 6: FINANCEIRO E FECHAMENTO
+# ==============================================================================
+def _retorno(pdf: FPDF):
+    pdf.set_font(pdf.perfil.fonte, "B", 14)
     pdf.set_text_color(*COR_VERDE)
     pdf.cell(0, 10, "Retorno do Investimento", ln=True)
 
+
+def _retorno_dados(pdf: FPDF, dados: dict, graficos: Any):
+    _traco_verde(pdf)
+
     # GRÁFICO FLUXO DE CAIXA
     if "fluxo_caixa" in graficos:
         pdf.image(graficos["fluxo_caixa"], x=10, w=190)
     else:
+        pdf.set_font(pdf.perfil.fonte, "B", 14)
+        pdf.set_text_color(*COR_VERDE)
         pdf.cell(
             0, 50, "[Gráfico Fluxo de Caixa Acumulado]", border=1, align="C", ln=True
         )
@@ -339,36 +452,74 @@ def criar_pdf(dados: dict, graficos: Any) -> bytes:
     pdf.rect(10, y_kpi, largura_kpi, 25, "F")
     pdf.set_xy(10, y_kpi + 2)
     pdf.set_text_color(255, 255, 255)
-    pdf.set_font("Helvetica", "B", 10)
+    pdf.set_font(pdf.perfil.fonte, "B", 10)
     pdf.cell(largura_kpi, 5, "Payback Estimado", align="C")
     pdf.set_xy(10, y_kpi + 10)
-    pdf.set_font("Helvetica", "B", 16)
+    pdf.set_font(pdf.perfil.fonte, "B", 16)
     pdf.cell(largura_kpi, 10, dados.get("payback", ""), align="C")
 
     # KPI 2: Economia 1º Ano
     pdf.set_fill_color(*COR_CINZA)
     pdf.rect(10 + largura_kpi + 5, y_kpi, largura_kpi, 25, "F")
     pdf.set_xy(10 + largura_kpi + 5, y_kpi + 2)
+    pdf.set_font(pdf.perfil.fonte, "B", 10)
     pdf.cell(largura_kpi, 5, "Economia 1º Ano", align="C")
     pdf.set_xy(10 + largura_kpi + 5, y_kpi + 10)
+    pdf.set_font(pdf.perfil.fonte, "B", 16)
     pdf.cell(largura_kpi, 10, dados.get("economia_anual", ""), align="C")
 
     # KPI 3: Nova Conta
     pdf.set_fill_color(*COR_VERDE)
     pdf.rect(10 + (largura_kpi + 5) * 2, y_kpi, largura_kpi, 25, "F")
     pdf.set_xy(10 + (largura_kpi + 5) * 2, y_kpi + 2)
+    pdf.set_font(pdf.perfil.fonte, "B", 10)
     pdf.cell(largura_kpi, 5, "Nova Conta Estimada", align="C")
     pdf.set_xy(10 + (largura_kpi + 5) * 2, y_kpi + 10)
+    pdf.set_font(pdf.perfil.fonte, "B", 16)
     pdf.cell(largura_kpi, 10, dados.get("nova_conta", ""), align="C")
 
     pdf.ln(40)
 
     # Comparativo Poupança (Opcional, presente no PDF)
     pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Helvetica", "", 10)
+    pdf.set_font(pdf.perfil.fonte, "", 10)
     pdf.cell(0, 5, f"Taxa Interna de Retorno (TIR): {dados.get('tir', '99%')}", ln=True)
     pdf.cell(0, 5, "Comparativo Poupança: ~6-8% a.a vs Seu Sistema: ~30% a.a", ln=True)
 
+    # Análise de risco (opcional): faixas de payback e TIR da simulação Monte Carlo
+    risco = dados.get("risco")
+    if risco:
+        pdf.ln(5)
+        pdf.set_font(pdf.perfil.fonte, "B", 10)
+        pdf.cell(
+            0,
+            6,
+            f"Análise de risco ({risco['n_sorteios']} cenários simulados)",
+            ln=True,
+        )
+        pdf.set_font(pdf.perfil.fonte, "", 9)
+        pdf.set_fill_color(*COR_CINZA_CLARO)
+        with pdf.table(
+            width=150, col_widths=(45, 35, 35, 35), text_align="CENTER", align="L"
+        ) as table:
+            headers = table.row()
+            for titulo in ("", "Pessimista", "Provável", "Otimista"):
+                headers.cell(titulo)
+            for rotulo, chave in (("Payback", "payback"), ("TIR", "tir")):
+                row = table.row()
+                row.cell(rotulo)
+                for valor in risco[chave]:
+                    row.cell(valor)
+        pdf.multi_cell(
+            0,
+            5,
+            f"Chance de o investimento se pagar em {risco['anos']} anos: "
+            f"{risco['prob_payback']}. Pessimista e otimista: 10% dos cenários "
+            "ficam além de cada um.",
+            new_x="LMARGIN",
+            new_y="NEXT",
+        )
+
     pdf.ln(20)
 
     # Assinatura
@@ -376,8 +527,130 @@ def criar_pdf(dados: dict, graficos: Any) -> bytes:
     pdf.cell(0, 5, "De acordo", ln=True)
     pdf.cell(0, 5, f"Data: {datetime.now().strftime('%d/%m/%Y')}", ln=True)
 
-    # Retorna o PDF como string de bytes para o Streamlit baixar
-    return bytes(pdf.output())
+
+# Cada página: (parte fixa, parte variável ou None)
+PAGINAS = [
+    (_capa, _capa_dados),
+    (_funcionamento, None),
+    (_vantagens, None),
+    (_caracteristicas, _caracteristicas_dados),
+    (_investimento, _investimento_dados),
+    (_retorno, _retorno_dados),
+]
+
+# Nome de cada página nas métricas: pdf.capa, pdf.funcionamento...
+ETAPAS_PAGINAS = tuple(
+    f"pdf{desenhar.__name__.replace('_', '.', 1)}" for desenhar, _ in PAGINAS
+)
+
+
+def _novo_pdf(perfil: PerfilPDF = PERFIS["padrao"]) -> PDFProposta:
+    # --- Configurações Iniciais ---
+    pdf = PDFProposta(orientation="P", unit="mm", format="A4")
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.perfil = perfil
+    if perfil.fonte_embutida:
+        for estilo in recursos.FONTES:
+            pdf.add_font(perfil.fonte, estilo, recursos.caminho_fonte(estilo))
+    return pdf
+
+
+def _desenhar_fixo(pdf: FPDF, desenhar) -> float:
+    """Desenha a parte fixa da página e devolve o y onde começa a parte variável.
+
+    O desenho fica entre q/Q (local_context), então cores, fonte e espessura de
+    linha usadas nele não vazam para o que for desenhado depois na página.
+    """
+    with pdf.local_context():
+        desenhar(pdf)
+        return pdf.get_y()
+
+
+@cache
+def _modelo() -> tuple[bytes, tuple[float, ...]]:
+    """Documento com a parte fixa das 6 páginas já diagramada, uma vez por processo.
+
+    Guardado serializado (pickle): cada proposta desserializa a sua própria cópia,
+    bem mais rápido que um deepcopy, e o modelo nunca é alterado. Só no perfil
+    padrão: as fontes TTF do fpdf2 não são serializáveis.
+    """
+    pdf = _novo_pdf()
+    pdf.rodape = False
+    posicoes = []
+    for desenhar, _ in PAGINAS:
+        pdf.add_page()
+        posicoes.append(_desenhar_fixo(pdf, desenhar))
+    return pickle.dumps(pdf), tuple(posicoes)
+
+
+def _desenhar_paginas(pdf: FPDF, dados: dict, graficos: Any, posicoes=None):
+    """Desenha as páginas; com as posicoes do modelo, só as partes variáveis."""
+    for n, (desenhar, preencher) in enumerate(PAGINAS):
+        with metricas.etapa(ETAPAS_PAGINAS[n]):
+            pdf.add_page()
+            y = _desenhar_fixo(pdf, desenhar) if posicoes is None else posicoes[n]
+            if preencher is not None:
+                pdf.set_xy(pdf.l_margin, y)
+                preencher(pdf, dados, graficos)
+
+
+def criar_pdf(
+    dados: dict,
+    graficos: Any,
+    usar_modelo: bool = True,
+    destino: str | os.PathLike | BinaryIO | None = None,
+    perfil: str = "padrao",
+) -> bytes | None:
+    """
+    Gera o PDF da proposta comercial.
+
+    Por padrão parte do modelo com as páginas fixas já diagramadas e só preenche os
+    campos da proposta; com usar_modelo=False diagrama tudo do zero (mesmo resultado
+    visual, usado para comparação nos benchmarks). O perfil "otimizado" (ver
+    PERFIS) sempre diagrama do zero, assim como a proposta cuja parte variável não
+    cabe na página do modelo.
+
+    Args:
+        dados (dict): Dicionário com dados do cliente, sistema e financeiros.
+        graficos (dict): Dicionário com objetos BytesIO ou caminhos das imagens dos gráficos.
+        usar_modelo (bool): Reaproveita as páginas fixas diagramadas uma vez por processo.
+        destino: Caminho ou arquivo binário aberto (ex.: uma entrada de ZIP) onde o
+            PDF é escrito direto do buffer do fpdf2, sem a cópia em bytes; nesse
+            caso retorna None.
+        perfil (str): Perfil de saída, uma das chaves de PERFIS.
+    """
+    if perfil not in PERFIS:
+        raise ValueError(
+            f"Perfil de pdf inválido: {perfil!r}. Use um de {tuple(PERFIS)}."
+        )
+    config = PERFIS[perfil]
+    pdf = None
+    if usar_modelo and not config.fonte_embutida:
+        with metricas.etapa("pdf.modelo"):
+            modelo, posicoes = _modelo()
+        pdf = pickle.loads(modelo)
+        pdf.set_creation_date(datetime.now())  # não a data em que o modelo foi criado
+        pdf.rodape = True
+        pdf.sobre_modelo = True
+        pdf.page = 0  # volta ao início; add_page reabre as páginas já existentes
+        try:
+            _desenhar_paginas(pdf, dados, graficos, posicoes)
+        except _TransbordouModelo:
+            # Conteúdo maior que o espaço da página (ex.: um gráfico mais alto):
+            # diagrama do zero, com as páginas a mais que o fpdf2 abrir
+            pdf = None
+        else:
+            pdf.sobre_modelo = False
+    if pdf is None:
+        pdf = _novo_pdf(config)
+        _desenhar_paginas(pdf, dados, graficos)
+
+    with metricas.etapa("pdf.output"):
+        if destino is not None:
+            pdf.output(destino)
+            return None
+        # Retorna o PDF como string de bytes para o Streamlit baixar
+        return bytes(pdf.output())
 
 
 # --- Fim do Arquivo de Geração ---
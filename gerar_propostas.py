@@ -0,0 +1,357 @@
+# gerar_propostas.py
+# linha de comando: gera as propostas em pdf de uma lista de clientes, sem streamlit
+#
+# Uso:
+#   orcamentos clientes.csv --saida propostas/
+#   orcamentos clientes.csv --saida propostas.zip  # todos os pdfs num ZIP
+#
+# Cada linha/registro do arquivo é um cliente. As colunas têm os mesmos nomes das
+# entradas do app (ver orcamento.ENTRADAS_PADRAO); as que faltarem usam o valor
+# padrão. O consumo mensal vai em colunas "<imóvel>_<mês>" (ex.: imv1_jan), com
+# quantos imóveis forem (imv1 a imvN; meses em branco ficam fora da média), e o custo
+# de disponibilidade em "disp_<imóvel>" (ex.: disp_imv1).
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import re
+import sys
+from collections import deque
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+import calculos
+import graficos
+import metricas
+import orcamento
+import tabelas
+from banco_propostas import BancoPropostas
+from modelo import Proposta
+from pool_pdf import PoolPDF
+from zip_pdf import ZipPDF
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Propostas gravadas por transação no histórico (--banco)
+LOTE_BANCO = 500
+
+DISPONIBILIDADE_PADRAO = {
+    "disp_imv1": 50,
+    "disp_imv2": 0,
+    "disp_imv3": 0,
+    "disp_imv4": 0,
+}
+
+
+def ler_clientes(caminho: Path) -> Iterator[dict]:
+    """Lê os clientes um a um, sem carregar o arquivo inteiro na memória.
+
+    Aceita CSV (separador detectado automaticamente), JSON Lines (.jsonl) e JSON
+    (.json, uma lista de objetos; este formato é lido de uma vez).
+    """
+    sufixo = caminho.suffix.lower()
+    with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+        if sufixo == ".csv":
+            dialeto = csv.Sniffer().sniff(arquivo.read(4096), delimiters=",;\t")
+            arquivo.seek(0)
+            yield from csv.DictReader(arquivo, dialect=dialeto)
+        elif sufixo == ".jsonl":
+            for linha in arquivo:
+                if linha.strip():
+                    yield json.loads(linha)
+        elif sufixo == ".json":
+            yield from json.load(arquivo)
+        else:
+            raise ValueError(f"Formato de arquivo não suportado: {caminho.name}")
+
+
+def _converter(valor, padrao):
+    """Converte um valor lido do arquivo para o tipo do valor padrão."""
+    if valor is None or valor == "":
+        return padrao
+    if isinstance(padrao, bool):
+        return str(valor).strip().lower() in ("1", "true", "sim", "s")
+    if isinstance(padrao, (int, float)):
+        if isinstance(valor, str):
+            valor = valor.strip().replace(",", ".")
+        numero = float(valor)
+        return (
+            int(numero) if isinstance(padrao, int) and numero.is_integer() else numero
+        )
+    return str(valor)
+
+
+def _imoveis(registro: dict) -> list[str]:
+    """imv1 até o maior imóvel com colunas de consumo (os padrão se não houver)."""
+    numeros = [
+        int(m.group(1))
+        for chave in registro
+        if (m := re.fullmatch(r"imv(\d+)_[a-z]{3}", chave))
+    ]
+    return tabelas.imoveis(max(numeros, default=0) or len(tabelas.IMOVEIS))
+
+
+def entradas_do_cliente(registro: dict) -> tuple[dict, pd.DataFrame, dict]:
+    """Separa um registro do arquivo em entradas, consumos e disponibilidades."""
+    import pandas as pd
+
+    entradas = {
+        chave: _converter(registro.get(chave), padrao)
+        for chave, padrao in orcamento.ENTRADAS_PADRAO.items()
+    }
+    imoveis = _imoveis(registro)
+    df_consumo = pd.DataFrame(
+        {
+            imv: [
+                _converter(registro.get(f"{imv}_{mes}"), np.nan)
+                for mes in tabelas.MESES
+            ]
+            for imv in imoveis
+        },
+        index=tabelas.MESES,
+    )
+    dict_disponibilidades = {
+        f"disp_{imv}": _converter(
+            registro.get(f"disp_{imv}"), DISPONIBILIDADE_PADRAO.get(f"disp_{imv}", 0)
+        )
+        for imv in imoveis
+    }
+    return entradas, df_consumo, dict_disponibilidades
+
+
+def nome_arquivo(entradas: dict) -> str:
+    nome = re.sub(r"[^\w-]+", "_", entradas["cliente_nome"]).strip("_") or "cliente"
+    return (
+        f"Orcamento_{entradas['cliente_numero']}_"
+        f"{entradas['numero_proposta']}-{entradas['ano_proposta']}_{nome}.pdf"
+    )
+
+
+def _calculados(caminho: Path, erros: list) -> Iterator[tuple]:
+    """Calcula cada cliente: (entradas, df_consumo, disponibilidades, resultado)."""
+    df_projeto = calculos.tabela_projeto(tabelas.df_projeto())
+    df_preco = calculos.tabela_preco(tabelas.df_preco())
+    df_impostos = tabelas.df_impostos()
+
+    for n, registro in enumerate(ler_clientes(caminho), 1):
+        try:
+            entradas, df_consumo, dict_disponibilidades = entradas_do_cliente(registro)
+            resultado = orcamento.calcular_orcamento(
+                entradas,
+                df_consumo,
+                dict_disponibilidades,
+                df_projeto=df_projeto,
+                df_preco=df_preco,
+                df_impostos=df_impostos,
+            )
+        except Exception as e:  # um cliente com problema não interrompe o lote
+            print(f"Erro no cliente da linha {n}: {e}", file=sys.stderr)
+            erros.append(n)
+            continue
+        yield entradas, df_consumo, dict_disponibilidades, resultado
+
+
+def _salvos(calculados: Iterator[tuple], banco: BancoPropostas, pasta_saida: Path):
+    """Grava os orçamentos no histórico, LOTE_BANCO por transação.
+
+    O número de cada proposta passa a ser a versão atribuída pelo histórico, que
+    guarda o caminho do pdf (gerado em seguida) em vez do arquivo.
+    """
+    while lote := list(itertools.islice(calculados, LOTE_BANCO)):
+        salvos = banco.salvar_lote(
+            {
+                "proposta": Proposta.de_dicts(
+                    {**orcamento.ENTRADAS_PADRAO, **entradas},
+                    resultado,
+                    df_consumo=df_consumo,
+                    dict_disponibilidades=dict_disponibilidades,
+                )
+            }
+            for entradas, df_consumo, dict_disponibilidades, resultado in lote
+        )
+        lote = [
+            ({**entradas, "numero_proposta": proposta.numero}, *resto)
+            for (_, proposta), (entradas, *resto) in zip(salvos, lote)
+        ]
+        banco.anexar_pdfs(
+            (id, None, pasta_saida / nome_arquivo(entradas))
+            for (id, _), (entradas, *_) in zip(salvos, lote)
+        )
+        yield from lote
+
+
+def _tarefas(
+    caminho: Path,
+    pasta_saida: Path,
+    erros: list,
+    banco: BancoPropostas | None = None,
+) -> Iterator[tuple]:
+    """Calcula cada cliente e devolve (dados, graficos, destino) para o gerador."""
+    calculados = _calculados(caminho, erros)
+    if banco is not None:
+        calculados = _salvos(calculados, banco, pasta_saida)
+    for entradas, df_consumo, _, resultado in calculados:
+        dados = orcamento.dados_pdf(entradas, resultado)
+        graficos_pdf = graficos.graficos_proposta(df_consumo, resultado)
+        yield dados, graficos_pdf, pasta_saida / nome_arquivo(entradas)
+
+
+def gerar_propostas(
+    caminho: Path,
+    pasta_saida: Path,
+    processos: int = 1,
+    banco: BancoPropostas | None = None,
+    perfil: str = "padrao",
+) -> tuple[int, int]:
+    """Gera um PDF por cliente. Retorna (propostas geradas, clientes com erro).
+
+    Com processos > 1 a renderização dos PDFs é distribuída por um PoolPDF. Com
+    banco, cada proposta é gravada no histórico como a próxima versão do cliente
+    (o número da proposta do arquivo é ignorado). Se pasta_saida terminar em .zip,
+    os PDFs vão todos para esse ZIP, gravado em fluxo (ver ZipPDF). 'perfil' é o
+    perfil de saída dos PDFs (ver gerador_pdf.PERFIS).
+    """
+    em_zip = pasta_saida.suffix.lower() == ".zip"
+    (pasta_saida.parent if em_zip else pasta_saida).mkdir(parents=True, exist_ok=True)
+    erros = []
+    tarefas = _tarefas(caminho, pasta_saida, erros, banco)
+
+    if em_zip:
+        with ZipPDF(pasta_saida) as arquivo_zip:
+            _gravar_zip(tarefas, arquivo_zip, processos, erros, perfil)
+        return arquivo_zip.n, len(erros)
+
+    geradas = 0
+    if processos > 1:
+        with PoolPDF(processos=processos, perfil=perfil) as pool:
+            for resultado in pool.gravar(tarefas):
+                if isinstance(resultado, Exception):
+                    print(f"Erro ao gerar o PDF: {resultado}", file=sys.stderr)
+                    erros.append(resultado)
+                else:
+                    geradas += 1
+    else:
+        from gerador_pdf import criar_pdf
+
+        for dados, graficos, destino in tarefas:
+            try:
+                criar_pdf(
+                    dados=dados, graficos=graficos, destino=destino, perfil=perfil
+                )
+                geradas += 1
+            except Exception as e:
+                print(f"Erro ao gerar o PDF {destino.name}: {e}", file=sys.stderr)
+                erros.append(e)
+    return geradas, len(erros)
+
+
+def _gravar_zip(
+    tarefas: Iterator[tuple],
+    arquivo_zip: ZipPDF,
+    processos: int,
+    erros: list,
+    perfil: str,
+) -> None:
+    """Grava as propostas no ZIP, cada uma com o nome do arquivo do destino.
+
+    Num processo só, cada pdf é escrito do fpdf2 direto no ZIP; com o PoolPDF, os
+    pdfs chegam em bytes, no máximo 2 blocos por processo por vez.
+    """
+    if processos <= 1:
+        for dados, graficos, destino in tarefas:
+            try:
+                arquivo_zip.adicionar(destino.name, dados, graficos, perfil)
+            except Exception as e:
+                print(f"Erro ao gerar o PDF {destino.name}: {e}", file=sys.stderr)
+                erros.append(e)
+        return
+
+    nomes = deque()  # os resultados do pool saem na ordem de entrada
+
+    def propostas():
+        for dados, graficos, destino in tarefas:
+            nomes.append(destino.name)
+            yield dados, graficos
+
+    with PoolPDF(processos=processos, perfil=perfil) as pool:
+        for resultado in pool.renderizar(propostas()):
+            nome = nomes.popleft()
+            if isinstance(resultado, Exception):
+                print(f"Erro ao gerar o PDF {nome}: {resultado}", file=sys.stderr)
+                erros.append(resultado)
+            else:
+                arquivo_zip.adicionar_pdf(nome, resultado)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="orcamentos",
+        description="Gera propostas em PDF para uma lista de clientes (CSV/JSON).",
+    )
+    parser.add_argument("entrada", type=Path, help="Arquivo .csv, .json ou .jsonl")
+    parser.add_argument(
+        "-s",
+        "--saida",
+        type=Path,
+        default=Path("propostas"),
+        help="Pasta onde os PDFs serão gravados, ou um arquivo .zip que reúne "
+        "todos (padrão: ./propostas)",
+    )
+    parser.add_argument(
+        "-p",
+        "--processos",
+        type=int,
+        default=1,
+        help="Processos para renderizar os PDFs em paralelo (padrão: 1)",
+    )
+    parser.add_argument(
+        "-b",
+        "--banco",
+        type=Path,
+        help="Grava as propostas no histórico (SQLite) deste arquivo, numerando "
+        "as versões por cliente",
+    )
+    parser.add_argument(
+        "-m",
+        "--metricas",
+        type=Path,
+        help="Mede o tempo de cada etapa e grava as métricas neste arquivo (.jsonl "
+        "ou texto do Prometheus); com -p > 1 as páginas do pdf, renderizadas "
+        "nos outros processos, ficam de fora",
+    )
+    parser.add_argument(
+        "--perfil",
+        choices=("padrao", "otimizado"),
+        default="padrao",
+        help="Perfil de saída dos PDFs: 'otimizado' embute a fonte (acentos, "
+        "bullets e ✓) e gera arquivos ~5x menores, mais lento (padrão: padrao)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.metricas is not None:
+        metricas.ativar()
+
+    if args.banco is None:
+        geradas, erros = gerar_propostas(
+            args.entrada, args.saida, args.processos, perfil=args.perfil
+        )
+    else:
+        with BancoPropostas(args.banco) as banco:
+            geradas, erros = gerar_propostas(
+                args.entrada, args.saida, args.processos, banco, args.perfil
+            )
+    print(f"{geradas} propostas geradas em {args.saida}, {erros} com erro.")
+    if args.metricas is not None:
+        metricas.exportar(args.metricas)
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# graficos.py
+# gráficos da proposta (geração x consumo e fluxo de caixa acumulado) em PNG, para
+# os espaços reservados no pdf. O matplotlib só é importado no primeiro gráfico.
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+import calculos
+import metricas
+import tabelas
+from recursos import COR_CINZA, COR_VERDE
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Tamanho da figura: ocupa os 190 mm de largura da página do pdf
+TAMANHO_POL = (7.5, 3.0)
+DPI = 120
+
+# PNGs já gerados, por conteúdo das entradas
+MAX_CACHE = 128
+_cache: OrderedDict[str, bytes] = OrderedDict()
+_lock_cache = threading.Lock()
+
+
+def _cor(rgb: tuple) -> tuple:
+    return tuple(c / 255 for c in rgb)
+
+
+class _Modelo:
+    """Figura e eixos de um tipo de gráfico, criados uma vez e redesenhados a cada uso.
+
+    A parte fixa (títulos, legenda, eixo x) é desenhada uma vez e guardada como
+    fundo; as barras e linhas também são reaproveitadas. A cada gráfico mudam só
+    alturas, cores e a escala do eixo y, e apenas esses artistas são redesenhados
+    sobre o fundo (blit). A figura não passa pelo pyplot, então não fica registrada
+    em lugar nenhum e não se acumula entre as execuções do streamlit. Um lock
+    protege a figura entre threads.
+    """
+
+    def __init__(self, preparar, desenhar):
+        self._preparar = preparar
+        self._desenhar = desenhar
+        self._figura = None
+        self._fundo = None
+        self._artistas = []
+        self._lock = threading.Lock()
+
+    def _criar(self):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        # Margens fixas: o layout automático (constrained/tight) custaria mais que o
+        # próprio desenho a cada gráfico
+        self._figura = Figure(figsize=TAMANHO_POL, dpi=DPI)
+        self._figura.subplots_adjust(left=0.13, right=0.98, top=0.88, bottom=0.14)
+        FigureCanvasAgg(self._figura)
+        self._eixos = self._figura.add_subplot()
+        self._eixos.yaxis.set_animated(True)  # escala muda a cada gráfico
+        self._preparar(self._eixos)
+
+    def renderizar(self, *dados) -> bytes:
+        from PIL import Image
+
+        with self._lock:
+            if self._figura is None:
+                self._criar()
+            eixos, canvas = self._eixos, self._figura.canvas
+            artistas = self._desenhar(eixos, self._artistas, *dados)
+            if artistas is not self._artistas:
+                # Artistas novos (primeiro uso ou outro número de barras): desenha a
+                # figura sem eles e guarda o resultado como fundo
+                for artista in artistas:
+                    artista.set_animated(True)
+                canvas.draw()
+                self._fundo = canvas.copy_from_bbox(self._figura.bbox)
+                self._artistas = artistas
+
+            canvas.restore_region(self._fundo)
+            eixos.draw_artist(eixos.yaxis)
+            for artista in artistas:
+                eixos.draw_artist(artista)
+            imagem = Image.frombuffer(
+                "RGBA", canvas.get_width_height(), canvas.buffer_rgba()
+            ).convert("RGB")
+        # O fpdf2 recomprime a imagem ao inserir: compressão mínima aqui
+        buffer = BytesIO()
+        imagem.save(buffer, format="PNG", compress_level=1)
+        return buffer.getvalue()
+
+
+def _preparar_geracao_consumo(ax):
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+
+    ax.set_title("Geração x Consumo", loc="left", color=_cor(COR_CINZA))
+    ax.set_ylabel("kWh")
+    ax.set_xticks(range(12), [mes.capitalize() for mes in tabelas.MESES])
+    ax.spines[["top", "right"]].set_visible(False)
+    ax.grid(axis="y", alpha=0.3)
+    ax.set_axisbelow(True)
+    ax.legend(
+        handles=[
+            Patch(color=_cor(COR_CINZA), label="Consumo"),
+            Line2D([], [], color=_cor(COR_VERDE), lw=3, label="Geração estimada"),
+        ],
+        loc="lower right",
+        bbox_to_anchor=(1, 1),
+        ncols=2,
+        frameon=False,
+    )
+
+
+def _desenhar_geracao_consumo(ax, artistas, consumo, geracao):
+    if not artistas:
+        barras = ax.bar(range(12), np.zeros(12), color=_cor(COR_CINZA), width=0.6)
+        (linha,) = ax.plot(range(12), np.zeros(12), color=_cor(COR_VERDE), lw=3)
+        linha.set_marker("o")
+        artistas = [*barras, linha]
+    *barras, linha = artistas
+    for barra, valor in zip(barras, consumo):
+        barra.set_height(valor)
+    linha.set_ydata(geracao)
+    ax.set_ylim(0, max(consumo.max(), geracao.max(), 1) * 1.1)
+    return artistas
+
+
+def _preparar_fluxo_caixa(ax):
+    from matplotlib.ticker import FuncFormatter, MaxNLocator
+
+    ax.set_title("Fluxo de Caixa Acumulado", loc="left", color=_cor(COR_CINZA))
+    ax.set_xlabel("Ano")
+    ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+    ax.yaxis.set_major_formatter(
+        FuncFormatter(lambda v, _: f"R$ {v:,.0f}".replace(",", "."))
+    )
+    ax.spines[["top", "right"]].set_visible(False)
+    ax.grid(axis="y", alpha=0.3)
+    ax.set_axisbelow(True)
+
+
+def _desenhar_fluxo_caixa(ax, artistas, fluxo_acumulado):
+    anos = len(fluxo_acumulado)
+    if len(artistas) != anos + 1:  # outro horizonte de análise: refaz as barras
+        for artista in artistas:
+            artista.remove()
+        zero = ax.axhline(0, color=_cor(COR_CINZA), lw=0.8)
+        artistas = [zero, *ax.bar(np.arange(anos), np.zeros(anos))]
+        ax.set_xlim(-0.6, anos - 0.4)
+    for barra, valor in zip(artistas[1:], fluxo_acumulado):
+        barra.set_height(valor)
+        barra.set_color(_cor(COR_VERDE if valor >= 0 else COR_CINZA))
+    menor, maior = min(fluxo_acumulado.min(), 0), max(fluxo_acumulado.max(), 0)
+    folga = (maior - menor) * 0.05 or 1
+    ax.set_ylim(menor - folga, maior + folga)
+    return artistas
+
+
+_MODELOS = {
+    "geracao_consumo": _Modelo(_preparar_geracao_consumo, _desenhar_geracao_consumo),
+    "fluxo_caixa": _Modelo(_preparar_fluxo_caixa, _desenhar_fluxo_caixa),
+}
+
+
+def _png(nome: str, *dados: np.ndarray) -> BytesIO:
+    """PNG do gráfico 'nome', do cache se as mesmas entradas já foram desenhadas."""
+    h = hashlib.sha1(nome.encode(), usedforsecurity=False)
+    for d in dados:
+        h.update(str(d.shape).encode())
+        h.update(d.tobytes())
+    chave = h.hexdigest()
+
+    with _lock_cache:
+        png = _cache.get(chave)
+        if png is not None:
+            _cache.move_to_end(chave)
+    if png is None:
+        png = _MODELOS[nome].renderizar(*dados)
+        with _lock_cache:
+            _cache[chave] = png
+            while len(_cache) > MAX_CACHE:
+                _cache.popitem(last=False)
+    # Um buffer novo a cada chamada: quem lê avança a posição do buffer
+    return BytesIO(png)
+
+
+def grafico_geracao_consumo(consumo_mensal, geracao_mensal) -> BytesIO:
+    """Consumo de cada mês (barras) contra a geração estimada (linha), em kWh.
+
+    geracao_mensal pode ser um valor só (mesma geração todo mês) ou 12 valores.
+    """
+    consumo = np.asarray(consumo_mensal, dtype=float).reshape(12)
+    geracao = np.broadcast_to(np.asarray(geracao_mensal, dtype=float), (12,))
+    return _png("geracao_consumo", consumo, np.ascontiguousarray(geracao))
+
+
+def grafico_fluxo_caixa(fluxo_acumulado) -> BytesIO:
+    """Fluxo de caixa acumulado por ano (ano 0 = investimento), em R$."""
+    return _png("fluxo_caixa", np.asarray(fluxo_acumulado, dtype=float).ravel())
+
+
+def graficos_proposta(df_consumo: pd.DataFrame, resultado: dict) -> dict:
+    """Os dois gráficos do pdf a partir do consumo e do resultado de um orçamento."""
+    with metricas.etapa("graficos.geracao_consumo"):
+        geracao_consumo = grafico_geracao_consumo(
+            calculos.perfil_mensal(df_consumo),
+            resultado.get("perfil_geracao", resultado["geracao_mensal"]),
+        )
+    with metricas.etapa("graficos.fluxo_caixa"):
+        fluxo_caixa = grafico_fluxo_caixa(resultado["retorno"]["fluxo_acumulado"])
+    return {"geracao_consumo": geracao_consumo, "fluxo_caixa": fluxo_caixa}
@@ -0,0 +1,87 @@
+# grafo.py
+# grafo de dependências para recálculo incremental: cada nó é uma função das
+# entradas e de outros nós, e só é recalculado quando algo de que depende muda
+
+import inspect
+import sys
+from collections.abc import Callable
+
+import numpy as np
+
+import metricas
+
+
+def iguais(a, b) -> bool:
+    """Compara valores de entradas e nós: escalares, arrays, DataFrames e coleções."""
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    # Sem importar o pandas: se ele não foi carregado, não há DataFrames
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(a, (pd.DataFrame, pd.Series)):
+        return a.equals(b)
+    if isinstance(a, np.ndarray):
+        return a.shape == b.shape and bool(np.all((a == b) | ((a != a) & (b != b))))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(iguais(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(map(iguais, a, b))
+    if isinstance(a, float) and a != a:
+        return b != b  # NaN
+    return bool(a == b)
+
+
+class GrafoCalculo:
+    """Valores calculados a partir de entradas, com memória por nó.
+
+    Cada nó é registrado com uma função cujos parâmetros têm os nomes das entradas
+    ou dos outros nós de que ele depende:
+
+        grafo.no("geracao_mensal", lambda potencia_kit, ganho_perda: ...)
+
+    definir() atualiza entradas; só as que mudaram de valor invalidam alguma coisa.
+    valor() recalcula sob demanda apenas os nós cujas dependências mudaram. Um nó
+    recalculado que chega ao mesmo valor de antes não invalida os seguintes.
+    Cada recálculo é medido (metricas.etapa) com o nome de etapa do nó.
+    """
+
+    def __init__(self):
+        self._funcoes: dict[str, tuple[Callable, tuple[str, ...], str]] = {}
+        self._valores: dict = {}
+        self._versoes: dict[str, int] = {}  # muda quando o valor muda
+        self._vistas: dict[str, tuple] = {}  # versões das dependências no cálculo
+        self.recalculados: list[str] = []  # nós recalculados desde o último definir()
+
+    def no(self, nome: str, funcao: Callable, etapa: str | None = None) -> None:
+        dependencias = tuple(inspect.signature(funcao).parameters)
+        self._funcoes[nome] = (funcao, dependencias, etapa or nome)
+        self._vistas.pop(nome, None)
+
+    def definir(self, **entradas) -> None:
+        for nome, valor in entradas.items():
+            if nome in self._funcoes:
+                raise ValueError(f"{nome!r} é um nó calculado, não uma entrada")
+            if nome not in self._valores or not iguais(valor, self._valores[nome]):
+                self._valores[nome] = valor
+                self._versoes[nome] = self._versoes.get(nome, 0) + 1
+        self.recalculados = []
+
+    def valor(self, nome: str):
+        if nome not in self._funcoes:
+            if nome not in self._valores:
+                raise KeyError(f"Entrada não definida: {nome!r}")
+            return self._valores[nome]
+
+        funcao, dependencias, etapa = self._funcoes[nome]
+        argumentos = {d: self.valor(d) for d in dependencias}
+        vistas = tuple(self._versoes[d] for d in dependencias)
+        if self._vistas.get(nome) != vistas:
+            with metricas.etapa(etapa):
+                novo = funcao(**argumentos)
+            if nome not in self._valores or not iguais(novo, self._valores[nome]):
+                self._valores[nome] = novo
+                self._versoes[nome] = self._versoes.get(nome, 0) + 1
+            self._vistas[nome] = vistas
+            self.recalculados.append(nome)
+        return self._valores[nome]
@@ -0,0 +1,237 @@
+# irradiancia.py
+# tabela de produtividade mensal (kWh/kWp) por cidade, inclinação e azimute dos
+# módulos, em arrays carregados uma vez por processo. A busca é por índice direto
+# na grade (passos fixos), com interpolação bilinear entre os pontos vizinhos.
+#
+# Para gerar o arquivo da tabela de novo (ex.: depois de mudar as cidades):
+#   python -m irradiancia
+
+import json
+from functools import cache
+from pathlib import Path
+
+import numpy as np
+
+PASTA_DADOS = Path(__file__).parent / "dados"
+ARQUIVO_TABELA = PASTA_DADOS / "irradiancia.npy"
+ARQUIVO_EIXOS = PASTA_DADOS / "irradiancia.json"
+
+# Acima deste tamanho a tabela é mapeada em memória em vez de lida inteira
+LIMITE_MMAP = 16 * 1024**2
+
+CIDADE_PADRAO = "Belo Horizonte"
+
+# Grade: inclinação de 0° a 90° e azimute de 0° a 345° (0° = Norte, 90° = Leste,
+# 180° = Sul, 270° = Oeste); o azimute é circular
+PASSO_INCLINACAO = 5.0
+PASSO_AZIMUTE = 15.0
+
+# Referência atual do orçamento: 7,8 kWp geram 1000 kWh/mês em Belo Horizonte com
+# os módulos na horizontal. A tabela é calibrada para reproduzir esse valor.
+PRODUTIVIDADE_REFERENCIA = 1000 / 7.8
+
+# Irradiação global horizontal média diária (kWh/m².dia, jan a dez) e latitude.
+# Valores aproximados de médias climatológicas, para substituir pela base oficial
+# (ex.: atlas solarimétrico) gerando a tabela de novo
+IRRADIACAO_HORIZONTAL = {
+    "Belo Horizonte": (
+        -19.92,
+        [5.6, 5.9, 5.1, 4.8, 4.3, 4.1, 4.3, 5.0, 5.3, 5.4, 5.0, 5.2],
+    ),
+    "Brasília": (-15.78, [5.3, 5.6, 5.2, 5.2, 5.0, 4.9, 5.2, 5.9, 5.7, 5.4, 5.0, 5.1]),
+    "Curitiba": (-25.43, [5.3, 5.2, 4.6, 3.8, 3.1, 2.8, 3.0, 3.9, 3.9, 4.5, 5.3, 5.6]),
+    "Fortaleza": (-3.72, [5.6, 5.5, 5.0, 4.7, 5.0, 5.0, 5.3, 5.9, 6.2, 6.3, 6.2, 5.9]),
+    "Goiânia": (-16.68, [5.3, 5.6, 5.2, 5.3, 4.9, 4.8, 5.1, 5.9, 5.5, 5.5, 5.3, 5.3]),
+    "Manaus": (-3.10, [4.3, 4.3, 4.3, 4.2, 4.3, 4.6, 4.9, 5.3, 5.3, 5.1, 4.8, 4.5]),
+    "Montes Claros": (
+        -16.73,
+        [6.0, 6.3, 5.6, 5.3, 4.8, 4.6, 4.9, 5.6, 5.9, 5.8, 5.4, 5.7],
+    ),
+    "Porto Alegre": (
+        -30.03,
+        [6.6, 6.0, 5.0, 3.9, 2.9, 2.4, 2.7, 3.4, 4.1, 5.3, 6.4, 6.9],
+    ),
+    "Recife": (-8.05, [6.0, 6.0, 5.7, 5.1, 4.6, 4.3, 4.5, 5.2, 5.7, 6.1, 6.2, 6.1]),
+    "Rio de Janeiro": (
+        -22.91,
+        [6.0, 6.2, 5.3, 4.6, 3.9, 3.7, 3.9, 4.6, 4.7, 5.2, 5.6, 5.8],
+    ),
+    "Salvador": (-12.97, [6.1, 6.2, 5.9, 4.9, 4.3, 4.1, 4.3, 4.9, 5.5, 5.9, 6.0, 6.1]),
+    "São Paulo": (-23.55, [5.4, 5.6, 4.8, 4.3, 3.6, 3.4, 3.6, 4.5, 4.6, 5.1, 5.5, 5.6]),
+    "Uberlândia": (
+        -18.92,
+        [5.5, 5.8, 5.2, 5.1, 4.7, 4.5, 4.8, 5.6, 5.5, 5.5, 5.2, 5.3],
+    ),
+}
+
+DIAS_MES = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+DIA_TIPICO = np.array([17, 47, 75, 105, 135, 162, 198, 228, 258, 288, 318, 344])
+ALBEDO = 0.2
+
+
+@cache
+def _tabela() -> tuple[np.ndarray, dict[str, int], np.ndarray]:
+    """(produtividade[cidade, inclinação, azimute, mês], índice das cidades,
+    produtividade média anual na horizontal de cada cidade)."""
+    eixos = json.loads(ARQUIVO_EIXOS.read_text(encoding="utf-8"))
+    grande = ARQUIVO_TABELA.stat().st_size > LIMITE_MMAP
+    tabela = np.load(ARQUIVO_TABELA, mmap_mode="r" if grande else None)
+    if (eixos["passo_inclinacao"], eixos["passo_azimute"]) != (
+        PASSO_INCLINACAO,
+        PASSO_AZIMUTE,
+    ):
+        raise ValueError("A grade do arquivo de irradiância não é a esperada.")
+    horizontal = np.asarray(tabela[:, 0, 0, :], dtype=float).mean(axis=-1)
+    return tabela, {c: i for i, c in enumerate(eixos["cidades"])}, horizontal
+
+
+def cidades() -> list[str]:
+    return list(_tabela()[1])
+
+
+def _indice_cidade(cidade: str) -> int:
+    try:
+        return _tabela()[1][cidade]
+    except KeyError:
+        raise ValueError(f"Cidade sem dados de irradiância: {cidade!r}") from None
+
+
+def produtividade(cidade: str, inclinacao=0.0, azimute=0.0) -> np.ndarray:
+    """Geração de cada mês (jan a dez) por kWp instalado, em kWh/kWp.
+
+    inclinacao (0° a 90°) e azimute (graus a partir do Norte, no sentido horário)
+    aceitam arrays, combinados por broadcasting; o resultado ganha o eixo dos 12
+    meses no final. Pontos fora da grade são interpolados entre os quatro
+    vizinhos, encontrados por conta (sem busca).
+    """
+    tabela = _tabela()[0][_indice_cidade(cidade)]
+    inclinacao = np.asarray(inclinacao, dtype=float)
+    azimute = np.asarray(azimute, dtype=float) % 360
+    if np.any((inclinacao < 0) | (inclinacao > 90)):
+        raise ValueError("A inclinação dos módulos deve estar entre 0° e 90°.")
+
+    n_inclinacoes, n_azimutes = tabela.shape[:2]
+    i = np.minimum(inclinacao / PASSO_INCLINACAO, n_inclinacoes - 1)
+    j = azimute / PASSO_AZIMUTE
+    i0 = np.minimum(i.astype(int), n_inclinacoes - 2)
+    j0 = j.astype(int) % n_azimutes
+    i1, j1 = i0 + 1, (j0 + 1) % n_azimutes
+    di, dj = (i - i0)[..., None], (j - np.floor(j))[..., None]
+    return (
+        tabela[i0, j0] * (1 - di) * (1 - dj)
+        + tabela[i1, j0] * di * (1 - dj)
+        + tabela[i0, j1] * (1 - di) * dj
+        + tabela[i1, j1] * di * dj
+    )
+
+
+def ganho_perda(cidade: str, inclinacao=0.0, azimute=0.0) -> np.ndarray:
+    """Ganho (+) ou perda (-) anual da orientação em relação à horizontal, em %."""
+    horizontal = _tabela()[2][_indice_cidade(cidade)]
+    anual = produtividade(cidade, inclinacao, azimute).mean(axis=-1)
+    return (anual / horizontal - 1) * 100
+
+
+def potencia_referencia(cidade: str, inclinacao=0.0, azimute=0.0) -> np.ndarray:
+    """Potência (kWp) que gera 1000 kWh/mês na média do ano nesse local e orientação,
+    no formato do parâmetro potencia_referencia de calculos."""
+    return 1000 / produtividade(cidade, inclinacao, azimute).mean(axis=-1)
+
+
+def _irradiacao_inclinada(
+    latitude: float, horizontal: np.ndarray, inclinacao: np.ndarray, azimute: np.ndarray
+) -> np.ndarray:
+    """Irradiação diária no plano dos módulos (..., 12), hora a hora no dia típico
+    de cada mês: difusa pela correlação de Erbs e céu isotrópico (Liu-Jordan)."""
+    lat = np.radians(latitude)
+    declinacao = np.radians(23.45) * np.sin(2 * np.pi * (284 + DIA_TIPICO) / 365)
+    hora = np.radians(15 * (np.arange(0, 24, 0.25) + 0.125 - 12))[:, None]
+    cos_zenite = np.sin(lat) * np.sin(declinacao) + np.cos(lat) * np.cos(
+        declinacao
+    ) * np.cos(hora)
+    cos_zenite = np.clip(cos_zenite, 0, None)  # (instantes, 12)
+
+    # Extraterrestre no plano horizontal, escalada para a irradiação medida
+    excentricidade = 1 + 0.033 * np.cos(2 * np.pi * DIA_TIPICO / 365)
+    extraterrestre = 1.367 * excentricidade * cos_zenite
+    indice_claridade = horizontal / (extraterrestre.sum(axis=0) * 0.25)
+    global_h = extraterrestre * indice_claridade
+    kt = indice_claridade
+    fracao_difusa = np.where(
+        kt <= 0.22,
+        1 - 0.09 * kt,
+        np.where(
+            kt <= 0.8,
+            0.9511 - 0.1604 * kt + 4.388 * kt**2 - 16.638 * kt**3 + 12.336 * kt**4,
+            0.165,
+        ),
+    )
+    difusa = global_h * fracao_difusa
+    direta_h = global_h - difusa
+
+    # Ângulo de incidência: produto escalar entre a direção do sol e a normal dos
+    # módulos, em coordenadas leste/norte/zênite (azimute a partir do Norte)
+    leste = -np.cos(declinacao) * np.sin(hora)
+    norte = np.cos(lat) * np.sin(declinacao) - np.sin(lat) * np.cos(
+        declinacao
+    ) * np.cos(hora)
+    beta = np.radians(inclinacao)[..., None, None]
+    gama = np.radians(azimute)[..., None, None]
+    cos_incidencia = (
+        np.sin(beta) * (np.sin(gama) * leste + np.cos(gama) * norte)
+        + np.cos(beta) * cos_zenite
+    )
+    razao_direta = np.divide(
+        np.clip(cos_incidencia, 0, None),
+        cos_zenite,
+        out=np.zeros(np.broadcast_shapes(cos_incidencia.shape, cos_zenite.shape)),
+        where=cos_zenite > 0.05,
+    )
+    inclinada = (
+        direta_h * razao_direta
+        + difusa * (1 + np.cos(beta)) / 2
+        + global_h * ALBEDO * (1 - np.cos(beta)) / 2
+    )
+    return inclinada.sum(axis=-2) * 0.25
+
+
+def construir_tabela() -> tuple[np.ndarray, dict]:
+    """Monta a tabela [cidade, inclinação, azimute, mês] em kWh/kWp por mês.
+
+    A irradiação no plano dos módulos vezes os dias do mês vezes um desempenho
+    global único (perdas do sistema), calibrado para que Belo Horizonte na
+    horizontal dê PRODUTIVIDADE_REFERENCIA na média do ano.
+    """
+    inclinacoes = np.arange(0, 90 + PASSO_INCLINACAO, PASSO_INCLINACAO)
+    azimutes = np.arange(0, 360, PASSO_AZIMUTE)
+    grade_i, grade_a = np.meshgrid(inclinacoes, azimutes, indexing="ij")
+    nomes = sorted(IRRADIACAO_HORIZONTAL)
+    irradiacao = np.stack(
+        [
+            _irradiacao_inclinada(
+                IRRADIACAO_HORIZONTAL[nome][0],
+                np.array(IRRADIACAO_HORIZONTAL[nome][1]),
+                grade_i,
+                grade_a,
+            )
+            * DIAS_MES
+            for nome in nomes
+        ]
+    )
+    referencia = irradiacao[nomes.index(CIDADE_PADRAO), 0, 0].mean()
+    tabela = (irradiacao * (PRODUTIVIDADE_REFERENCIA / referencia)).astype(np.float32)
+    eixos = {
+        "cidades": nomes,
+        "passo_inclinacao": PASSO_INCLINACAO,
+        "passo_azimute": PASSO_AZIMUTE,
+        "unidade": "kWh/kWp por mês",
+    }
+    return tabela, eixos
+
+
+if __name__ == "__main__":
+    tabela, eixos = construir_tabela()
+    PASTA_DADOS.mkdir(exist_ok=True)
+    np.save(ARQUIVO_TABELA, tabela)
+    ARQUIVO_EIXOS.write_text(json.dumps(eixos, ensure_ascii=False, indent=2) + "\n")
+    print(f"{ARQUIVO_TABELA.name}: {tabela.shape}, {tabela.nbytes / 1024:.0f} KiB")
@@ -0,0 +1,183 @@
+# metricas.py
+# tempo de cada etapa do orçamento (consumo, geração, custos, retorno, gráficos,
+# páginas do pdf...) agregado em histogramas no próprio processo, com exportação
+# em texto do Prometheus ou JSON Lines. Desligado, cada etapa custa uma chamada
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+
+# Limites superiores (s) das faixas dos histogramas, de 10 µs a 100 s
+LIMITES = tuple(m * 10.0**e for e in range(-5, 2) for m in (1, 2, 5)) + (100.0,)
+
+_NULO = nullcontext()
+_ativo = os.environ.get("ORCAMENTOS_METRICAS", "") not in ("", "0")
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class Histograma:
+    """Contagens por faixa de duração, soma e máximo de uma etapa."""
+
+    __slots__ = ("contagens", "n", "soma", "maximo")
+
+    def __init__(self):
+        self.contagens = [0] * (len(LIMITES) + 1)  # a última é acima de 100 s
+        self.n = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, segundos: float) -> None:
+        self.contagens[bisect_left(LIMITES, segundos)] += 1
+        self.n += 1
+        self.soma += segundos
+        self.maximo = max(self.maximo, segundos)
+
+    def percentil(self, p: float) -> float:
+        """Estimativa do percentil p (0 a 100), interpolando dentro da faixa."""
+        if self.n == 0:
+            return float("nan")
+        alvo = p / 100 * self.n
+        acumulado = 0
+        for i, contagem in enumerate(self.contagens):
+            if contagem and acumulado + contagem >= alvo:
+                inicio = LIMITES[i - 1] if i > 0 else 0.0
+                fim = LIMITES[i] if i < len(LIMITES) else self.maximo
+                fim = min(fim, self.maximo)
+                return inicio + (fim - inicio) * (alvo - acumulado) / contagem
+            acumulado += contagem
+        return self.maximo
+
+
+_histogramas: dict[str, Histograma] = {}
+
+
+class _Etapa:
+    __slots__ = ("nome", "inicio")
+
+    def __init__(self, nome: str):
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        registrar(self.nome, time.perf_counter() - self.inicio)
+
+
+def ativar(ativo: bool = True) -> None:
+    """Liga (ou desliga) a medição em todo o processo.
+
+    Também liga com a variável de ambiente ORCAMENTOS_METRICAS=1.
+    """
+    global _ativo
+    _ativo = ativo
+
+
+def ativo() -> bool:
+    return _ativo
+
+
+def etapa(nome: str):
+    """Contexto que mede o bloco como a etapa 'nome':
+
+        with metricas.etapa("pdf.output"):
+            ...
+
+    Desligado, devolve sempre o mesmo contexto vazio.
+    """
+    if not _ativo:
+        return _NULO
+    return _Etapa(nome)
+
+
+def registrar(nome: str, segundos: float) -> None:
+    """Registra uma duração medida por fora de etapa()."""
+    if not _ativo:
+        return
+    with _lock:
+        histograma = _histogramas.get(nome)
+        if histograma is None:
+            histograma = _histogramas[nome] = Histograma()
+        histograma.registrar(segundos)
+    etapas = getattr(_local, "etapas", None)
+    if etapas is not None:
+        etapas.append((nome, segundos))
+
+
+def iniciar_execucao() -> None:
+    """Passa a guardar as etapas medidas nesta thread (ex.: uma execução do app)."""
+    _local.etapas = []
+
+
+def etapas_execucao() -> list[tuple[str, float]]:
+    """(etapa, segundos) medidas nesta thread desde iniciar_execucao(), na ordem
+    em que terminaram."""
+    return list(getattr(_local, "etapas", None) or [])
+
+
+def resumo() -> dict[str, dict]:
+    """n, soma, p50, p95, p99 e máximo (s) de cada etapa medida até agora."""
+    with _lock:
+        return {
+            nome: {
+                "n": h.n,
+                "soma": h.soma,
+                "p50": h.percentil(50),
+                "p95": h.percentil(95),
+                "p99": h.percentil(99),
+                "maximo": h.maximo,
+            }
+            for nome, h in sorted(_histogramas.items())
+        }
+
+
+def limpar() -> None:
+    with _lock:
+        _histogramas.clear()
+
+
+def texto_prometheus() -> str:
+    """Os histogramas no formato de texto do Prometheus."""
+    linhas = [
+        "# HELP orcamentos_etapa_segundos Duração das etapas do orçamento.",
+        "# TYPE orcamentos_etapa_segundos histogram",
+    ]
+    with _lock:
+        for nome, h in sorted(_histogramas.items()):
+            rotulo = nome.replace("\\", "\\\\").replace('"', '\\"')
+            acumulado = 0
+            for limite, contagem in zip(LIMITES + (float("inf"),), h.contagens):
+                acumulado += contagem
+                le = "+Inf" if limite == float("inf") else f"{limite:g}"
+                linhas.append(
+                    f'orcamentos_etapa_segundos_bucket{{etapa="{rotulo}",le="{le}"}} '
+                    f"{acumulado}"
+                )
+            linhas.append(
+                f'orcamentos_etapa_segundos_sum{{etapa="{rotulo}"}} {h.soma!r}'
+            )
+            linhas.append(f'orcamentos_etapa_segundos_count{{etapa="{rotulo}"}} {h.n}')
+    return "\n".join(linhas) + "\n"
+
+
+def exportar(caminho: str | Path) -> None:
+    """Grava as métricas: .jsonl acrescenta uma linha por etapa com o resumo (em
+    ms) e o momento; qualquer outra extensão recebe o texto do Prometheus."""
+    caminho = Path(caminho)
+    if caminho.suffix == ".jsonl":
+        momento = datetime.now().isoformat(timespec="seconds")
+        with open(caminho, "a", encoding="utf-8") as arquivo:
+            for nome, r in resumo().items():
+                linha = {"momento": momento, "etapa": nome, "n": r["n"]}
+                for chave in ("soma", "p50", "p95", "p99", "maximo"):
+                    linha[f"{chave}_ms"] = round(r[chave] * 1000, 4)
+                arquivo.write(json.dumps(linha, ensure_ascii=False) + "\n")
+    else:
+        caminho.write_text(texto_prometheus(), encoding="utf-8")
@@ -0,0 +1,330 @@
+# modelo.py
+# modelo de dados tipado de um orçamento: valores numéricos puros (a formatação
+# fica para a hora de desenhar o pdf ou a tela), com conversão de e para os
+# dicionários de entradas e de resultado usados no resto do código
+
+import hashlib
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass(frozen=True, slots=True)
+class Cliente:
+    nome: str
+    endereco: str
+    numero: int
+
+
+@dataclass(frozen=True, slots=True)
+class Tarifa:
+    """Tarifas sem impostos (R$/kWh; Fio B em R$/MWh), impostos e reajuste em %."""
+
+    icms: float
+    pis: float
+    cofins: float
+    custo_tusd: float
+    custo_te: float
+    custo_fio_b: float
+    fator_simultaneidade: float
+    reajuste_tarifa: float
+
+
+@dataclass(frozen=True, slots=True)
+class Kit:
+    potencia_kit: float  # kWp
+    potencia_modulos: float  # Wp
+    tipo_estrutura: str
+    inversor: str
+    ganho_perda: float  # %, além do efeito da orientação
+    degradacao: float  # % a.a.
+    cidade: str
+    inclinacao: float  # graus
+    azimute: float  # graus a partir do Norte
+
+
+@dataclass(frozen=True, slots=True)
+class Custos:
+    """Composição do preço: custo do kit e percentuais (adicional de projeto,
+    comissão e lucro)."""
+
+    custo_kit: float
+    adicional_projeto: float
+    comissao: float
+    lucro_inovasol: float
+
+
+@dataclass(frozen=True, slots=True)
+class Consumo:
+    """Consumo mês a mês de cada imóvel (kWh) e a disponibilidade de cada um.
+
+    kwh é meses x imóveis, como o df_consumo, com None nos meses sem leitura: NaN
+    não é igual a si mesmo e estragaria a comparação de propostas iguais.
+    disponibilidades (kWh/mês) segue a ordem de imoveis.
+    """
+
+    meses: tuple
+    imoveis: tuple[str, ...]
+    kwh: tuple[tuple[float | None, ...], ...]
+    disponibilidades: tuple[float, ...]
+
+    @classmethod
+    def de_dataframe(
+        cls, df_consumo: "pd.DataFrame", dict_disponibilidades: dict
+    ) -> "Consumo":
+        """A partir do df_consumo e do dict_disponibilidades ('disp_imvN')."""
+        return cls.de_dict(
+            {
+                "meses": df_consumo.index.tolist(),
+                "imoveis": df_consumo.columns.tolist(),
+                "kwh": df_consumo.to_numpy(dtype=float, na_value=np.nan).tolist(),
+                "disponibilidades": dict_disponibilidades,
+            }
+        )
+
+    @classmethod
+    def de_dict(cls, consumo: dict) -> "Consumo":
+        """A partir do formato de para_dict (o da coluna consumo do histórico)."""
+        imoveis = tuple(str(imv) for imv in consumo["imoveis"])
+        return cls(
+            meses=tuple(consumo["meses"]),
+            imoveis=imoveis,
+            kwh=tuple(
+                tuple(None if v is None or np.isnan(v) else float(v) for v in linha)
+                for linha in consumo["kwh"]
+            ),
+            disponibilidades=tuple(
+                float(consumo["disponibilidades"].get(f"disp_{imv}", 0))
+                for imv in imoveis
+            ),
+        )
+
+    def para_dict(self) -> dict:
+        """Meses, imóveis, kwh e disponibilidades ('disp_imvN'), serializável em
+        JSON."""
+        return {
+            "meses": list(self.meses),
+            "imoveis": list(self.imoveis),
+            "kwh": [list(linha) for linha in self.kwh],
+            "disponibilidades": self.dict_disponibilidades(),
+        }
+
+    def df_consumo(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.DataFrame(
+            list(self.kwh),
+            index=list(self.meses),
+            columns=list(self.imoveis),
+            dtype=float,
+        )
+
+    def dict_disponibilidades(self) -> dict:
+        return {
+            f"disp_{imv}": disp
+            for imv, disp in zip(self.imoveis, self.disponibilidades)
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ResultadoFinanceiro:
+    """Resultados de um orçamento.
+
+    O fluxo anual (ano 0 = investimento) fica em um buffer float64, bem menor que
+    uma tupla de floats quando há muitas propostas em memória; fluxo_anual() o
+    devolve como array.
+    """
+
+    consumo_mensal: float
+    geracao_mensal: float
+    n_modulos: int
+    area_painel: float
+    total_nf: float
+    total_projeto: float
+    vpl: float
+    tir: float
+    payback: float
+    payback_descontado: float
+    economia_primeiro_ano: float
+    fluxo_anual_bytes: bytes
+    # Conta de energia pela simulação da compensação (compensacao.simular), em R$:
+    # média mensal do 1º ano sem e com o sistema e a economia do 1º ano
+    conta_atual: float | None = None
+    nova_conta: float | None = None
+    economia_conta: float | None = None
+
+    @classmethod
+    def de_dict(cls, resultado: dict) -> "ResultadoFinanceiro":
+        """A partir do dicionário retornado por orcamento.calcular_orcamento."""
+        retorno = resultado["retorno"]
+        conta = resultado.get("compensacao", {})
+        return cls(
+            consumo_mensal=float(resultado["consumo_mensal"]),
+            geracao_mensal=float(resultado["geracao_mensal"]),
+            n_modulos=int(resultado["n_modulos"]),
+            area_painel=float(resultado["area_painel"]),
+            total_nf=float(resultado["total_nf"]),
+            total_projeto=float(resultado["total_projeto"]),
+            vpl=float(retorno["vpl"]),
+            tir=float(retorno["tir"]),
+            payback=float(retorno["payback"]),
+            payback_descontado=float(retorno["payback_descontado"]),
+            economia_primeiro_ano=float(retorno["economia_primeiro_ano"]),
+            fluxo_anual_bytes=np.asarray(retorno["fluxo_anual"], dtype="<f8").tobytes(),
+            conta_atual=_float_ou_none(conta.get("conta_atual")),
+            nova_conta=_float_ou_none(conta.get("nova_conta")),
+            economia_conta=_float_ou_none(conta.get("economia_primeiro_ano")),
+        )
+
+    def fluxo_anual(self) -> np.ndarray:
+        return np.frombuffer(self.fluxo_anual_bytes, dtype="<f8")
+
+    def para_dict(self) -> dict:
+        """No formato de orcamento.calcular_orcamento, sem dict_custos e dict_fluxo.
+
+        Os fluxos acumulado e mensal são refeitos a partir do anual; o mensal é
+        aproximado, com a economia de cada ano dividida igualmente entre os 12 meses.
+        """
+        fluxo_anual = self.fluxo_anual().copy()
+        fluxo_mensal = np.concatenate(
+            [fluxo_anual[:1], np.repeat(fluxo_anual[1:] / 12, 12)]
+        )
+        resultado = {
+            "consumo_mensal": self.consumo_mensal,
+            "geracao_mensal": self.geracao_mensal,
+            "n_modulos": self.n_modulos,
+            "area_painel": self.area_painel,
+            "total_nf": self.total_nf,
+            "total_projeto": self.total_projeto,
+            "retorno": {
+                "vpl": self.vpl,
+                "tir": self.tir,
+                "payback": self.payback,
+                "payback_descontado": self.payback_descontado,
+                "economia_primeiro_ano": self.economia_primeiro_ano,
+                "fluxo_anual": fluxo_anual,
+                "fluxo_acumulado": np.cumsum(fluxo_anual),
+                "fluxo_mensal": fluxo_mensal,
+            },
+        }
+        if self.nova_conta is not None:
+            resultado["compensacao"] = {
+                "conta_atual": self.conta_atual,
+                "nova_conta": self.nova_conta,
+                "economia_primeiro_ano": self.economia_conta,
+            }
+        return resultado
+
+
+@dataclass(frozen=True, slots=True)
+class Proposta:
+    """Um orçamento completo. Imutável e hashable, pode ser usado como chave de
+    cache; impressao() dá uma chave estável entre processos.
+
+    A igualdade e o hash também vêm de impressao(): a TIR e o payback que não
+    existem são NaN, e NaN != NaN faria a mesma proposta diferir de si mesma.
+    """
+
+    cliente: Cliente
+    tarifa: Tarifa
+    kit: Kit
+    custos: Custos
+    numero: int
+    ano: int
+    tma: float  # % a.a.
+    prazo_vpl: int  # anos
+    consumo: Consumo | None = None
+    resultado: ResultadoFinanceiro | None = None
+
+    @classmethod
+    def de_dicts(
+        cls,
+        entradas: dict,
+        resultado: dict | None = None,
+        df_consumo: "pd.DataFrame | None" = None,
+        dict_disponibilidades: dict | None = None,
+    ) -> "Proposta":
+        """A partir das entradas do formulário (completas, como em
+        orcamento.ENTRADAS_PADRAO) e, opcionalmente, do resultado calculado.
+
+        O consumo vem de df_consumo e dict_disponibilidades ou, sem eles, da chave
+        'consumo' das entradas (como em entradas()), se houver.
+        """
+        if df_consumo is not None:
+            consumo = Consumo.de_dataframe(df_consumo, dict_disponibilidades or {})
+        elif entradas.get("consumo") is not None:
+            consumo = Consumo.de_dict(entradas["consumo"])
+        else:
+            consumo = None
+        return cls(
+            cliente=Cliente(
+                nome=str(entradas["cliente_nome"]),
+                endereco=str(entradas["endereco_cliente"]),
+                numero=int(entradas["cliente_numero"]),
+            ),
+            tarifa=_de_entradas(Tarifa, entradas),
+            kit=_de_entradas(Kit, entradas),
+            custos=_de_entradas(Custos, entradas),
+            numero=int(entradas["numero_proposta"]),
+            ano=int(entradas["ano_proposta"]),
+            tma=float(entradas["tma"]),
+            prazo_vpl=int(entradas["prazo_vpl"]),
+            consumo=consumo,
+            resultado=(
+                ResultadoFinanceiro.de_dict(resultado)
+                if resultado is not None
+                else None
+            ),
+        )
+
+    def entradas(self) -> dict:
+        """No formato das entradas do formulário (chaves de ENTRADAS_PADRAO), mais
+        'consumo' (Consumo.para_dict) quando a proposta tem o consumo."""
+        entradas = {
+            "cliente_nome": self.cliente.nome,
+            "endereco_cliente": self.cliente.endereco,
+            "cliente_numero": self.cliente.numero,
+            "numero_proposta": self.numero,
+            "ano_proposta": self.ano,
+            **_para_entradas(self.tarifa),
+            "tma": self.tma,
+            "prazo_vpl": self.prazo_vpl,
+            **_para_entradas(self.kit),
+            **_para_entradas(self.custos),
+        }
+        if self.consumo is not None:
+            entradas["consumo"] = self.consumo.para_dict()
+        return entradas
+
+    def impressao(self) -> str:
+        """Hash (sha1) do conteúdo, igual em qualquer processo.
+
+        hash() não serve entre processos: o hash de textos muda a cada execução.
+        """
+        return hashlib.sha1(repr(self).encode(), usedforsecurity=False).hexdigest()
+
+    def __eq__(self, outra) -> bool:
+        if not isinstance(outra, Proposta):
+            return NotImplemented
+        return self.impressao() == outra.impressao()
+
+    def __hash__(self) -> int:
+        return hash(self.impressao())
+
+
+def _float_ou_none(valor) -> float | None:
+    return None if valor is None else float(valor)
+
+
+def _de_entradas(cls, entradas: dict):
+    # Campos com o mesmo nome das entradas, convertidos para o tipo anotado: 5 e
+    # 5.0 dão a mesma impressão
+    return cls(**{c.name: c.type(entradas[c.name]) for c in fields(cls)})
+
+
+def _para_entradas(objeto) -> dict:
+    return {c.name: getattr(objeto, c.name) for c in fields(objeto)}
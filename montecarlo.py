@@ -0,0 +1,181 @@
+# montecarlo.py
+# análise de risco: sorteia reajuste tarifário, TMA, geração e degradação e avalia
+# a compensação e o fluxo de caixa de todos os sorteios de uma vez (matriz
+# sorteios x meses)
+
+import numpy as np
+
+import calculos
+import compensacao
+
+# Distribuição de cada variável em torno do valor do orçamento, como desvios na
+# unidade da própria variável (% a.a.; na geração, % da geração esperada):
+#   ("normal", desvio), ("uniforme", abaixo, acima),
+#   ("triangular", abaixo, acima) com moda no valor do orçamento, ou ("fixo",)
+DISTRIBUICOES_PADRAO = {
+    "reajuste_tarifa": ("normal", 2.0),
+    "tma": ("normal", 1.5),
+    "geracao": ("normal", 7.0),
+    "degradacao": ("triangular", 0.2, 0.3),
+}
+
+PERCENTIS = (10, 50, 90)
+
+# Sorteios avaliados por vez: cada um ocupa ~5 kB durante a avaliação (a economia
+# mês a mês por 25 anos e as somas anuais), então 10 mil ficam em ~50 MB de pico
+BLOCO_PADRAO = 10_000
+
+
+def _desvios(rng: np.random.Generator, distribuicao: tuple, n: int) -> np.ndarray:
+    tipo, *parametros = distribuicao
+    if tipo == "normal":
+        return rng.normal(0.0, parametros[0], n)
+    if tipo == "uniforme":
+        return rng.uniform(-parametros[0], parametros[1], n)
+    if tipo == "triangular":
+        abaixo, acima = parametros
+        if abaixo == acima == 0:
+            return np.zeros(n)
+        return rng.triangular(-abaixo, 0.0, acima, n)
+    if tipo == "fixo":
+        return np.zeros(n)
+    raise ValueError(f"Distribuição desconhecida: {tipo!r}")
+
+
+def sortear(
+    base: dict,
+    n_sorteios: int,
+    semente: int = 0,
+    distribuicoes: dict | None = None,
+) -> dict[str, np.ndarray]:
+    """Sorteia as variáveis incertas em torno dos valores de base.
+
+    base tem 'reajuste_tarifa', 'tma', 'degradacao' (% a.a.) e 'geracao_mensal'
+    (kWh). Retorna arrays (n_sorteios,) com essas mesmas chaves. distribuicoes
+    substitui as de DISTRIBUICOES_PADRAO variável a variável. A mesma semente dá
+    sempre os mesmos sorteios.
+    """
+    distribuicoes = {**DISTRIBUICOES_PADRAO, **(distribuicoes or {})}
+    rng = np.random.default_rng(semente)
+    desvios = {
+        nome: _desvios(rng, distribuicoes[nome], n_sorteios)
+        for nome in DISTRIBUICOES_PADRAO
+    }
+    return {
+        "reajuste_tarifa": base["reajuste_tarifa"] + desvios["reajuste_tarifa"],
+        "tma": base["tma"] + desvios["tma"],
+        "geracao_mensal": base["geracao_mensal"]
+        * np.maximum(1 + desvios["geracao"] / 100, 0.0),
+        "degradacao": np.maximum(base["degradacao"] + desvios["degradacao"], 0.0),
+    }
+
+
+def _percentis(valores: np.ndarray, ausente: float) -> dict[int, float]:
+    # NaN vira ausente (+inf no payback que não acontece, -inf na TIR que não
+    # existe) e os percentis são valores observados, sem interpolar com infinitos
+    valores = np.where(np.isnan(valores), ausente, valores)
+    return dict(
+        zip(
+            PERCENTIS,
+            np.percentile(valores, PERCENTIS, method="inverted_cdf").tolist(),
+        )
+    )
+
+
+def _fluxo_compensacao(dict_base: dict, sorteios: dict, anos: int) -> dict:
+    """Indicadores de um bloco de sorteios pela simulação da compensação.
+
+    A geração sorteada escala o perfil mês a mês do orçamento; a economia de cada
+    sorteio vem de compensacao.economia, o mesmo modelo de compensacao.simular
+    usado no orçamento.
+    """
+    escala = sorteios["geracao_mensal"] / dict_base["geracao_mensal"]
+    economia = compensacao.economia(
+        escala[:, None] * np.asarray(dict_base["perfil_geracao"], dtype=float),
+        dict_base["perfil_consumo"],
+        dict_base["tarifa_tusd"],
+        dict_base["tarifa_te"],
+        dict_base["custo_fio_b"],
+        dict_base["fator_simultaneidade"],
+        disponibilidade=dict_base.get("disponibilidade", 0.0),
+        anos=anos,
+        reajuste_tarifa=sorteios["reajuste_tarifa"],
+        degradacao=sorteios["degradacao"],
+        ano_inicio=dict_base.get("ano_inicio", 2026),
+    )
+    return calculos.indicadores_economia(
+        dict_base["total_projeto"], economia, sorteios["tma"]
+    )
+
+
+def simular(
+    dict_base: dict,
+    tma: float,
+    n_sorteios: int = 10_000,
+    semente: int = 0,
+    distribuicoes: dict | None = None,
+    anos: int = 25,
+    bloco: int | None = BLOCO_PADRAO,
+) -> dict:
+    """Payback, TIR e VPL de n_sorteios cenários sorteados em torno do orçamento.
+
+    dict_base tem as chaves de calculos.retorno_financeiro ('total_projeto',
+    geração, tarifas, reajuste e degradação), como {**dict_fluxo, **custos} de um
+    orçamento calculado. Com 'perfil_geracao' e 'perfil_consumo' (e
+    'disponibilidade'), como no dict_fluxo do orçamento, a economia de cada sorteio
+    vem da simulação da compensação, a mesma do payback do orçamento; sem eles, de
+    calculos.fluxo_caixa, limitada por 'consumo_mensal' se houver. Os sorteios são
+    avaliados em blocos de 'bloco' cenários (None avalia todos de uma vez), cada
+    bloco como uma matriz cenários x meses; os sorteios são feitos antes, então o
+    resultado não depende do tamanho do bloco.
+
+    Retorna os arrays (n_sorteios,) 'payback', 'payback_descontado', 'tir' e 'vpl',
+    'percentis' com P10/P50/P90 de cada um (inf quando o payback não acontece no
+    horizonte) e 'prob_payback', a fração dos cenários que se pagam em 'anos'.
+    """
+    sorteios = sortear(
+        {
+            "reajuste_tarifa": dict_base.get("reajuste_tarifa", 6.0),
+            "tma": tma,
+            "geracao_mensal": dict_base["geracao_mensal"],
+            "degradacao": dict_base.get("degradacao", 0.5),
+        },
+        n_sorteios,
+        semente,
+        distribuicoes,
+    )
+    chaves = ("payback", "payback_descontado", "tir", "vpl")
+    resultado = {chave: np.empty(n_sorteios) for chave in chaves}
+    bloco = bloco or max(n_sorteios, 1)
+    for inicio in range(0, n_sorteios, bloco):
+        fatia = slice(inicio, inicio + bloco)
+        if "perfil_consumo" in dict_base:
+            fluxo = _fluxo_compensacao(
+                dict_base,
+                {nome: valores[fatia] for nome, valores in sorteios.items()},
+                anos,
+            )
+        else:
+            fluxo = calculos.fluxo_caixa(
+                investimento=dict_base["total_projeto"],
+                tarifa_tusd=dict_base["tarifa_tusd"],
+                tarifa_te=dict_base["tarifa_te"],
+                fator_simultaneidade=dict_base["fator_simultaneidade"],
+                custo_fio_b=dict_base["custo_fio_b"],
+                anos=anos,
+                ano_inicio=dict_base.get("ano_inicio", 2026),
+                consumo_mensal=dict_base.get("consumo_mensal"),
+                **{nome: valores[fatia] for nome, valores in sorteios.items()},
+            )
+        for chave in chaves:
+            resultado[chave][fatia] = fluxo[chave]
+
+    resultado["percentis"] = {
+        "payback": _percentis(resultado["payback"], np.inf),
+        "payback_descontado": _percentis(resultado["payback_descontado"], np.inf),
+        "tir": _percentis(resultado["tir"], -np.inf),
+        "vpl": _percentis(resultado["vpl"], -np.inf),
+    }
+    resultado["prob_payback"] = float(np.mean(~np.isnan(resultado["payback"])))
+    resultado["n_sorteios"] = n_sorteios
+    return resultado
@@ -0,0 +1,397 @@
+# orcamento.py
+# pipeline completo de um orçamento (entradas -> cálculos -> dados do pdf),
+# sem dependência do streamlit, para ser usado pelo app e pela linha de comando
+
+from __future__ import annotations
+
+from datetime import date
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+import calculos
+import compensacao
+import irradiancia
+from grafo import GrafoCalculo
+from modelo import Proposta
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Área ocupada por módulo (m²) conforme o tipo de estrutura
+AREA_POR_MODULO = {"Telhado": 7, "Laje": 9, "Solo": 10}
+
+MESES_EXTENSO = [
+    "Janeiro",
+    "Fevereiro",
+    "Março",
+    "Abril",
+    "Maio",
+    "Junho",
+    "Julho",
+    "Agosto",
+    "Setembro",
+    "Outubro",
+    "Novembro",
+    "Dezembro",
+]
+
+# Valores padrão das entradas, os mesmos do app
+ENTRADAS_PADRAO = {
+    # Dados do cliente
+    "cliente_nome": "",
+    "endereco_cliente": "",
+    "cliente_numero": 0,
+    "numero_proposta": 1,
+    "ano_proposta": 2026,
+    # Composição da tarifa
+    "icms": 18.0,
+    "pis": 0.8,
+    "cofins": 3.7,
+    "fator_simultaneidade": 0.38,
+    "custo_fio_b": 240.38,
+    "custo_tusd": 0.4354,
+    "custo_te": 0.3136,
+    # Parâmetros financeiros
+    "tma": 10.0,
+    "reajuste_tarifa": 6.0,
+    "degradacao": 0.5,
+    "prazo_vpl": 25,
+    # Kit e composição do preço
+    "potencia_kit": 4.5,
+    "potencia_modulos": 620,
+    "tipo_estrutura": "Telhado",
+    "inversor": "Inversor X",
+    "custo_kit": 12000.00,
+    "ganho_perda": 0,
+    # Local e orientação dos módulos (azimute em graus a partir do Norte)
+    "cidade": irradiancia.CIDADE_PADRAO,
+    "inclinacao": 0.0,
+    "azimute": 0.0,
+    "adicional_projeto": 0,
+    "comissao": 5,
+    "lucro_inovasol": 30,
+}
+
+
+def area_painel(n_modulos: float, tipo_estrutura: str) -> float:
+    if tipo_estrutura not in AREA_POR_MODULO:
+        raise ValueError(f"Estrutura inválida: {tipo_estrutura!r}")
+    return n_modulos * AREA_POR_MODULO[tipo_estrutura]
+
+
+def _tarifas(icms, pis, cofins, custo_tusd, custo_te, custo_fio_b) -> dict:
+    impostos = (icms, pis, cofins)
+    return {
+        "tarifa_tusd": calculos.tarifa_com_impostos(custo_tusd, *impostos),
+        "tarifa_te": calculos.tarifa_com_impostos(custo_te, *impostos),
+        "custo_fio_b": calculos.tarifa_com_impostos(custo_fio_b / 1000, *impostos),
+    }
+
+
+def _perfil_geracao(
+    potencia_kit, ganho_perda, cidade, inclinacao, azimute
+) -> np.ndarray:
+    # A orientação entra pela tabela de irradiância; ganho_perda é um ajuste a mais
+    produtividade = irradiancia.produtividade(cidade, inclinacao, azimute)
+    return potencia_kit * produtividade * (1 + ganho_perda / 100)
+
+
+def _geracao_mensal(perfil_geracao) -> float:
+    return float(perfil_geracao.mean())
+
+
+def _n_modulos(potencia_kit, potencia_modulos) -> float:
+    return round((potencia_kit * 1000) / potencia_modulos, 0)
+
+
+def _dict_custos(
+    tabela_preco,
+    lucro_inovasol,
+    comissao,
+    potencia_kit,
+    df_projeto,
+    adicional_projeto,
+    df_impostos,
+    custo_kit,
+) -> dict:
+    return {
+        "df_preco": tabela_preco,
+        "lucro_inovasol": lucro_inovasol,
+        "comissao": comissao,
+        "potencia_kit": potencia_kit,
+        "df_projeto": df_projeto,
+        "adicional_projeto": adicional_projeto,
+        "df_impostos": df_impostos,
+        "custo_kit": custo_kit,
+    }
+
+
+def _custos(dict_custos) -> dict:
+    return calculos.custo_total(dict_custos=dict_custos)
+
+
+def _dict_fluxo(
+    geracao_mensal,
+    consumo_mensal,
+    perfil_geracao,
+    perfil_consumo,
+    disponibilidade,
+    tarifas,
+    fator_simultaneidade,
+    reajuste_tarifa,
+    degradacao,
+    ano_proposta,
+) -> dict:
+    # Os perfis mês a mês e a disponibilidade levam a simulação da compensação para
+    # a análise de risco; consumo_mensal limita a economia nos cenários
+    return {
+        "geracao_mensal": geracao_mensal,
+        "consumo_mensal": consumo_mensal,
+        "perfil_geracao": perfil_geracao,
+        "perfil_consumo": perfil_consumo,
+        "disponibilidade": disponibilidade,
+        **tarifas,
+        "fator_simultaneidade": fator_simultaneidade,
+        "reajuste_tarifa": reajuste_tarifa,
+        "degradacao": degradacao,
+        "ano_inicio": ano_proposta,
+    }
+
+
+def _retorno(dict_fluxo, custos, compensacao, tma, prazo_vpl) -> dict:
+    # A economia mês a mês da simulação da compensação, a mesma da "Nova Conta" e
+    # da "Economia 1º Ano", para que payback, TIR e VPL batam com elas
+    return calculos.retorno_financeiro(
+        {
+            **dict_fluxo,
+            "total_projeto": custos["total_projeto"],
+            "economia_mensal": compensacao["economia_mensal"],
+        },
+        tma=tma,
+        prazo_vpl=prazo_vpl,
+    )
+
+
+def _compensacao(
+    perfil_geracao,
+    perfil_consumo,
+    disponibilidade,
+    tarifas,
+    fator_simultaneidade,
+    reajuste_tarifa,
+    degradacao,
+    ano_proposta,
+    prazo_vpl,
+) -> dict:
+    simulacao = compensacao.simular(
+        perfil_geracao,
+        perfil_consumo,
+        tarifas["tarifa_tusd"],
+        tarifas["tarifa_te"],
+        tarifas["custo_fio_b"],
+        fator_simultaneidade,
+        disponibilidade=disponibilidade,
+        anos=prazo_vpl,
+        reajuste_tarifa=reajuste_tarifa,
+        degradacao=degradacao,
+        ano_inicio=ano_proposta,
+    )
+    return {
+        **{
+            chave: float(simulacao[chave])
+            for chave in (
+                "conta_atual",
+                "nova_conta",
+                "economia_primeiro_ano",
+                "fator_simultaneidade",
+            )
+        },
+        "economia_anual": simulacao["economia_anual"],
+        "economia_mensal": simulacao["economia"].reshape(-1),
+        "creditos_expirados": float(simulacao["creditos_expirados"].sum()),
+    }
+
+
+def _resultado(
+    consumo_mensal,
+    geracao_mensal,
+    perfil_geracao,
+    n_modulos,
+    area_painel,
+    custos,
+    retorno,
+    compensacao,
+    dict_custos,
+    dict_fluxo,
+) -> dict:
+    return {
+        "consumo_mensal": consumo_mensal,
+        "geracao_mensal": geracao_mensal,
+        "perfil_geracao": perfil_geracao,
+        "n_modulos": n_modulos,
+        "area_painel": area_painel,
+        "total_nf": custos["total_nf"],
+        "total_projeto": custos["total_projeto"],
+        "retorno": retorno,
+        "compensacao": compensacao,
+        "dict_custos": dict_custos,
+        "dict_fluxo": dict_fluxo,
+    }
+
+
+def grafo_orcamento(
+    df_projeto: pd.DataFrame | calculos.TabelaProjeto,
+    df_preco: pd.DataFrame | calculos.TabelaPreco,
+    df_impostos: pd.DataFrame,
+) -> GrafoCalculo:
+    """Grafo de recálculo incremental de um orçamento.
+
+    Entradas: as de ENTRADAS_PADRAO (já com os valores padrão), df_consumo e
+    dict_disponibilidades, além das tabelas. O nó "resultado" tem o mesmo formato
+    do retorno de calcular_orcamento. Dependências:
+
+        tarifas  <- icms, pis, cofins, custo_tusd, custo_te, custo_fio_b
+        consumo_mensal <- df_consumo, dict_disponibilidades
+        perfil_geracao (12 meses) <- potencia_kit, ganho_perda, cidade,
+            inclinacao, azimute (tabela de irradiância) -> geracao_mensal (média)
+        n_modulos, area_painel <- potencia_kit, potencia_modulos, tipo_estrutura
+        tabela_preco (arrays de df_preco) -> dict_custos -> custos (NF e total)
+        dict_fluxo <- geracao_mensal, consumo_mensal, perfis, disponibilidade,
+            tarifas e parâmetros do fluxo
+        compensacao (conta nova e economia) <- perfil_geracao, perfil_consumo,
+            disponibilidade, tarifas e parâmetros do fluxo
+        retorno <- dict_fluxo, custos, compensacao (economia mês a mês), tma,
+            prazo_vpl
+
+    Assim, mudar só a comissão recalcula custos e retorno, mas não a geração; mudar
+    só ganho_perda recalcula geração e retorno, mas não os custos. Com as métricas
+    ligadas, cada nó é medido como "<etapa>.<nó>" (consumo, geracao, custos,
+    retorno).
+    """
+    grafo = GrafoCalculo()
+    grafo.no("tarifas", _tarifas, "retorno.tarifas")
+    grafo.no("consumo_mensal", calculos.consumo_medio, "consumo.consumo_mensal")
+    grafo.no("perfil_geracao", _perfil_geracao, "geracao.perfil_geracao")
+    grafo.no("geracao_mensal", _geracao_mensal, "geracao.geracao_mensal")
+    grafo.no("n_modulos", _n_modulos, "geracao.n_modulos")
+    grafo.no("area_painel", area_painel, "geracao.area_painel")
+    grafo.no("tabela_preco", calculos.tabela_preco, "custos.tabela_preco")
+    grafo.no("dict_custos", _dict_custos, "custos.dict_custos")
+    grafo.no("custos", _custos, "custos.custos")
+    grafo.no("dict_fluxo", _dict_fluxo, "retorno.dict_fluxo")
+    grafo.no("retorno", _retorno, "retorno.retorno")
+    grafo.no("perfil_consumo", calculos.perfil_mensal, "consumo.perfil_consumo")
+    grafo.no(
+        "disponibilidade", calculos.disponibilidade_total, "consumo.disponibilidade"
+    )
+    grafo.no("compensacao", _compensacao, "retorno.compensacao")
+    grafo.no("resultado", _resultado, "orcamento.resultado")
+    grafo.definir(
+        **ENTRADAS_PADRAO,
+        df_projeto=df_projeto,
+        df_preco=df_preco,
+        df_impostos=df_impostos,
+    )
+    return grafo
+
+
+def calcular_orcamento(
+    entradas: dict,
+    df_consumo: pd.DataFrame,
+    dict_disponibilidades: dict,
+    df_projeto: pd.DataFrame | calculos.TabelaProjeto,
+    df_preco: pd.DataFrame | calculos.TabelaPreco,
+    df_impostos: pd.DataFrame,
+) -> dict:
+    """Roda todos os cálculos de um orçamento a partir das entradas do formulário.
+
+    Retorna um dicionário com os resultados e também com dict_custos e dict_fluxo,
+    prontos para as análises de cenários e de dimensionamento. Para recalcular só
+    o que mudou entre um orçamento e outro, usar grafo_orcamento.
+    """
+    grafo = grafo_orcamento(df_projeto, df_preco, df_impostos)
+    grafo.definir(
+        **entradas, df_consumo=df_consumo, dict_disponibilidades=dict_disponibilidades
+    )
+    return grafo.valor("resultado")
+
+
+def data_por_extenso(dia: date) -> str:
+    return f"{dia.day} de {MESES_EXTENSO[dia.month - 1]} de {dia.year}"
+
+
+def dados_pdf(
+    entradas: dict,
+    resultado: dict,
+    dia: date | None = None,
+    risco: dict | None = None,
+) -> dict:
+    """Formata as entradas e os resultados no dicionário esperado por criar_pdf.
+
+    risco, o retorno de montecarlo.simular, acrescenta a seção de análise de risco.
+    """
+    proposta = Proposta.de_dicts({**ENTRADAS_PADRAO, **entradas}, resultado)
+    dados = formatar_pdf(proposta, dia)
+    if risco is not None:
+        dados["risco"] = formatar_risco(risco, proposta.prazo_vpl)
+    return dados
+
+
+def formatar_anos(valor: float, horizonte: int, unidade: str = "Anos") -> str:
+    """Payback como texto; o que não acontece no horizonte (NaN/inf) vira "> N"."""
+    if np.isfinite(valor):
+        return f"{valor:.1f} {unidade}"
+    return f"> {horizonte} {unidade}"
+
+
+def formatar_tir(valor: float) -> str:
+    """TIR como porcentagem; sem TIR (NaN), "-"."""
+    return f"{valor * 100:.1f}%" if np.isfinite(valor) else "-"
+
+
+def formatar_risco(risco: dict, anos: int) -> dict:
+    """Percentis de montecarlo.simular como texto, do pessimista ao otimista."""
+    payback = risco["percentis"]["payback"]
+    tir = risco["percentis"]["tir"]
+    return {
+        "n_sorteios": f"{risco['n_sorteios']:,}".replace(",", "."),
+        "anos": anos,
+        # Payback longo e TIR baixa são o lado pessimista
+        "payback": [formatar_anos(payback[p], anos) for p in (90, 50, 10)],
+        "tir": [formatar_tir(tir[p]) for p in (10, 50, 90)],
+        "prob_payback": f"{risco['prob_payback'] * 100:.0f}%",
+    }
+
+
+def _reais(valor: float | None) -> str:
+    return "" if valor is None else f"R$ {valor:,.2f}"
+
+
+def formatar_pdf(proposta: Proposta, dia: date | None = None) -> dict:
+    """Dicionário esperado por criar_pdf a partir de uma proposta já calculada.
+
+    É aqui, e só aqui, que os valores numéricos viram texto.
+    """
+    if proposta.resultado is None:
+        raise ValueError("Proposta sem resultado: calcule o orçamento antes.")
+    r = proposta.resultado
+    return {
+        # Dados Pessoais
+        "nome_cliente": proposta.cliente.nome,
+        "cidade": proposta.cliente.endereco,
+        "numero_proposta": f"{proposta.numero}/{proposta.ano}",
+        "data": data_por_extenso(dia or date.today()),
+        # Dados Técnicos
+        "potencia_kwp": f"{proposta.kit.potencia_kit:.2f}",
+        "num_modulos": r.n_modulos,
+        "inversor": proposta.kit.inversor,
+        "geracao_mensal": f"{r.geracao_mensal:.0f}",
+        "area_minima": f"{r.area_painel:.0f}",
+        # Financeiro
+        "valor_total": f"{r.total_nf:,.2f}",
+        "payback": formatar_anos(r.payback, proposta.prazo_vpl),
+        "economia_anual": _reais(r.economia_conta),
+        "nova_conta": _reais(r.nova_conta),
+        "tir": formatar_tir(r.tir),
+    }
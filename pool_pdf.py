@@ -0,0 +1,113 @@
+# pool_pdf.py
+# renderização de muitas propostas em paralelo, em vários processos. Só os workers
+# importam o gerador_pdf (e o fpdf2), no aquecimento
+
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import batched
+from pathlib import Path
+
+
+def _aquecer_worker(perfil: str) -> None:
+    """Prepara o processo antes da primeira tarefa.
+
+    Renderiza uma proposta descartável para que importações do fpdf2/Pillow,
+    métricas das fontes, a leitura das imagens e o modelo das páginas fixas sejam
+    preparados uma única vez por processo, e não no tempo da primeira proposta de
+    verdade.
+    """
+    from gerador_pdf import criar_pdf
+
+    criar_pdf(dados={}, graficos={}, perfil=perfil)
+
+
+def _renderizar_bloco(bloco: tuple, perfil: str) -> list:
+    """Renderiza um bloco de propostas (dados, graficos, destino).
+
+    Quando destino é um caminho, o PDF é gravado pelo próprio worker e só o caminho
+    volta ao processo principal; caso contrário volta o conteúdo em bytes. Uma
+    proposta com erro devolve a exceção no seu lugar, sem perder o resto do bloco.
+    """
+    from gerador_pdf import criar_pdf
+
+    resultados = []
+    for dados, graficos, destino in bloco:
+        try:
+            if destino is None:
+                resultados.append(
+                    criar_pdf(dados=dados, graficos=graficos, perfil=perfil)
+                )
+            else:
+                criar_pdf(
+                    dados=dados, graficos=graficos, destino=Path(destino), perfil=perfil
+                )
+                resultados.append(Path(destino))
+        except Exception as e:
+            resultados.append(e)
+    return resultados
+
+
+class PoolPDF:
+    """Pool de processos para renderizar propostas com criar_pdf.
+
+    Cada processo é aquecido uma vez na criação. As propostas são enviadas em blocos
+    de tamanho 'bloco', com no máximo 2 blocos por processo em andamento, de modo
+    que uma entrada muito grande (ou um gerador) não fica inteira na memória. Os
+    resultados saem na ordem de entrada; uma proposta que falhou aparece como a
+    exceção levantada por criar_pdf. Todas as propostas saem no mesmo perfil de
+    saída ('perfil', ver gerador_pdf.PERFIS).
+
+    O ganho com mais processos não é garantido: depende dos núcleos livres e do
+    disco, e só foi medido com um núcleo, onde o pool com 1 processo fica perto da
+    renderização serial (0,95-1,0x). Meça com benchmarks.pool_pdf na máquina de uso antes de
+    escolher 'processos'.
+
+        with PoolPDF(processos=4) as pool:
+            for caminho in pool.gravar(tarefas):
+                ...
+    """
+
+    def __init__(
+        self, processos: int | None = None, bloco: int = 8, perfil: str = "padrao"
+    ):
+        self.processos = processos or os.cpu_count() or 1
+        self.bloco = bloco
+        self.perfil = perfil
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processos,
+            initializer=_aquecer_worker,
+            initargs=(perfil,),
+        )
+
+    def __enter__(self) -> "PoolPDF":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+    def fechar(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def renderizar(self, propostas: Iterable[tuple[dict, dict]]) -> Iterator[bytes]:
+        """Renderiza pares (dados, graficos) e devolve os PDFs na mesma ordem."""
+        tarefas = ((dados, graficos, None) for dados, graficos in propostas)
+        yield from self._executar(tarefas)
+
+    def gravar(
+        self, propostas: Iterable[tuple[dict, dict, str | Path]]
+    ) -> Iterator[Path]:
+        """Renderiza trincas (dados, graficos, destino) gravando direto no disco."""
+        yield from self._executar(propostas)
+
+    def _executar(self, tarefas: Iterable[tuple]) -> Iterator:
+        pendentes: deque[Future] = deque()
+        for bloco in batched(tarefas, self.bloco):
+            pendentes.append(
+                self._executor.submit(_renderizar_bloco, bloco, self.perfil)
+            )
+            if len(pendentes) >= 2 * self.processos:
+                yield from pendentes.popleft().result()
+        while pendentes:
+            yield from pendentes.popleft().result()
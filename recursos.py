@@ -0,0 +1,181 @@
+# recursos.py
+# registro das imagens, fontes e cores da marca usadas no pdf, nos gráficos e no
+# app: caminhos relativos ao projeto e decodificação uma única vez por processo. O
+# fpdf2 só é importado ao decodificar uma imagem para o pdf
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import threading
+from functools import cache
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fpdf import FPDF
+
+# Cores da Marca (Baseado no PDF)
+COR_VERDE = (184, 212, 50)  # Aproximação do verde limão
+COR_CINZA = (80, 80, 80)  # Cinza escuro
+COR_CINZA_CLARO = (240, 240, 240)
+
+PASTA_IMAGENS = Path(__file__).parent / "images"
+
+IMAGENS = {
+    "logo": "Logotipo_Inovasol.png",
+    "esquema": "esquema_geracao_fv_desenho_segg_20260111.png",
+}
+
+# Fonte TTF do pdf otimizado, por estilo: a DejaVu Sans que acompanha o matplotlib
+FONTES = {
+    "": "DejaVuSans.ttf",
+    "B": "DejaVuSans-Bold.ttf",
+    "I": "DejaVuSans-Oblique.ttf",
+}
+
+# Caracteres mantidos nas fontes reduzidas: latim (com o Latin Extended-A, para
+# nomes de clientes) e a pontuação tipográfica usada nas propostas
+CARACTERES_FONTE = (
+    "".join(map(chr, range(0x20, 0x7F)))
+    + "".join(map(chr, range(0xA0, 0x180)))
+    + "•✓–—‘’“”…€"
+)
+
+# O nível de compressão das imagens do fpdf2 é global (image_parsing.SETTINGS)
+_lock_compressao = threading.Lock()
+
+
+def caminho(nome: str) -> Path:
+    """Caminho absoluto de uma imagem registrada, independente do diretório atual."""
+    return PASTA_IMAGENS / IMAGENS[nome]
+
+
+@cache
+def bytes_imagem(nome: str) -> bytes:
+    """Conteúdo do arquivo da imagem, lido uma vez por processo (ex.: st.image)."""
+    return caminho(nome).read_bytes()
+
+
+@cache
+def info_imagem(
+    nome: str,
+    largura_mm: float | None = None,
+    dpi: int | None = None,
+    qualidade_jpeg: int | None = None,
+    compressao: int = -1,
+):
+    """Imagem já decodificada e comprimida no formato interno do fpdf2.
+
+    Se largura_mm e dpi forem informados, a imagem é reduzida uma vez para a
+    resolução de impressão (nunca ampliada), o que diminui o tamanho dos PDFs.
+    Com qualidade_jpeg, uma imagem sem transparência é gravada em JPEG com essa
+    qualidade (o fpdf2 embute o JPEG como está); as demais vão em deflate com o
+    nível 'compressao' (-1 é o padrão do zlib, 9 o menor arquivo).
+    O resultado fica em cache: cada combinação é processada uma vez por processo.
+    """
+    from fpdf.image_parsing import SETTINGS, get_img_info
+    from PIL import Image
+
+    with Image.open(caminho(nome)) as imagem:
+        imagem.load()
+        if largura_mm is not None and dpi is not None:
+            largura_px = round(largura_mm / 25.4 * dpi)
+            if largura_px < imagem.width:
+                altura_px = round(imagem.height * largura_px / imagem.width)
+                imagem = imagem.resize((largura_px, altura_px), Image.LANCZOS)
+        if qualidade_jpeg is not None and imagem.mode in ("RGB", "L"):
+            jpeg = BytesIO()
+            imagem.save(jpeg, "JPEG", quality=qualidade_jpeg, optimize=True)
+            return get_img_info(str(caminho(nome)), jpeg.getvalue())
+        with _lock_compressao:
+            nivel, SETTINGS.compression_level = SETTINGS.compression_level, compressao
+            try:
+                return get_img_info(str(caminho(nome)), imagem)
+            finally:
+                SETTINGS.compression_level = nivel
+
+
+def inserir_imagem(
+    pdf: FPDF,
+    nome: str,
+    x: float | None = None,
+    y: float | None = None,
+    w: float = 0,
+    h: float = 0,
+    dpi: int | None = None,
+    qualidade_jpeg: int | None = None,
+    compressao: int = -1,
+):
+    """Equivalente a pdf.image() para uma imagem registrada, sem decodificá-la.
+
+    Coloca no cache de imagens do documento uma cópia da imagem pré-processada
+    (o fpdf2 anota dados do documento nela) e a desenha por esse nome: a mesma
+    imagem usada em várias páginas é gravada uma vez só no pdf.
+    """
+    info = info_imagem(nome, w or None, dpi, qualidade_jpeg, compressao)
+    chave = f"recurso:{nome}:{w}:{dpi}:{qualidade_jpeg}:{compressao}"
+    imagens = pdf.image_cache.images
+    if chave not in imagens:
+        copia = type(info)(info)
+        copia["i"] = len(imagens) + 1
+        copia["usages"] = 0
+        copia["iccp_i"] = None
+        iccp = copia.get("iccp")
+        if iccp is not None:
+            perfis = pdf.image_cache.icc_profiles
+            copia["iccp_i"] = perfis.setdefault(iccp, len(perfis))
+            copia["iccp"] = None
+        imagens[chave] = copia
+    return pdf.image(chave, x=x, y=y, w=w, h=h)
+
+
+def _pasta_fontes_matplotlib() -> Path:
+    # Sem importar o matplotlib: só localiza o pacote
+    pacote = importlib.util.find_spec("matplotlib").submodule_search_locations[0]
+    return Path(pacote) / "mpl-data" / "fonts" / "ttf"
+
+
+@cache
+def caminho_fonte(estilo: str) -> Path:
+    """Arquivo TTF do estilo ("", "B" ou "I") reduzido aos CARACTERES_FONTE.
+
+    A DejaVu Sans completa tem ~6 mil glyphs e o fpdf2 leva ~50 ms para carregá-la
+    em cada pdf; reduzida, ~5 ms. A redução (~250 ms por estilo, com o fontTools)
+    é feita uma vez e guardada na pasta temporária do sistema, compartilhada entre
+    processos. O fpdf2 ainda embute no pdf só os glyphs de fato usados.
+    """
+    import hashlib
+    import tempfile
+
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    original = _pasta_fontes_matplotlib() / FONTES[estilo]
+    info = original.stat()
+    h = hashlib.sha256(
+        f"{original}|{info.st_size}|{info.st_mtime_ns}|{CARACTERES_FONTE}".encode()
+    ).hexdigest()[:16]
+    reduzida = (
+        Path(tempfile.gettempdir()) / "orcamentos-fontes" / f"{original.stem}-{h}.ttf"
+    )
+    if reduzida.exists():
+        return reduzida
+
+    opcoes = subset.Options()
+    opcoes.layout_features = []  # sem kerning nem ligaduras: o fpdf2 não os usa
+    opcoes.hinting = False
+    opcoes.notdef_outline = True
+    opcoes.name_IDs = ["*"]
+    opcoes.drop_tables += ["FFTM"]  # carimbo do FontForge
+    fonte = TTFont(original)
+    redutor = subset.Subsetter(opcoes)
+    redutor.populate(text=CARACTERES_FONTE)
+    redutor.subset(fonte)
+    reduzida.parent.mkdir(parents=True, exist_ok=True)
+    # Grava com outro nome e renomeia: outro processo nunca lê um arquivo pela metade
+    temporario = reduzida.with_suffix(f".{os.getpid()}.tmp")
+    fonte.save(temporario)
+    os.replace(temporario, reduzida)
+    return reduzida
@@ -0,0 +1,97 @@
+# tabelas.py
+# tabelas padrão de preços e impostos, compartilhadas pelo app e pela linha de comando.
+# O pandas só é importado ao montar as tabelas: MESES e IMOVEIS não dependem dele
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+MESES = [
+    "jan",
+    "fev",
+    "mar",
+    "abr",
+    "mai",
+    "jun",
+    "jul",
+    "ago",
+    "set",
+    "out",
+    "nov",
+    "dez",
+]
+IMOVEIS = [
+    "imv1",
+    "imv2",
+    "imv3",
+    "imv4",
+]
+
+
+def imoveis(n: int) -> list[str]:
+    """Nomes dos n imóveis que compartilham os créditos (imv1 é o do gerador)."""
+    return [f"imv{i}" for i in range(1, n + 1)]
+
+
+def df_projeto() -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame(
+        [
+            {"de": 0, "ate": 5, "preco (R$)": 1080.00, "Potencia": "0 a 5 kWp"},
+            {"de": 5, "ate": 10, "preco (R$)": 1180.00, "Potencia": "5 a 10 kWp"},
+            {"de": 10, "ate": 20, "preco (R$)": 1650.00, "Potencia": "10 a 20 kWp"},
+            {"de": 20, "ate": 30, "preco (R$)": 2650.00, "Potencia": "20 a 30 kWp"},
+            {"de": 30, "ate": 40, "preco (R$)": 3650.00, "Potencia": "30 a 40 kWp"},
+            {"de": 40, "ate": 50, "preco (R$)": 4650.00, "Potencia": "40 a 50 kWp"},
+            {"de": 50, "ate": 60, "preco (R$)": 5650.00, "Potencia": "50 a 60 kWp"},
+            {"de": 60, "ate": 70, "preco (R$)": 6650.00, "Potencia": "60 a 70 kWp"},
+            {"de": 70, "ate": 80, "preco (R$)": 7650.00, "Potencia": "70 a 80 kWp"},
+            {"de": 80, "ate": 90, "preco (R$)": 8650.00, "Potencia": "80 a 90 kWp"},
+            {"de": 90, "ate": 100, "preco (R$)": 9650.00, "Potencia": "90 a 100 kWp"},
+        ]
+    )
+
+
+def df_preco() -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame(
+        [
+            {"Descr": "Mao de obra", "Qtd": 1, "Valor Unit (R$)": 1000.00},
+            {"Descr": "ART", "Qtd": 1, "Valor Unit (R$)": 100.00},
+            {"Descr": "Combustível", "Qtd": 1.0, "Valor Unit (R$)": 1.50},
+            {"Descr": "Aluguel de Veículo", "Qtd": 1, "Valor Unit (R$)": 250.00},
+            {"Descr": "Equipamentos Adicionais", "Qtd": 1, "Valor Unit (R$)": 100.00},
+        ]
+    )
+
+
+def df_impostos() -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame(
+        [
+            {"imposto": "ISS", "Valor": 6.0},
+            {"imposto": "PIS", "Valor": 0.0},
+            {"imposto": "COFINS", "Valor": 0.0},
+            {"imposto": "CSLL", "Valor": 0.0},
+            {"imposto": "IRPF", "Valor": 0.0},
+        ]
+    )
+
+
+def df_nf() -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame(
+        [
+            {"descricao": "Custos Inovasol", "Valor (R$)": 0.0},
+            {"descricao": "Lucro Inovasol", "Valor (R$)": 0.0},
+            {"descricao": "Comissao do vendedor", "Valor (R$)": 0.0},
+            {"descricao": "Total impostos", "Valor (R$)": 0.0},
+        ]
+    )
@@ -0,0 +1,90 @@
+# zip_pdf.py
+# exportação de muitas propostas num único ZIP, escrito à medida que cada pdf é
+# gerado: só um pdf fica na memória por vez, com qualquer tamanho de lote
+
+import time
+import zipfile
+from pathlib import Path
+from typing import BinaryIO
+
+# Os pdfs já saem comprimidos do fpdf2 (páginas e imagens em deflate): comprimir de
+# novo no ZIP ganha menos de 1% e custa ~25 ms por proposta, então só armazena
+COMPRESSAO = zipfile.ZIP_STORED
+
+
+class _EntradaTardia:
+    """Arquivo que só abre a entrada do ZIP na primeira escrita."""
+
+    def __init__(self, abrir):
+        self._abrir = abrir
+        self._entrada = None
+
+    def write(self, dados) -> int:
+        if self._entrada is None:
+            self._entrada = self._abrir()
+        return self._entrada.write(dados)
+
+    def close(self) -> None:
+        if self._entrada is not None:
+            self._entrada.close()
+
+
+class ZipPDF:
+    """ZIP de propostas gravado em fluxo, direto no arquivo (ou em qualquer arquivo
+    binário aberto para escrita, mesmo sem seek, como a resposta de um servidor).
+
+    adicionar() gera o pdf com criar_pdf escrevendo do buffer do fpdf2 para a
+    entrada do ZIP, sem cópia intermediária; adicionar_pdf() grava um pdf já pronto
+    (ex.: vindo de um PoolPDF).
+
+        with ZipPDF("propostas.zip") as arquivo_zip:
+            for dados, graficos, nome in tarefas:
+                arquivo_zip.adicionar(nome, dados, graficos)
+    """
+
+    def __init__(self, destino: str | Path | BinaryIO, compressao: int = COMPRESSAO):
+        self._zip = zipfile.ZipFile(destino, "w", compression=compressao)
+        self.n = 0  # propostas gravadas
+
+    def __enter__(self) -> "ZipPDF":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+    def fechar(self) -> None:
+        """Grava o índice do ZIP. Sem isso o arquivo fica ilegível."""
+        self._zip.close()
+
+    def _entrada(self, nome: str):
+        # Com só o nome, o zipfile data a entrada de 1980
+        info = zipfile.ZipInfo(nome, date_time=time.localtime()[:6])
+        info.compress_type = self._zip.compression
+        return self._zip.open(info, "w")
+
+    def adicionar(
+        self, nome: str, dados: dict, graficos: dict, perfil: str = "padrao"
+    ) -> None:
+        """Gera a proposta com criar_pdf, no perfil de saída 'perfil', direto na
+        entrada 'nome' do ZIP.
+
+        A entrada só é criada quando o fpdf2 escreve o documento pronto: uma
+        proposta que falha na diagramação não deixa um pdf vazio no ZIP.
+        """
+        from gerador_pdf import criar_pdf
+
+        entrada = _EntradaTardia(lambda: self._entrada(nome))
+        try:
+            criar_pdf(dados=dados, graficos=graficos, destino=entrada, perfil=perfil)
+        finally:
+            entrada.close()
+        self.n += 1
+
+    def adicionar_pdf(self, nome: str, pdf: bytes | str | Path) -> None:
+        """Grava um pdf já gerado: o conteúdo em bytes ou o caminho do arquivo."""
+        if isinstance(pdf, (str, Path)):
+            self._zip.write(pdf, nome)
+        else:
+            with self._entrada(nome) as entrada:
+                entrada.write(pdf)
+        self.n += 1